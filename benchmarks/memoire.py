@@ -0,0 +1,103 @@
+"""
+Mémoire résidente sur une longue série de reruns (AppTest, une session par
+simulateur) : elle doit rester stable.
+
+Chaque simulateur est relancé `-n` fois en parcourant un cycle de longueurs
+de bâtiment. Après les cycles de chauffe, les caches (pipeline, exports,
+fonds statiques) sont remplis : la mémoire ne doit plus croître. On compare
+la mémoire résidente (RSS) en fin de chauffe et en fin de série, et on
+compte les figures pyplot restées ouvertes.
+
+    python benchmarks/memoire.py                          # 300 reruns par simulateur
+    python benchmarks/memoire.py --apps plan2allees-1 -n 500 --marge 20
+
+Code de sortie 1 si la RSS croît de plus de `--marge` Mio, ou si des figures
+pyplot restent ouvertes.
+"""
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import tempfile
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+# Dépôt jetable : les reruns mesurés ne doivent ni lire ni remplir le dépôt partagé
+os.environ["IMPLANTATION_DEPOT"] = str(Path(tempfile.mkdtemp(prefix="bench_depot_")) / "depot.sqlite")
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APPS = ("plan1allee-1", "plan1allee-2", "plan2allees-1", "plan2allees-2")
+# Longueurs parcourues en boucle (bornées par le curseur de chaque simulateur)
+CYCLE = (60, 80, 100, 120)
+CYCLES_CHAUFFE = 2
+
+
+def rss():
+    """Mémoire résidente du processus (Mio)"""
+    gc.collect()
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Hors Linux : pic de RSS (Kio sous Linux, octets sous macOS)
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pic / 2**20 if sys.platform == "darwin" else pic / 2**10
+
+
+def _longueur(at, valeur):
+    s = next(s for s in at.sidebar.slider if s.label.startswith("Longueur"))
+    s.set_value(max(int(s.min), min(valeur, int(s.max))))
+
+
+def mesurer(app, reruns=300, journal=sys.stderr):
+    """{debut, fin, croissance (Mio), figures pyplot ouvertes} sur `reruns` reruns de `app`"""
+    at = AppTest.from_file(str(RACINE / f"{app}.py"), default_timeout=300)
+    at.run()
+    for i in range(CYCLES_CHAUFFE * len(CYCLE)):
+        _longueur(at, CYCLE[i % len(CYCLE)])
+        at.run()
+    debut = rss()
+    for i in range(reruns):
+        _longueur(at, CYCLE[i % len(CYCLE)])
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{app} : {at.exception[0].value}")
+        if (i + 1) % 50 == 0:
+            print(f"{app:14s} {i + 1:5d} reruns  RSS {rss():8.1f} Mio  figures pyplot {len(plt.get_fignums())}", file=journal)
+    fin = rss()
+    return {"debut": debut, "fin": fin, "croissance": fin - debut, "figures": len(plt.get_fignums())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stabilité mémoire des simulateurs sur une longue série de reruns")
+    parser.add_argument("--apps", nargs="+", default=APPS, choices=APPS)
+    parser.add_argument("-n", "--reruns", type=int, default=300)
+    parser.add_argument("--marge", type=float, default=30.0, help="croissance de RSS tolérée (Mio)")
+    args = parser.parse_args(argv)
+
+    echecs = []
+    for app in args.apps:
+        m = mesurer(app, args.reruns)
+        print(f"{app:14s} RSS {m['debut']:.1f} -> {m['fin']:.1f} Mio ({m['croissance']:+.1f})  figures pyplot {m['figures']}")
+        if m["croissance"] > args.marge:
+            echecs.append(f"{app} : RSS +{m['croissance']:.1f} Mio > {args.marge:g} Mio")
+        if m["figures"]:
+            echecs.append(f"{app} : {m['figures']} figures pyplot ouvertes")
+        plt.close("all")
+    for e in echecs:
+        print("RÉGRESSION", e)
+    if not echecs:
+        print("Mémoire stable")
+    return 1 if echecs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
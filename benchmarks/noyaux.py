@@ -0,0 +1,94 @@
+"""
+Noyaux vectorisés (moteur.balayage) face aux stratégies scalaires : même
+longueur utilisée et même nombre de formes « Adapté » que
+Strategie.calculer(p, ordre), sur des recettes et bâtiments tirés au hasard,
+sans ordre, avec un ordre mélangé, avec des paires tirées au hasard et avec
+l'ordre optimisé (moteur.ordre) des variantes à deux allées.
+
+    python benchmarks/noyaux.py
+    python benchmarks/noyaux.py -n 200 --graine 3
+
+Code de sortie 1 au premier écart.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+
+import numpy as np  # noqa: E402
+
+from implantation.moteur import STRATEGIES, DeuxAllees, Matiere  # noqa: E402
+from implantation.moteur.balayage import evaluer_vectorise  # noqa: E402
+from implantation.moteur.ordre import optimiser_ordre  # noqa: E402
+
+TOLERANCE = 1e-9
+
+
+def tirer_parametres(strategie, rng):
+    """Parametres de la variante, bâtiment et recette (avec des parts nulles) tirés au hasard"""
+    parts = rng.integers(0, 40, len(strategie.defaut.recette)) * (rng.random(len(strategie.defaut.recette)) > 0.2)
+    recette = tuple(
+        Matiere(m.nom, float(part), float(rng.uniform(0.5, 3.0)), m.couleur)
+        for m, part in zip(strategie.defaut.recette, parts)
+    )
+    return strategie.defaut.avec(
+        bat_largeur=float(rng.integers(30, 101)), largeur_stock=float(rng.integers(8, 41)) / 2,
+        largeur_passage=float(rng.choice([0.0, 1.5])), recette=recette,
+    )
+
+
+def ordres(strategie, p, rng):
+    """Ordres à vérifier : aucun, mélangé, paires au hasard, optimisé (deux allées)"""
+    noms = [m.nom for m in p.recette]
+    melange = [noms[i] for i in rng.permutation(len(noms))]
+    yield "défaut", None
+    yield "mélangé", melange
+    if isinstance(strategie, DeuxAllees):
+        paires = [tuple(melange[i:i + 2]) if len(melange[i:i + 2]) == 2 and rng.random() < 0.6 else melange[i:i + 2] for i in range(0, len(melange), 2)]
+        yield "paires", [n for niveau in paires for n in ([niveau] if isinstance(niveau, tuple) else niveau)]
+        if sum(m.pourcentage > 0 for m in p.recette) >= 2:
+            yield "optimisé", optimiser_ordre(strategie.nom, p).ordre
+
+
+def verifier(n, graine):
+    rng = np.random.default_rng(graine)
+    ecarts = []
+    for variante, strategie in STRATEGIES.items():
+        cas = 0
+        for _ in range(n):
+            p = tirer_parametres(strategie, rng)
+            if not any(m.pourcentage > 0 for m in p.recette):
+                continue
+            for nom_ordre, ordre in ordres(strategie, p, rng):
+                attendu = strategie.calculer(p, ordre)
+                obtenu = evaluer_vectorise(variante, p, ordre)
+                cas += 1
+                if (abs(float(obtenu["longueur_utilisee"]) - attendu.longueur_utilisee) > TOLERANCE
+                        or int(obtenu["nb_adaptes"]) != attendu.nb_adaptes):
+                    ecarts.append(
+                        f"{variante} ordre {nom_ordre} {ordre} : noyau {float(obtenu['longueur_utilisee']):.3f} m "
+                        f"({int(obtenu['nb_adaptes'])} adaptés), moteur {attendu.longueur_utilisee:.3f} m ({attendu.nb_adaptes} adaptés)"
+                    )
+        print(f"{variante:24s} {cas} cas")
+    return ecarts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Noyaux vectorisés face aux stratégies scalaires (ordres et paires)")
+    parser.add_argument("-n", type=int, default=60, help="recettes tirées par variante")
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    ecarts = verifier(args.n, args.graine)
+    for e in ecarts[:20]:
+        print("ÉCART", e)
+    if not ecarts:
+        print("Noyaux conformes")
+    return 1 if ecarts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
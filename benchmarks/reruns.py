@@ -0,0 +1,261 @@
+"""
+Latence d'un rerun des quatre simulateurs (AppTest, sans navigateur).
+
+Chaque script est joué sur des jeux de paramètres représentatifs (valeurs
+par défaut de la barre latérale, bâtiment de 200 m, recette chargée). Pour
+chaque rerun on mesure séparément :
+- calcul : temps passé dans le moteur (DEPOT.calculer, empaquetage, ordre),
+  dépôt et étapes du pipeline vidés avant chaque rerun ;
+- dessin : de figure_session à la fin de l'aperçu (figure + rendu écran,
+  aperçu rapide par défaut), hors calcul, aperçu non mis en cache ;
+- export : rendu PDF et PNG de la figure, sans cache ;
+- total : rerun AppTest complet ;
+- memoire : pic tracemalloc (Mio) d'un rerun, mesuré à part.
+
+    python benchmarks/reruns.py                  # compare à benchmarks/baseline.json
+    python benchmarks/reruns.py --enregistrer    # remplace la référence
+    python benchmarks/reruns.py --apps plan2allees-1 --jeux defaut -n 5
+
+Code de sortie 1 si une mesure dépasse sa référence de plus de `--tolerance`
+(relatif) et de `--marge` (absolu, en s ou Mio).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+# Dépôt jetable : les reruns mesurés ne doivent ni lire ni remplir le dépôt partagé
+os.environ["IMPLANTATION_DEPOT"] = str(Path(tempfile.mkdtemp(prefix="bench_depot_")) / "depot.sqlite")
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import implantation.export  # noqa: E402
+import implantation.figures  # noqa: E402
+import implantation.moteur.empaquetage  # noqa: E402
+import implantation.moteur.ordre  # noqa: E402
+import implantation.panneaux  # noqa: E402
+from implantation.depot import DEPOT  # noqa: E402
+from implantation.export import CACHE_EXPORT  # noqa: E402
+from implantation.moteur.pipeline import PIPELINE  # noqa: E402
+
+APPS = ("plan1allee-1", "plan1allee-2", "plan2allees-1", "plan2allees-2")
+BASELINE = Path(__file__).with_name("baseline.json")
+PHASES = ("calcul", "dessin", "export", "total")
+
+
+def _batiment_200m(at):
+    # Borné au maximum du curseur (150 m dans plan1allee-1)
+    s = next(s for s in at.sidebar.slider if s.label.startswith("Longueur"))
+    s.set_value(min(200, int(s.max)))
+
+
+def _recette_chargee(at):
+    # Cinq matières à parts égales, densités basses : surfaces maximales
+    for w in [*at.sidebar.slider, *at.sidebar.number_input]:
+        if w.label.startswith("% "):
+            w.set_value(20)
+        elif w.type == "number_input" and w.min == 0.1 and w.max == 5.0:
+            w.set_value(0.5)
+
+
+JEUX = {
+    "defaut": lambda at: None,
+    "batiment_200m": _batiment_200m,
+    "recette_chargee": _recette_chargee,
+}
+
+
+class _Chrono:
+    """Instrumente le moteur, figure_session, l'aperçu et export_differe le temps d'un rerun"""
+
+    def __init__(self):
+        self.calcul = 0.0
+        self.debut_dessin = None
+        self.fin_dessin = None
+        self.calcul_pendant_dessin = 0.0
+        self.exports = []
+        self._apercu_en_cours = False
+        self._profondeur = 0
+        self._origines = []
+
+    def _remplacer(self, objet, nom, enveloppe):
+        origine = getattr(objet, nom)
+        self._origines.append((objet, nom, origine))
+        setattr(objet, nom, enveloppe(origine))
+
+    def _moteur(self, f):
+        def mesure(*args, **kwargs):
+            # Appels imbriqués (dépôt -> stratégie) comptés une seule fois
+            self._profondeur += 1
+            t = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                self._profondeur -= 1
+                if self._profondeur == 0:
+                    dt = time.perf_counter() - t
+                    self.calcul += dt
+                    if self.debut_dessin is not None and self.fin_dessin is None:
+                        self.calcul_pendant_dessin += dt
+        return mesure
+
+    def _figure(self, f):
+        def mesure(*args, **kwargs):
+            if self.debut_dessin is None:
+                self.debut_dessin = time.perf_counter()
+            return f(*args, **kwargs)
+        return mesure
+
+    def _apercu(self, f):
+        def mesure(*args, **kwargs):
+            self._apercu_en_cours = True
+            try:
+                return f(*args, **kwargs)
+            finally:
+                self._apercu_en_cours = False
+                self.fin_dessin = time.perf_counter()
+        return mesure
+
+    def _export(self, f):
+        def capture(fig, cle, format, *args, **kwargs):
+            # Le PNG de l'aperçu est compté dans le dessin
+            if not self._apercu_en_cours:
+                options = {k: v for k, v in kwargs.items() if k not in ("cache", "depot")}
+                self.exports.append((fig, format, options))
+            return f(fig, cle, format, *args, **kwargs)
+        return capture
+
+    def __enter__(self):
+        self._remplacer(DEPOT, "calculer", self._moteur)
+        self._remplacer(implantation.moteur.empaquetage, "gain_longueur", self._moteur)
+        self._remplacer(implantation.moteur.ordre, "optimiser_ordre", self._moteur)
+        self._remplacer(implantation.figures, "figure_session", self._figure)
+        self._remplacer(implantation.panneaux, "apercu_plan", self._apercu)
+        # Nom importé par les panneaux (boutons d'export et aperçu)
+        self._remplacer(implantation.panneaux, "export_differe", self._export)
+        return self
+
+    def __exit__(self, *exc):
+        for objet, nom, origine in reversed(self._origines):
+            setattr(objet, nom, origine)
+
+    @property
+    def dessin(self):
+        if self.debut_dessin is None or self.fin_dessin is None:
+            return 0.0
+        return self.fin_dessin - self.debut_dessin - self.calcul_pendant_dessin
+
+
+def _rerun(app, jeu, memoire=False):
+    """Mesures (dict) d'un rerun de `app` avec le jeu de paramètres `jeu`"""
+    at = AppTest.from_file(str(RACINE / f"{app}.py"), default_timeout=300)
+    at.run()
+    JEUX[jeu](at)
+    DEPOT.vider()
+    PIPELINE.vider()
+    CACHE_EXPORT.vider()
+    plt.close("all")
+
+    if memoire:
+        tracemalloc.start()
+        at.run()
+        pic = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        plt.close("all")
+        return {"memoire": pic / 2**20}
+
+    with _Chrono() as chrono:
+        t = time.perf_counter()
+        at.run()
+        total = time.perf_counter() - t
+    if at.exception:
+        raise RuntimeError(f"{app} / {jeu} : {at.exception[0].value}")
+    t = time.perf_counter()
+    for fig, format, options in chrono.exports:
+        implantation.export.rendre_figure(fig, format, **options)
+    export = time.perf_counter() - t
+    plt.close("all")
+    return {"calcul": chrono.calcul, "dessin": chrono.dessin, "export": export, "total": total}
+
+
+def mesurer(apps=APPS, jeux=tuple(JEUX), repetitions=3, journal=sys.stderr):
+    """{app: {jeu: {phase: médiane (s), memoire: Mio}}}"""
+    resultats = {}
+    for app in apps:
+        for jeu in jeux:
+            _rerun(app, jeu)  # chauffe (imports, polices matplotlib)
+            mesures = [_rerun(app, jeu) for _ in range(repetitions)]
+            ligne = {phase: statistics.median(m[phase] for m in mesures) for phase in PHASES}
+            ligne.update(_rerun(app, jeu, memoire=True))
+            resultats.setdefault(app, {})[jeu] = ligne
+            print(f"{app:14s} {jeu:16s} " + "  ".join(f"{k} {v:7.3f}" for k, v in ligne.items()), file=journal)
+    return resultats
+
+
+def comparer(resultats, reference, tolerance=0.5, marge=0.05, tolerance_memoire=0.25, marge_memoire=5.0):
+    """Liste des régressions (texte) par rapport à `reference`"""
+    regressions = []
+    for app, jeux in resultats.items():
+        for jeu, mesures in jeux.items():
+            ref = reference.get(app, {}).get(jeu)
+            if ref is None:
+                continue
+            for phase, valeur in mesures.items():
+                if phase not in ref:
+                    continue
+                tol, abs_ = (tolerance_memoire, marge_memoire) if phase == "memoire" else (tolerance, marge)
+                limite = ref[phase] * (1 + tol) + abs_
+                if valeur > limite:
+                    regressions.append(f"{app} / {jeu} / {phase} : {valeur:.3f} > {limite:.3f} (réf. {ref[phase]:.3f})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latence des reruns des simulateurs")
+    parser.add_argument("--apps", nargs="+", default=APPS, choices=APPS)
+    parser.add_argument("--jeux", nargs="+", default=tuple(JEUX), choices=tuple(JEUX))
+    parser.add_argument("-n", "--repetitions", type=int, default=3)
+    parser.add_argument("--reference", type=Path, default=BASELINE)
+    parser.add_argument("--enregistrer", action="store_true", help="écrit les mesures comme nouvelle référence")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="écart relatif toléré sur les temps")
+    parser.add_argument("--marge", type=float, default=0.05, help="écart absolu toléré sur les temps (s)")
+    args = parser.parse_args(argv)
+
+    resultats = mesurer(args.apps, args.jeux, args.repetitions)
+
+    if args.enregistrer:
+        reference = json.loads(args.reference.read_text()) if args.reference.exists() else {}
+        for app, jeux in resultats.items():
+            for jeu, mesures in jeux.items():
+                reference.setdefault(app, {})[jeu] = {k: round(v, 4) for k, v in mesures.items()}
+        reference["_machine"] = {"python": platform.python_version(), "machine": platform.machine(), "cpu": os.cpu_count()}
+        args.reference.write_text(json.dumps(reference, indent=2, sort_keys=True) + "\n")
+        print(f"Référence écrite : {args.reference}")
+        return 0
+
+    if not args.reference.exists():
+        print(f"Pas de référence ({args.reference}) : relancer avec --enregistrer")
+        return 0
+    regressions = comparer(resultats, json.loads(args.reference.read_text()), args.tolerance, args.marge)
+    for r in regressions:
+        print("RÉGRESSION", r)
+    if not regressions:
+        print("Aucune régression")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Outils partagés par les simulateurs d'implantation (séchage & stockage)."""
@@ -0,0 +1,209 @@
+"""
+Dépôt persistant (SQLite) des plans calculés et des exports rendus, adressé
+par le contenu : la clé est l'empreinte canonique de la variante, des
+paramètres et du code du moteur. Partagé entre sessions et processus
+(mode WAL, une connexion par opération), borné en taille : les entrées les
+moins récemment lues sont évincées.
+
+    depot = DepotResultats()
+    plan = depot.calculer("deux_allees", p)          # calcul (incrémental) au premier appel seulement
+    png = depot.obtenir(cle, lambda: rendre_figure(fig, "png"))  # clé libre, version du code ajoutée
+
+Le contenu est sérialisé avec pickle : le fichier ne doit être partagé
+qu'entre utilisateurs de confiance (disque local ou partage d'équipe).
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from implantation.moteur.pipeline import PIPELINE
+
+CHEMIN_DEFAUT = os.environ.get(
+    "IMPLANTATION_DEPOT", str(Path.home() / ".cache" / "implantation" / "depot.sqlite")
+)
+CAPACITE_DEPOT_DEFAUT = 512 * 1024 * 1024
+
+# Dépôt inaccessible (disque plein, droits, verrou) : on calcule sans stocker
+ERREURS_DEPOT = (sqlite3.Error, OSError)
+
+# Genre d'une entrée : plan calculé, ou octets d'export
+PLAN = "plan"
+EXPORT = "export"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entrees (
+    cle TEXT PRIMARY KEY,
+    genre TEXT NOT NULL,
+    variante TEXT,
+    indicateurs TEXT,
+    donnees BLOB NOT NULL,
+    taille INTEGER NOT NULL,
+    utilise REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entrees_utilise ON entrees (utilise);
+"""
+
+
+def empreinte_sources(*chemins):
+    """sha1 du contenu de fichiers sources (invalide le dépôt quand le code change)"""
+    h = hashlib.sha1()
+    for chemin in chemins:
+        h.update(Path(chemin).read_bytes())
+    return h.hexdigest()
+
+
+# Code du paquet (moteur, dessin) : une entrée produite par une autre version n'est jamais relue
+VERSION_CODE = empreinte_sources(*sorted(Path(__file__).parent.rglob("*.py")))
+
+
+def _canonique(valeur):
+    """Forme JSON stable : dataclasses en dicts, nombres en float (60 == 60.0)"""
+    if dataclasses.is_dataclass(valeur) and not isinstance(valeur, type):
+        return {f.name: _canonique(getattr(valeur, f.name)) for f in dataclasses.fields(valeur)}
+    if isinstance(valeur, dict):
+        return {str(k): _canonique(v) for k, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return [_canonique(v) for v in valeur]
+    if isinstance(valeur, bool) or valeur is None or isinstance(valeur, str):
+        return valeur
+    if isinstance(valeur, (int, float)):
+        return float(valeur)
+    return repr(valeur)
+
+
+def cle_plan(variante, p, ordre=None):
+    """Empreinte (sha256) d'un calcul : variante, paramètres, ordre et version du code"""
+    contenu = json.dumps([VERSION_CODE, variante, _canonique(p), _canonique(ordre)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenu.encode("utf-8")).hexdigest()
+
+
+class DepotResultats:
+    """Plans et exports persistants, bornés par la taille totale stockée"""
+
+    def __init__(self, chemin=CHEMIN_DEFAUT, capacite_octets=CAPACITE_DEPOT_DEFAUT, pipeline=PIPELINE):
+        self.chemin = str(chemin)
+        self.capacite_octets = capacite_octets
+        # Calcul des plans absents : seules les étapes dont les entrées ont changé
+        self.pipeline = pipeline
+        self._pret = False
+        self._verrou = threading.Lock()
+
+    @contextmanager
+    def _connexion(self):
+        """Connexion courte : une transaction validée puis fermée"""
+        if not self._pret:
+            with self._verrou:
+                if not self._pret:
+                    Path(self.chemin).parent.mkdir(parents=True, exist_ok=True)
+                    con = sqlite3.connect(self.chemin, timeout=30)
+                    try:
+                        con.execute("PRAGMA journal_mode=WAL")
+                        con.executescript(_SCHEMA)
+                    finally:
+                        con.close()
+                    self._pret = True
+        con = sqlite3.connect(self.chemin, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def __len__(self):
+        with self._connexion() as con:
+            return con.execute("SELECT COUNT(*) FROM entrees").fetchone()[0]
+
+    @property
+    def taille(self):
+        with self._connexion() as con:
+            return con.execute("SELECT COALESCE(SUM(taille), 0) FROM entrees").fetchone()[0]
+
+    def lire(self, cle):
+        """Objet stocké sous `cle` (None si absent) ; marque l'entrée comme récente"""
+        with self._connexion() as con:
+            ligne = con.execute("SELECT genre, donnees FROM entrees WHERE cle = ?", (cle,)).fetchone()
+            if ligne is None:
+                return None
+            con.execute("UPDATE entrees SET utilise = ? WHERE cle = ?", (time.time(), cle))
+        genre, donnees = ligne
+        return pickle.loads(donnees) if genre == PLAN else donnees
+
+    def ecrire(self, cle, valeur, variante=None, indicateurs=None):
+        """Stocke un plan (ResultatImplantation) ou des octets d'export, puis évince si besoin"""
+        genre = EXPORT if isinstance(valeur, (bytes, bytearray)) else PLAN
+        donnees = bytes(valeur) if genre == EXPORT else pickle.dumps(valeur, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(donnees) > self.capacite_octets:
+            return
+        with self._connexion() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO entrees VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cle, genre, variante, json.dumps(indicateurs) if indicateurs else None, donnees, len(donnees), time.time()),
+            )
+            self._evincer(con)
+
+    def _evincer(self, con):
+        total = con.execute("SELECT COALESCE(SUM(taille), 0) FROM entrees").fetchone()[0]
+        if total <= self.capacite_octets:
+            return
+        anciennes = []
+        for cle, taille in con.execute("SELECT cle, taille FROM entrees ORDER BY utilise"):
+            if total <= self.capacite_octets:
+                break
+            anciennes.append((cle,))
+            total -= taille
+        con.executemany("DELETE FROM entrees WHERE cle = ?", anciennes)
+
+    def obtenir(self, cle, generer):
+        """Valeur stockée sous `cle`, calculée par `generer()` et stockée si absente"""
+        cle = hashlib.sha256(f"{VERSION_CODE}:{cle}".encode("utf-8")).hexdigest()
+        try:
+            valeur = self.lire(cle)
+        except ERREURS_DEPOT:
+            return generer()
+        if valeur is None:
+            valeur = generer()
+            try:
+                self.ecrire(cle, valeur)
+            except ERREURS_DEPOT:
+                pass
+        return valeur
+
+    def calculer(self, variante, p, ordre=None):
+        """Plan de `variante` pour `p`, relu du dépôt s'il a déjà été calculé"""
+        cle = cle_plan(variante, p, ordre)
+        try:
+            plan = self.lire(cle)
+        except ERREURS_DEPOT:
+            return self.pipeline.calculer(variante, p, ordre)
+        if plan is None:
+            plan = self.pipeline.calculer(variante, p, ordre)
+            try:
+                self.ecrire(cle, plan, variante, plan.indicateurs())
+            except ERREURS_DEPOT:
+                pass
+        return plan
+
+    def indicateurs(self, variante=None):
+        """KPIs stockés (liste de dicts), sans désérialiser les plans"""
+        requete, args = "SELECT variante, indicateurs FROM entrees WHERE genre = ?", [PLAN]
+        if variante:
+            requete += " AND variante = ?"
+            args.append(variante)
+        with self._connexion() as con:
+            return [dict(json.loads(i), variante=v) for v, i in con.execute(requete, args) if i]
+
+    def vider(self):
+        with self._connexion() as con:
+            con.execute("DELETE FROM entrees")
+
+
+# Instance partagée par les simulateurs
+DEPOT = DepotResultats()
@@ -0,0 +1,421 @@
+"""Couches de dessin groupées : un seul artiste matplotlib par couche et par motif."""
+
+import io
+import math
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.artist import Artist
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.collections import PatchCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle, Rectangle
+from matplotlib.text import Text
+from matplotlib.transforms import Bbox
+
+from implantation.export import CacheExport, verrou_figure
+from implantation.moteur.resultat import PASSAGE, SECHAGE, STOCK
+
+# Couleurs d'alerte (rectangle qui sort du bâtiment)
+COULEUR_DEPASSEMENT = '#ffcccc'
+BORD_DEPASSEMENT = 'red'
+
+# Styles des plans rendus hors application (mêmes couches que les simulateurs)
+STYLES_DEFAUT = {
+    SECHAGE: dict(alpha=0.6, edge_adapte='red'),
+    PASSAGE: dict(color='#f0f0f0', alpha=0.4, hatch='--'),
+    STOCK: dict(alpha=0.4, hatch='..'),
+}
+
+
+def _sommets(x, y, w, h):
+    """Sommets (n, 4, 2) de rectangles donnés par colonnes"""
+    x1, y1 = x + w, y + h
+    return np.stack([
+        np.column_stack([x, y]), np.column_stack([x1, y]),
+        np.column_stack([x1, y1]), np.column_stack([x, y1]),
+    ], axis=1)
+
+
+class CoucheRectangles:
+    """
+    Rectangles pleins et cercles d'une couche de décor (camions), dessinés
+    en une collection chacun au lieu d'un ax.add_patch par forme.
+    Les tas du plan passent par dessiner_plan.
+    """
+
+    def __init__(self):
+        self._rects = []
+        self._cercles = []
+
+    def __len__(self):
+        return len(self._rects) + len(self._cercles)
+
+    def ajouter(self, x, y, w, h, color):
+        self._rects.append((x, y, w, h, to_rgba(color)))
+
+    def ajouter_cercle(self, x, y, r, color):
+        self._cercles.append((x, y, r, to_rgba(color)))
+
+    def dessiner(self, ax):
+        """Ajoute les collections à l'axe et renvoie la liste des artistes créés"""
+        artistes = []
+        if self._rects:
+            xywh = np.array([r[:4] for r in self._rects], dtype=float)
+            artistes.append(PolyCollection(
+                _sommets(xywh[:, 0], xywh[:, 1], xywh[:, 2], xywh[:, 3]),
+                facecolors=[r[4] for r in self._rects],
+                edgecolors='black',
+                linewidths=rcParams['patch.linewidth'],
+            ))
+        if self._cercles:
+            artistes.append(PatchCollection(
+                [Circle((x, y), r) for x, y, r, _ in self._cercles],
+                facecolors=[c[3] for c in self._cercles],
+                edgecolors=[c[3] for c in self._cercles],
+            ))
+        for coll in artistes:
+            ax.add_collection(coll, autolim=False)
+        return artistes
+
+
+# Aperçu écran : résolution d'écran, sans hachures ni transparence, petits textes masqués
+DPI_APERCU = 100
+# Vue détaillée d'une bande du plan : résolution plus fine
+DPI_DETAIL = 200
+# Cadre écran (pixels) : largeur de la colonne du plan, hauteur plafonnée
+LARGEUR_ECRAN_PX = 1400
+HAUTEUR_MAX_ECRAN_PX = 2400
+# Corps (en pixels de l'aperçu) sous lequel un texte est masqué : 7 pt à 100 dpi
+SEUIL_TEXTE_APERCU = 10
+
+
+def _aplatir(couleurs, alpha=None):
+    """Couleurs RGBA (N x 4) mélangées au blanc et rendues opaques (`alpha` : transparence imposée)"""
+    couleurs = np.array(couleurs, dtype=float).reshape(-1, 4)
+    a = couleurs[:, 3:] if alpha is None else alpha
+    couleurs[:, :3] = couleurs[:, :3] * a + (1 - a)
+    couleurs[:, 3] = 1
+    return couleurs
+
+
+class RenduApercu(RendererAgg):
+    """
+    Rendu Agg simplifié de l'aperçu : hachures ignorées, couleurs transparentes
+    remplacées par leur teinte sur fond blanc (pas de mélange alpha).
+    """
+
+    def __init__(self, largeur, hauteur, dpi, seuil_texte=SEUIL_TEXTE_APERCU):
+        super().__init__(largeur, hauteur, dpi)
+        self.seuil_texte = seuil_texte
+
+    def _aplatir_gc(self, gc):
+        """Retire hachure et transparence du contexte ; renvoie l'alpha imposé (ou None)"""
+        alpha = gc.get_alpha() if gc.get_forced_alpha() else None
+        gc.set_hatch(None)
+        trait = tuple(_aplatir(gc.get_rgb())[0])
+        gc.set_alpha(None)
+        gc.set_foreground(trait, isRGBA=True)
+        return alpha
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        alpha = self._aplatir_gc(gc)
+        if rgbFace is not None:
+            rgbFace = tuple(_aplatir(to_rgba(rgbFace), alpha)[0])
+        super().draw_path(gc, path, transform, rgbFace)
+
+    def _update_methods(self):
+        # RendererAgg lie draw_path_collection au rendu C++ à chaque (re)création
+        super()._update_methods()
+        self.draw_path_collection = self._dessiner_collection
+
+    def _dessiner_collection(self, gc, master_transform, paths, all_transforms, offsets, offset_trans, facecolors, edgecolors, *args, **kwargs):
+        self._aplatir_gc(gc)
+        if len(facecolors):
+            facecolors = _aplatir(facecolors)
+        if len(edgecolors):
+            edgecolors = _aplatir(edgecolors)
+        self._renderer.draw_path_collection(gc, master_transform, paths, all_transforms, offsets, offset_trans, facecolors, edgecolors, *args, **kwargs)
+
+
+class CanevasApercu(FigureCanvasAgg):
+    """Canevas Agg dont le rendu est un RenduApercu"""
+
+    def __init__(self, figure, seuil_texte=SEUIL_TEXTE_APERCU):
+        self.seuil_texte = seuil_texte
+        super().__init__(figure)
+
+    def get_renderer(self):
+        largeur, hauteur = self.get_width_height(physical=True)
+        cle = largeur, hauteur, self.figure.dpi
+        if self._lastKey != cle:
+            self.renderer = RenduApercu(largeur, hauteur, self.figure.dpi, self.seuil_texte)
+            self._lastKey = cle
+        return self.renderer
+
+
+def _petits_textes(fig, dpi, seuil):
+    """Textes visibles de `fig` dont le corps fait moins de `seuil` pixels à `dpi`"""
+    return [t for t in fig.findobj(Text) if t.get_visible() and t.get_text() and t.get_size() * dpi / 72 < seuil]
+
+
+def dpi_ecran(largeur, hauteur, dpi_max=DPI_APERCU):
+    """Résolution d'une image de `largeur` x `hauteur` pouces qui tient dans le cadre écran"""
+    return min(dpi_max, LARGEUR_ECRAN_PX / largeur, HAUTEUR_MAX_ECRAN_PX / hauteur)
+
+
+def zone_detail(ax, y0, y1):
+    """Bande de `ax` entre les ordonnées y0 et y1 (données), en pouces de figure"""
+    ax.apply_aspect()
+    boite = ax.bbox
+    (_, bas), (_, haut) = ax.transData.transform([(0, y0), (0, y1)])
+    bas, haut = max(min(bas, haut), boite.y0), min(max(bas, haut), boite.y1)
+    return Bbox.from_extents(boite.x0, bas, boite.x1, haut).transformed(ax.figure.dpi_scale_trans.inverted())
+
+
+def rendre_apercu(fig, dpi=None, seuil_texte=SEUIL_TEXTE_APERCU, zone=None):
+    """
+    PNG simplifié de `fig` pour l'écran (voir RenduApercu), petits textes
+    masqués. La figure est rendue à l'identique ensuite : les exports PDF et
+    PNG restent en pleine qualité. Les textes masqués et le canevas remplacé
+    le sont sous verrou_figure : un export ne voit jamais la figure modifiée.
+
+    Sans `dpi`, la résolution fait tenir l'image dans le cadre écran : le
+    nombre de pixels est borné quelle que soit la taille de la figure. Avec
+    `zone` (voir zone_detail), seule cette partie de la figure est rendue,
+    jusqu'à DPI_DETAIL. Si le rendu simplifié échoue (RenduApercu s'appuie
+    sur des internes de matplotlib), l'aperçu est rendu en Agg complet.
+    """
+    if zone is None:
+        dpi = dpi or dpi_ecran(*fig.get_size_inches())
+    else:
+        dpi = dpi or dpi_ecran(zone.width, zone.height, DPI_DETAIL)
+    with verrou_figure(fig):
+        masques = _petits_textes(fig, dpi, seuil_texte)
+        canevas = fig.canvas
+        try:
+            for t in masques:
+                t.set_visible(False)
+            cadre = 'tight' if zone is None else zone
+            try:
+                buf = io.BytesIO()
+                CanevasApercu(fig, seuil_texte).print_figure(buf, format='png', dpi=dpi, bbox_inches=cadre)
+            except (AttributeError, TypeError):
+                # Internes de RendererAgg / FigureCanvasAgg modifiés : aperçu Agg ordinaire
+                buf = io.BytesIO()
+                FigureCanvasAgg(fig).print_figure(buf, format='png', dpi=dpi, bbox_inches=cadre)
+            return buf.getvalue()
+        finally:
+            for t in masques:
+                t.set_visible(True)
+            fig.set_canvas(canevas)
+
+
+# Images des fonds statiques, partagées par les sessions (une image fait 10 à 50 Mio)
+CACHE_FOND = CacheExport(256 * 1024 * 1024, mesure=lambda image: image.nbytes)
+
+
+class FondStatique(Artist):
+    """
+    Couche statique d'un plan (bâtiment, allées, fond du stock, orientation,
+    cotes), tracée par `tracer(ax)` et ne dépendant que de `cle` (géométrie).
+
+    Rendu matriciel (aperçu, PNG) : la couche est rendue une fois par clé,
+    résolution, mode (aperçu simplifié ou non) et cadrage, puis recopiée telle quelle dans le tampon avant
+    la couche des matières. Rendu vectoriel (PDF, SVG) : ses artistes sont
+    tracés normalement. Les textes doivent rester dans les limites de l'axe.
+    """
+    zorder = 0
+
+    def __init__(self, ax, cle, tracer, cache=CACHE_FOND):
+        super().__init__()
+        self.cle = cle
+        self.tracer = tracer
+        self.cache = cache
+        # Artistes vectoriels : tracés sur l'axe puis rattachés à la couche
+        avant = set(ax.get_children())
+        tracer(ax)
+        self.artistes = [a for a in ax.get_children() if a not in avant]
+        for a in self.artistes:
+            a.remove()
+            a.axes = ax
+            a.set_figure(ax.figure)
+        self.artistes.sort(key=lambda a: a.get_zorder())
+        self.axes = ax
+        self.set_figure(ax.figure)
+
+    def get_window_extent(self, renderer=None):
+        return Bbox.union([a.get_window_extent(renderer) for a in self.artistes] or [Bbox.null()])
+
+    def _image(self, largeur, hauteur, dpi, position, seuil_texte=None):
+        """
+        Couche seule sur fond blanc opaque ; `position` : axe dans l'image
+        (fractions), au pixel près. Avec `seuil_texte`, rendu simplifié de l'aperçu.
+        """
+        fig = Figure(figsize=(largeur / dpi, hauteur / dpi), dpi=dpi)
+        ax = fig.add_axes(position)
+        ax.set_xlim(self.axes.get_xlim())
+        ax.set_ylim(self.axes.get_ylim())
+        ax.axis('off')
+        self.tracer(ax)
+        if seuil_texte is None:
+            canvas = FigureCanvasAgg(fig)
+        else:
+            for t in _petits_textes(fig, dpi, seuil_texte):
+                t.set_visible(False)
+            canvas = CanevasApercu(fig, seuil_texte)
+        canvas.draw()
+        return np.asarray(canvas.buffer_rgba()).copy()
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        if not isinstance(renderer, RendererAgg):
+            for a in self.artistes:
+                a.draw(renderer)
+            return
+        # Pixels entiers qui contiennent l'axe ; le décalage fractionnaire est
+        # reproduit dans l'image pour que les traits tombent sur les mêmes pixels
+        boite = self.axes.bbox
+        x0, y0 = math.floor(boite.x0), math.floor(boite.y0)
+        largeur, hauteur = math.ceil(boite.x1) - x0, math.ceil(boite.y1) - y0
+        position = ((boite.x0 - x0) / largeur, (boite.y0 - y0) / hauteur, boite.width / largeur, boite.height / hauteur)
+        seuil = renderer.seuil_texte if isinstance(renderer, RenduApercu) else None
+        cle = (self.cle, largeur, hauteur, renderer.dpi, seuil, tuple(np.round(position, 4)), tuple(np.round(self.axes.viewLim.bounds, 6)))
+        image = self.cache.obtenir(cle, lambda: self._image(largeur, hauteur, renderer.dpi, position, seuil))
+
+        # Copie directe (pas de mélange alpha) : la couche est la première dessinée
+        tampon = np.asarray(renderer.buffer_rgba())
+        haut = tampon.shape[0] - (y0 + hauteur)
+        ix, iy = max(0, -x0), max(0, -haut)
+        x1, y1 = min(tampon.shape[1], x0 + largeur), min(tampon.shape[0], haut + hauteur)
+        if x1 > x0 + ix and y1 > haut + iy:
+            tampon[haut + iy:y1, x0 + ix:x1] = image[iy:y1 - haut, ix:x1 - x0]
+        self.stale = False
+
+
+def fond_statique(ax, cle, tracer):
+    """Ajoute à `ax` la couche statique tracée par `tracer(ax)`, mise en cache sous `cle`"""
+    fond = FondStatique(ax, cle, tracer)
+    ax.add_artist(fond)
+    return fond
+
+
+def _rgba(couleurs, alpha):
+    """Couleurs (N x 4) avec l'alpha de `alpha`, comme to_rgba(couleur, alpha)"""
+    couleurs = np.array(couleurs, dtype=float).reshape(-1, 4)
+    couleurs[:, 3] = alpha
+    return couleurs
+
+
+def dessiner_plan(ax, plan, styles, clip_path=None, borne=False):
+    """
+    Dessine les éléments d'un ResultatImplantation, une couche par type, à
+    partir de son tableau (plan.tableau) : couleurs, alertes et sommets sont
+    calculés sur les colonnes, sans boucle sur les éléments.
+
+    `styles` associe chaque type d'élément à ses options : alpha, hatch,
+    linewidth, color (sinon couleur de la matière) et edge_adapte (bord des
+    lots en forme « Adapté »). Les types absents de `styles` ne sont pas
+    dessinés ; l'ordre de `styles` donne l'ordre d'empilement des couches.
+    Avec `borne`, un élément qui commence au-delà du bâtiment est ignoré.
+    """
+    from implantation.moteur.tableau import ADAPTE, DEPASSEMENT
+
+    tableau = plan.tableau
+    limite = plan.parametres.bat_longueur
+    couleurs_matieres = np.array([to_rgba(plan.matieres[nom]['color']) for nom in tableau.matieres]).reshape(-1, 4)
+
+    artistes = []
+    for type_element, style in styles.items():
+        r = tableau.du_type(type_element)
+        if borne:
+            r = r[r["y"] <= limite]
+        if not len(r):
+            continue
+        alpha = style.get('alpha', 1.0)
+        if style.get('color'):
+            fc = _rgba(np.tile(to_rgba(style['color']), (len(r), 1)), alpha)
+        else:
+            fc = _rgba(couleurs_matieres[r["matiere"]], alpha)
+        adapte = (r["drapeaux"] & ADAPTE) > 0
+        ec = _rgba(np.where(adapte[:, None], to_rgba(style.get('edge_adapte', 'black')), to_rgba('black')), alpha)
+        depasse = (r["drapeaux"] & DEPASSEMENT) > 0
+        fc[depasse] = to_rgba(COULEUR_DEPASSEMENT, alpha)
+        ec[depasse] = to_rgba(BORD_DEPASSEMENT, alpha)
+
+        verts = _sommets(r["x"], r["y"], r["w"], r["h"])
+        linewidth = rcParams['patch.linewidth'] if style.get('linewidth') is None else style['linewidth']
+
+        # Une hachure prend la couleur du bord : une collection par couleur de bord
+        hatch = style.get('hatch')
+        if hatch:
+            bords, premiers, groupe = np.unique(ec, axis=0, return_index=True, return_inverse=True)
+            groupes = [groupe.reshape(-1) == g for g in np.argsort(premiers)]
+        else:
+            groupes = [slice(None)]
+        for sel in groupes:
+            coll = PolyCollection(verts[sel], facecolors=fc[sel], edgecolors=ec[sel], linewidths=linewidth, hatch=hatch)
+            if clip_path is not None:
+                coll.set_clip_path(clip_path)
+            ax.add_collection(coll, autolim=False)
+            artistes.append(coll)
+    return artistes
+
+
+def figure_plan(plan, styles=STYLES_DEFAUT, titre=None):
+    """
+    Figure autonome d'un ResultatImplantation (bâtiment, allées, tas), sans
+    pyplot : utilisable hors Streamlit et libérée avec la figure.
+    """
+    p = plan.parametres
+    fig = Figure(figsize=(10, max(6, 10 * p.bat_longueur / max(p.bat_largeur, 1))))
+    ax = fig.add_subplot()
+    clip_box = Rectangle((0, 0), p.bat_largeur, p.bat_longueur, transform=ax.transData)
+    ax.add_patch(Rectangle((0, 0), p.bat_largeur, p.bat_longueur, edgecolor='black', facecolor='white', lw=2))
+    for cle, x in plan.zones.items():
+        if cle.startswith('x_allee'):
+            ax.add_patch(Rectangle((x, 0), p.largeur_allee, p.bat_longueur, color='#e0e0e0', alpha=0.5, hatch='//'))
+    dessiner_plan(ax, plan, styles, clip_path=clip_box, borne=True)
+    ax.set_xlim(min(-2, *(x - 2 for c, x in plan.zones.items() if c.startswith('x_allee'))), p.bat_largeur + 2)
+    ax.set_ylim(-2, max(p.bat_longueur, plan.longueur_utilisee) + 2)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.set_title(titre or f"{plan.variante} - {p.bat_largeur}m x {p.bat_longueur}m", fontweight='bold')
+    return fig
+
+
+# Carte de faisabilité : marge saturée à ±MARGE_CARTE m pour garder du contraste près de la frontière
+MARGE_CARTE = 30.0
+
+
+def carte_faisabilite(res, courant=None, marge=True, dpi=DPI_APERCU):
+    """
+    PNG de la carte largeur x longueur d'un ResultatBalayage (axes
+    bat_longueur puis bat_largeur) : marge de longueur colorée (vert : tient,
+    rouge : manque de longueur) ou seule faisabilité, frontière marge = 0
+    tracée. `courant` : (largeur, longueur) du bâtiment affiché.
+    """
+    largeurs, longueurs = res.axes["bat_largeur"], res.axes["bat_longueur"]
+    demi_l, demi_h = (largeurs[1] - largeurs[0]) / 2, (longueurs[1] - longueurs[0]) / 2
+    etendue = (largeurs[0] - demi_l, largeurs[-1] + demi_l, longueurs[0] - demi_h, longueurs[-1] + demi_h)
+    valeurs = res.marge_longueur
+
+    fig = Figure(figsize=(7, 6))
+    ax = fig.add_subplot()
+    if marge:
+        image = ax.imshow(np.clip(valeurs, -MARGE_CARTE, MARGE_CARTE), origin='lower', extent=etendue, aspect='auto',
+                          cmap='RdYlGn', vmin=-MARGE_CARTE, vmax=MARGE_CARTE, interpolation='nearest')
+        fig.colorbar(image, ax=ax, label=f"Marge de longueur (m, bornée à ±{MARGE_CARTE:g})")
+    else:
+        ax.imshow(valeurs >= 0, origin='lower', extent=etendue, aspect='auto',
+                  cmap='RdYlGn', vmin=-0.5, vmax=1.5, interpolation='nearest')
+    ax.contour(largeurs, longueurs, valeurs, levels=[0], colors='black', linewidths=1.5)
+    if courant is not None:
+        ax.plot(*courant, marker='o', color='white', markeredgecolor='black', markersize=9)
+    ax.set_xlabel("Largeur bâtiment (m)")
+    ax.set_ylabel("Longueur bâtiment (m)")
+    buf = io.BytesIO()
+    FigureCanvasAgg(fig).print_figure(buf, format='png', dpi=dpi, bbox_inches='tight')
+    return buf.getvalue()
@@ -0,0 +1,107 @@
+"""Exports PDF/PNG générés à la demande, avec un cache LRU borné en mémoire."""
+
+import hashlib
+import io
+import json
+import threading
+import weakref
+from collections import OrderedDict
+
+# Plafond mémoire du cache partagé par toutes les sessions (octets)
+CAPACITE_CACHE_DEFAUT = 64 * 1024 * 1024
+
+
+def cle_parametres(*args, **kwargs):
+    """Empreinte stable (sha1) d'un jeu de paramètres de plan"""
+    contenu = json.dumps([args, sorted(kwargs.items())], sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha1(contenu.encode("utf-8")).hexdigest()
+
+
+class CacheExport:
+    """Cache LRU d'octets d'export, borné par la taille totale stockée"""
+
+    def __init__(self, capacite_octets=CAPACITE_CACHE_DEFAUT, mesure=len):
+        self.capacite_octets = capacite_octets
+        # Taille d'une valeur en octets (len pour des bytes, nbytes pour un tableau)
+        self.mesure = mesure
+        self._entrees = OrderedDict()
+        self._taille = 0
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._entrees)
+
+    @property
+    def taille(self):
+        return self._taille
+
+    def obtenir(self, cle, generer):
+        """Renvoie les octets associés à `cle`, en appelant `generer()` si absents"""
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                return self._entrees[cle]
+
+        # Rendu hors verrou : un export lent ne bloque pas les autres sessions
+        donnees = generer()
+
+        with self._verrou:
+            taille = self.mesure(donnees)
+            if cle not in self._entrees and taille <= self.capacite_octets:
+                self._entrees[cle] = donnees
+                self._taille += taille
+                # Éviction des entrées les moins récemment utilisées
+                while self._taille > self.capacite_octets:
+                    _, ancien = self._entrees.popitem(last=False)
+                    self._taille -= self.mesure(ancien)
+        return donnees
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+            self._taille = 0
+
+
+# Instance partagée : le module reste chargé entre les reruns Streamlit
+CACHE_EXPORT = CacheExport()
+
+
+# Un verrou par figure : aperçu (petits textes masqués, canevas remplacé) et
+# exports rendus depuis les threads du serveur ne se chevauchent pas
+_VERROUS_FIGURE = weakref.WeakKeyDictionary()
+_VERROU_VERROUS = threading.Lock()
+
+
+def verrou_figure(fig):
+    """Verrou (réentrant) à tenir pendant tout rendu de `fig`"""
+    with _VERROU_VERROUS:
+        return _VERROUS_FIGURE.setdefault(fig, threading.RLock())
+
+
+def rendre_figure(fig, format, **options):
+    """Sérialise une figure matplotlib en octets (pdf, png, ...)"""
+    buf = io.BytesIO()
+    with verrou_figure(fig):
+        fig.savefig(buf, format=format, bbox_inches='tight', **options)
+    return buf.getvalue()
+
+
+def export_differe(fig, cle, format, cache=CACHE_EXPORT, depot=None, **options):
+    """
+    Prépare un export sans le calculer : renvoie une fonction sans argument
+    (utilisable comme `data` de st.download_button) qui ne rend la figure
+    qu'au clic, puis la conserve dans le cache sous la clé des paramètres.
+    Avec `depot` (DepotResultats), le rendu est aussi conservé sur disque
+    et partagé entre sessions et processus.
+    """
+    cle_export = cle_parametres(cle, format, **options)
+
+    def rendre():
+        if depot is None:
+            return rendre_figure(fig, format, **options)
+        return depot.obtenir(cle_export, lambda: rendre_figure(fig, format, **options))
+
+    def generer():
+        return cache.obtenir(cle_export, rendre)
+
+    return generer
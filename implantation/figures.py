@@ -0,0 +1,22 @@
+"""
+Cycle de vie des figures des simulateurs.
+
+Les figures sont créées hors pyplot : aucun registre global ne les retient,
+et la fermeture globale de Streamlit après chaque rerun (plt.close("all"),
+commune à toutes les sessions) ne les concerne pas. Chaque session garde
+la seule figure de son dernier rerun, celle que relisent les fragments
+(aperçu, exports) ; la précédente est libérée dès qu'elle est remplacée.
+
+    fig, ax = figure_session("plan2allees-1", figsize=(14, 18))
+"""
+
+import streamlit as st
+from matplotlib.figure import Figure
+
+
+def figure_session(nom, figsize):
+    """(fig, ax) neufs pour ce rerun ; remplace la figure du rerun précédent de la session"""
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    st.session_state[f"_figure_{nom}"] = fig
+    return fig, ax
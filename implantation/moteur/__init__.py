@@ -0,0 +1,49 @@
+"""
+Moteur d'implantation : dimensionnement et placement des matières,
+sans dépendance à Streamlit ni à matplotlib.
+
+    from implantation.moteur import STRATEGIES, Parametres
+    res = STRATEGIES["deux_allees"].calculer(Parametres(bat_longueur=80))
+    res.longueur_utilisee, res.depassement
+"""
+
+from .base import Strategie
+from .deux_allees import DeuxAllees
+from .deux_allees_groupees import DeuxAlleesGroupees
+from .parametres import (
+    ALIGNEMENT_ALLEE,
+    ALIGNEMENT_MUR,
+    LOI_STOCK_CONTINUE,
+    MIN_LONGUEUR_LOT_Y,
+    NB_LOTS,
+    ORDRE_PAM_FONTES,
+    RECETTE_DEFAUT,
+    Matiere,
+    Parametres,
+    jours_stock_defaut,
+    jours_stock_loi,
+    ordonner_recette,
+    recette,
+)
+from .resultat import PASSAGE, SECHAGE, STOCK, Bande, Element, ResultatImplantation
+from .une_allee_scindee import UneAlleeScindee
+from .une_allee_sequentielle import UneAlleeSequentielle
+
+# Une stratégie par variante de plan
+STRATEGIES = {
+    s.nom: s for s in (UneAlleeScindee(), UneAlleeSequentielle(), DeuxAllees(), DeuxAlleesGroupees())
+}
+
+
+def calculer(parametres, variante, ordre=None):
+    """Calcule l'implantation de `parametres` avec la variante nommée"""
+    return STRATEGIES[variante].calculer(parametres, ordre)
+
+
+__all__ = [
+    "ALIGNEMENT_ALLEE", "ALIGNEMENT_MUR", "LOI_STOCK_CONTINUE", "MIN_LONGUEUR_LOT_Y", "NB_LOTS", "ORDRE_PAM_FONTES", "RECETTE_DEFAUT",
+    "PASSAGE", "SECHAGE", "STOCK", "STRATEGIES",
+    "Bande", "DeuxAllees", "DeuxAlleesGroupees", "Element", "Matiere", "Parametres",
+    "ResultatImplantation", "Strategie", "UneAlleeScindee", "UneAlleeSequentielle",
+    "calculer", "jours_stock_defaut", "jours_stock_loi", "ordonner_recette", "recette",
+]
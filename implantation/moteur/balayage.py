@@ -0,0 +1,286 @@
+"""
+Balayage vectorisé (NumPy) d'une variante sur une grille de paramètres.
+
+Chaque variante a son noyau vectorisé, qui reproduit le dimensionnement et
+l'empilement `curseur_y` de sa stratégie sur des tableaux : tous les champs
+numériques de Parametres (et les pourcentages/densités de la recette) peuvent
+être des tableaux NumPy diffusables. Seuls les indicateurs sont calculés
+(longueur utilisée, dépassement, formes « Adapté »), pas les éléments placés.
+L'ordre passé à Strategie.calculer (noms, et paires gauche / droite en deux
+allées) s'applique de la même façon.
+
+    res = balayer("deux_allees", STRATEGIES["deux_allees"].defaut,
+                  bat_largeur=np.arange(30, 101), largeur_stock=np.arange(4, 20.5, 0.5))
+    res.longueur_utilisee.shape  # (71, 33)
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .dimensionnement import surface_sechage, surface_stock
+from .parametres import NB_LOTS
+
+
+def _dimensions_lot(surface, width_max, min_y):
+    """calculer_dimensions_lot vectorisé : (h, w, adapte)"""
+    y_theorique = surface / width_max
+    adapte = y_theorique < min_y
+    return np.where(adapte, min_y, y_theorique), np.where(adapte, surface / min_y, width_max), adapte
+
+
+def _forme_lot(surf_un_lot, width_base, largeur_passage, min_y):
+    """forme_lot vectorisé : (final_X, final_Y_lot, final_Y_mat, adapte)"""
+    Y_mat_theo = surf_un_lot / width_base
+    Y_lot_theo = Y_mat_theo + largeur_passage
+    adapte = Y_lot_theo < min_y
+    Y_mat_dispo = np.maximum(0.1, min_y - largeur_passage)
+    return (
+        np.where(adapte, surf_un_lot / Y_mat_dispo, width_base),
+        np.where(adapte, min_y, Y_lot_theo),
+        np.where(adapte, Y_mat_dispo, Y_mat_theo),
+        adapte,
+    )
+
+
+def _forme(p):
+    """Forme commune (broadcast) de tous les champs tableaux de p"""
+    valeurs = [getattr(p, nom) for nom in p.__dataclass_fields__ if nom not in ("recette", "loi_stock")]
+    valeurs += [v for m in p.recette for v in (m.pourcentage, m.densite)]
+    return np.broadcast_shapes(*(np.shape(v) for v in valeurs))
+
+
+def _totaux(p, forme):
+    surf_sech = np.zeros(forme)
+    surf_stk = np.zeros(forme)
+    for m in p.recette:
+        surf_sech = surf_sech + surface_sechage(p, m)
+        surf_stk = surf_stk + surface_stock(p, m)
+    return surf_sech, surf_stk
+
+
+# ==========================================
+# NOYAUX PAR VARIANTE
+# ==========================================
+
+def _niveaux(p, ordre):
+    """
+    Niveaux le long de Y en Matiere : toute la recette sans ordre ; sinon les
+    niveaux de `ordre`, une paire restant un tuple de deux Matiere (une paire
+    dont une seule matière est dans la recette devient un niveau simple).
+    """
+    if ordre is None:
+        return list(p.recette)
+    par_nom = {m.nom: m for m in p.recette}
+    niveaux = []
+    for niveau in ordre:
+        presents = tuple(par_nom[nom] for nom in (niveau if isinstance(niveau, tuple) else (niveau,)) if nom in par_nom)
+        if len(presents) == 2:
+            niveaux.append(presents)
+        else:
+            niveaux.extend(presents)
+    return niveaux
+
+
+def _une_allee_scindee(p, forme, niveaux):
+    largeur_dispo = p.bat_largeur - p.largeur_allee - p.marge_securite
+    largeur_sechage = np.maximum(0.1, largeur_dispo - p.largeur_stock)
+
+    curseur_g = np.zeros(forme)
+    curseur_d = np.zeros(forme)
+    fin = np.zeros(forme)
+    for m in niveaux:
+        actif = np.asarray(m.pourcentage) > 0
+        l_jour = surface_sechage(p, m) / largeur_sechage / NB_LOTS
+        h_bloc = (NB_LOTS * l_jour) + ((NB_LOTS - 1) * p.espace_inter_lot)
+        l_stock = surface_stock(p, m) / p.largeur_stock
+
+        fin = np.maximum(fin, np.where(actif, np.maximum(curseur_g + h_bloc, curseur_d + l_stock), 0))
+        curseur_g = np.where(actif, curseur_g + h_bloc + p.espace_inter_matiere, curseur_g)
+        curseur_d = np.where(actif, curseur_d + l_stock + p.espace_inter_matiere, curseur_d)
+    return fin, np.zeros(forme, dtype=int)
+
+
+def _une_allee_sequentielle(p, forme, niveaux):
+    largeur_utile = p.bat_largeur if p.largeur_utile is None else p.largeur_utile
+    largeur_max_x = np.maximum(1.0, largeur_utile - (2 * p.marge_securite))
+
+    curseur = np.zeros(forme)
+    fin = np.zeros(forme)
+    nb_adaptes = np.zeros(forme, dtype=int)
+    for m in niveaux:
+        actif = np.asarray(m.pourcentage) > 0
+        h_jour, _, adapt_jour = _dimensions_lot(surface_sechage(p, m) / NB_LOTS, largeur_max_x, p.min_longueur_lot)
+        h_stock, _, adapt_stock = _dimensions_lot(surface_stock(p, m), largeur_max_x, p.min_longueur_lot)
+
+        # J1 > J2 > J3 > Stock
+        bloc = NB_LOTS * (h_jour + p.espace_inter_phase) + h_stock
+        fin = np.maximum(fin, np.where(actif, curseur + bloc, 0))
+        curseur = np.where(actif, curseur + bloc + p.espace_inter_matiere, curseur)
+        nb_adaptes += actif & (adapt_jour | adapt_stock)
+    return fin, nb_adaptes
+
+
+def _largeur_aile(p):
+    largeur_structure_centrale = (p.largeur_allee * 2) + p.largeur_stock + (p.marge_securite * 2)
+    return np.maximum(0.1, (p.bat_largeur - largeur_structure_centrale) / 2)
+
+
+def _bloc_deux_allees(p, m, width_base, cotes):
+    """(h_bloc, fin relative du dernier lot, Y_lot, adapte) d'une matière séchée sur `cotes` côtés"""
+    surf_un_lot = (surface_sechage(p, m) / cotes) / NB_LOTS
+    _, Y_lot, Y_mat, adapte = _forme_lot(surf_un_lot, width_base, p.largeur_passage, p.min_longueur_lot)
+    h_bloc = (NB_LOTS * Y_lot) + ((NB_LOTS - 1) * p.espace_inter_lot)
+    # Dernier lot : matière / passage / matière (peut dépasser Y_lot si le passage est très large)
+    fin_lots = (NB_LOTS - 1) * (Y_lot + p.espace_inter_lot) + Y_mat + p.largeur_passage
+    return h_bloc, fin_lots, adapte
+
+
+def _empiler_classique(p, matieres, width_base, curseur, fin, nb_adaptes):
+    """Empilement DeuxAllees : séchage des deux côtés, stock central centré sur le bloc"""
+    for m in matieres:
+        actif = np.asarray(m.pourcentage) > 0
+        h_bloc, fin_lots, adapte = _bloc_deux_allees(p, m, width_base, 2)
+        len_stock = surface_stock(p, m) / p.largeur_stock
+        fin_stock = curseur + h_bloc / 2 + len_stock / 2
+
+        fin = np.maximum(fin, np.where(actif, np.maximum(curseur + fin_lots, fin_stock), 0))
+        curseur = np.where(actif, np.maximum(curseur + h_bloc, fin_stock) + p.espace_inter_matiere, curseur)
+        nb_adaptes = nb_adaptes + (actif & adapte)
+    return curseur, fin, nb_adaptes
+
+
+def _empiler_paire(p, gauche, droite, width_base, curseur, fin, nb_adaptes):
+    """Paire DeuxAllees : séchage de `gauche` à gauche, de `droite` à droite, stock central scindé"""
+    h_g, fin_lots_g, adapte_g = _bloc_deux_allees(p, gauche, width_base, 1)
+    h_d, fin_lots_d, adapte_d = _bloc_deux_allees(p, droite, width_base, 1)
+    len_g = surface_stock(p, gauche) / (p.largeur_stock / 2)
+    len_d = surface_stock(p, droite) / (p.largeur_stock / 2)
+    max_h_needed = np.maximum(np.maximum(h_g, h_d), np.maximum(len_g, len_d))
+    fin_niveau = np.maximum(np.maximum(fin_lots_g, fin_lots_d), max_h_needed / 2 + np.maximum(len_g, len_d) / 2)
+    return (
+        curseur + max_h_needed + p.espace_inter_matiere,
+        np.maximum(fin, curseur + fin_niveau),
+        nb_adaptes + adapte_g + adapte_d,
+    )
+
+
+def _empiler_niveaux(p, niveaux, width_base, curseur, fin, nb_adaptes):
+    """
+    Empilement DeuxAllees.placer : matière seule (classique) ou paire, qui
+    ne partage un niveau que si ses deux matières sont actives.
+    """
+    for niveau in niveaux:
+        if isinstance(niveau, tuple):
+            actif = (np.asarray(niveau[0].pourcentage) > 0) & (np.asarray(niveau[1].pourcentage) > 0)
+            paire = _empiler_paire(p, *niveau, width_base, curseur, fin, nb_adaptes)
+            seules = _empiler_classique(p, niveau, width_base, curseur, fin, nb_adaptes)
+            curseur, fin, nb_adaptes = (np.where(actif, a, b) for a, b in zip(paire, seules))
+        else:
+            curseur, fin, nb_adaptes = _empiler_classique(p, (niveau,), width_base, curseur, fin, nb_adaptes)
+    return curseur, fin, nb_adaptes
+
+
+def _deux_allees(p, forme, niveaux):
+    _, fin, nb_adaptes = _empiler_niveaux(
+        p, niveaux, _largeur_aile(p), np.zeros(forme), np.zeros(forme), np.zeros(forme, dtype=int)
+    )
+    return fin, nb_adaptes
+
+
+def _deux_allees_groupees(p, forme, niveaux, groupe=("Rebuts PAM", "Fontes Foug")):
+    width_base = _largeur_aile(p)
+    par_nom = {m.nom: m for m in p.recette}
+    zeros = np.zeros(forme)
+
+    # Branche sans groupe (ou paires explicites de l'ordre) : niveaux tels quels
+    _, fin_b, adapt_b = _empiler_niveaux(p, niveaux, width_base, zeros, zeros, np.zeros(forme, dtype=int))
+    if not all(nom in par_nom for nom in groupe) or any(isinstance(n, tuple) for n in niveaux):
+        return fin_b, adapt_b
+
+    # Branche groupe : le groupe en tête sur un seul niveau, puis les autres matières
+    gauche, droite = (par_nom[nom] for nom in groupe)
+    actif_groupe = (np.asarray(gauche.pourcentage) > 0) & (np.asarray(droite.pourcentage) > 0)
+    autres = [m for m in niveaux if m.nom not in groupe]
+    _, fin_a, adapt_a = _empiler_niveaux(p, [(gauche, droite)] + autres, width_base, zeros, zeros, np.zeros(forme, dtype=int))
+    return np.where(actif_groupe, fin_a, fin_b), np.where(actif_groupe, adapt_a, adapt_b)
+
+
+NOYAUX = {
+    "une_allee_scindee": _une_allee_scindee,
+    "une_allee_sequentielle": _une_allee_sequentielle,
+    "deux_allees": _deux_allees,
+    "deux_allees_groupees": _deux_allees_groupees,
+}
+
+
+def evaluer_vectorise(variante, p, ordre=None):
+    """
+    Indicateurs d'une variante pour un Parametres dont les champs peuvent être
+    des tableaux, avec l'`ordre` de Strategie.calculer. Renvoie un dict de
+    tableaux de même forme.
+    """
+    forme = _forme(p)
+    longueur, nb_adaptes = NOYAUX[variante](p, forme, _niveaux(p, ordre))
+    surf_sech, surf_stk = _totaux(p, forme)
+    longueur = np.broadcast_to(longueur, forme)
+    return {
+        "longueur_utilisee": longueur,
+        "depassement": longueur > p.bat_longueur,
+        "nb_adaptes": np.broadcast_to(nb_adaptes, forme),
+        "surf_sechage_tot": surf_sech,
+        "surf_stock_tot": surf_stk,
+    }
+
+
+@dataclass
+class ResultatBalayage:
+    variante: str
+    base: object
+    # Axes de la grille, dans l'ordre des dimensions des tableaux
+    axes: dict = field(default_factory=dict)
+    longueur_utilisee: np.ndarray = None
+    depassement: np.ndarray = None
+    nb_adaptes: np.ndarray = None
+    surf_sechage_tot: np.ndarray = None
+    surf_stock_tot: np.ndarray = None
+
+    def __len__(self):
+        return self.longueur_utilisee.size
+
+    @property
+    def forme(self):
+        return self.longueur_utilisee.shape
+
+    @property
+    def marge_longueur(self):
+        """Longueur restante (négative si dépassement)"""
+        return np.broadcast_to(self._champ("bat_longueur"), self.forme) - self.longueur_utilisee
+
+    def _champ(self, nom):
+        if nom in self.axes:
+            dims = [1] * len(self.axes)
+            dims[list(self.axes).index(nom)] = -1
+            return np.reshape(self.axes[nom], dims)
+        return getattr(self.base, nom)
+
+    def parametres(self, index):
+        """Parametres scalaires d'un point de la grille (index multidimensionnel)"""
+        return self.base.avec(**{nom: float(valeurs[i]) for (nom, valeurs), i in zip(self.axes.items(), index)})
+
+
+def balayer(variante, base, ordre=None, **grilles):
+    """
+    Évalue `variante` sur le produit cartésien des valeurs de `grilles`
+    (nom de champ de Parametres -> séquence de valeurs), les autres champs
+    étant pris dans `base`, avec l'`ordre` de Strategie.calculer.
+    """
+    axes = {nom: np.asarray(valeurs, dtype=float) for nom, valeurs in grilles.items()}
+    # Grille creuse : chaque axe garde sa propre dimension, NumPy diffuse le reste
+    dims = {}
+    for i, (nom, valeurs) in enumerate(axes.items()):
+        forme = [1] * len(axes)
+        forme[i] = valeurs.size
+        dims[nom] = valeurs.reshape(forme)
+    p = base.avec(**dims)
+    return ResultatBalayage(variante=variante, base=base, axes=axes, **evaluer_vectorise(variante, p, ordre))
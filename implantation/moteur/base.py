@@ -0,0 +1,82 @@
+"""Interface commune des stratégies d'implantation."""
+
+from .dimensionnement import surface_sechage, surface_stock
+from .parametres import Parametres
+from .resultat import Element, ResultatImplantation
+
+
+class Strategie:
+    """
+    Une variante de plan : dimensionnement des matières, géométrie fixe du
+    bâtiment, puis placement des blocs le long de Y (curseur_y).
+    """
+    nom = None
+    titre = None
+    # Valeurs par défaut de la barre latérale de l'application correspondante
+    defaut = Parametres()
+
+    def matieres_actives(self, p):
+        return [m for m in p.recette if m.pourcentage > 0]
+
+    def surfaces(self, p):
+        """(nom, couleur, surface séchage, surface stock) par matière active"""
+        return tuple(
+            (m.nom, m.couleur, surface_sechage(p, m), surface_stock(p, m))
+            for m in self.matieres_actives(p)
+        )
+
+    def dimensionner(self, p, *args):
+        """Dimensions par matière (dict nom -> dict)"""
+        return self.dimensionner_depuis(self.surfaces(p), p, *args)
+
+    def dimensionner_depuis(self, surfaces, p):
+        """Dimensions par matière à partir de `surfaces` (voir surfaces) et de la géométrie de `p`"""
+        raise NotImplementedError
+
+    def geometrie(self, p):
+        """Zones fixes (allées, stock, ancrages X)"""
+        raise NotImplementedError
+
+    def placer(self, p, dims, zones, ordre=None):
+        """Place les blocs ; `ordre` impose l'ordre des matières le long de Y"""
+        raise NotImplementedError
+
+    def bandes(self, p, zones):
+        """Bandes (Bande) où l'empaquetage 2D peut réarranger les tas"""
+        raise NotImplementedError
+
+    def ecart_meme_matiere(self, p):
+        """Espace entre deux tas d'une même matière (lots J1/J2/J3, stock)"""
+        return p.espace_inter_lot
+
+    def preparer(self, p, ordre=None):
+        """(arguments supplémentaires de dimensionner, ordre passé à placer)"""
+        return (), ordre
+
+    def calculer(self, p, ordre=None):
+        args, ordre = self.preparer(p, ordre)
+        dims = self.dimensionner(p, *args)
+        zones = self.geometrie(p)
+        return self.placer(p, dims, zones, ordre)
+
+    # Outils pour les sous-classes
+    def _resultat(self, p, dims, zones):
+        res = ResultatImplantation(variante=self.nom, parametres=p, matieres=dims, zones=zones)
+        res.surf_sechage_tot = sum(d["surf_sech"] for d in dims.values())
+        res.surf_stock_tot = sum(d["surf_stk"] for d in dims.values())
+        return res
+
+    @staticmethod
+    def _ordonner(dims, ordre):
+        if ordre is None:
+            return list(dims)
+        return [nom for nom in ordre if nom in dims]
+
+    @staticmethod
+    def _ajouter(res, type, x, y, w, h, **kwargs):
+        elem = Element(type, x, y, w, h, depassement=y + h > res.parametres.bat_longueur, **kwargs)
+        res.elements.append(elem)
+        return elem
+
+    def __repr__(self):
+        return f"<Strategie {self.nom}>"
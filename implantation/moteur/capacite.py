@@ -0,0 +1,135 @@
+"""
+Capacité d'un bâtiment : plus grand tonnage mensuel qu'une variante absorbe
+avant « MANQUE LONGUEUR », pour une recette et une loi d'autonomie du stock.
+
+Le flux est continu (champ `scenario` quelconque) et l'autonomie suit
+`loi_stock` (LOI_STOCK_CONTINUE par défaut : la règle 15 j / 10 j des deux
+scénarios historiques n'est pas monotone entre eux). Le solveur encadre le
+premier dépassement sur une grille de tonnages, évaluée d'un bloc, puis
+resserre l'encadrement par dichotomie : la longueur utilisée croît avec le
+tonnage dès que le tonnage stocké (flux x jours) croît. Toutes les recettes
+d'un Parametres vectorisé sont résolues ensemble (noyaux de `balayage`),
+avec l'ordre (et les paires) de Strategie.calculer. Un bâtiment qui déborde
+déjà sans flux (longueurs minimales et espacements) n'a pas de capacité :
+tonnage NaN, Capacite.faisable faux.
+
+    c = capacite("deux_allees", p, ordre=ordre)
+    c.faisable, c.tonnage, c.marge(p.scenario)
+    sensibilites("deux_allees", p)   # {matière: t/mois pour +1 point de part}
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .balayage import _forme, evaluer_vectorise
+from .parametres import LOI_STOCK_CONTINUE, Matiere
+
+# Tonnage exploré (t/mois) et précision du résultat
+TONNAGE_MAX = 50_000.0
+TOLERANCE = 1.0
+POINTS_GRILLE = 256
+
+
+@dataclass
+class Capacite:
+    variante: str
+    parametres: object  # Parametres au tonnage limite (scenario = tonnage)
+    # Plus grand tonnage mensuel sans dépassement (TONNAGE_MAX si jamais atteint,
+    # NaN si le bâtiment déborde même sans flux)
+    tonnage: float
+    # False : le bâtiment absorbe encore tonnage_max, la capacité est au-delà
+    atteinte: bool
+
+    @property
+    def faisable(self):
+        """False : longueurs minimales et espacements dépassent déjà le bâtiment à 0 t"""
+        return not math.isnan(self.tonnage)
+
+    @property
+    def tonnage_jour(self):
+        return self.tonnage / self.parametres.jours_ouvres
+
+    def marge(self, scenario):
+        """Tonnage mensuel restant au-delà de `scenario` (négatif : déjà en dépassement)"""
+        return self.tonnage - scenario
+
+
+def _longueur(variante, p, tonnages, ordre):
+    return evaluer_vectorise(variante, p.avec(scenario=tonnages), ordre)["longueur_utilisee"]
+
+
+def tonnages_maximaux(variante, p, ordre=None, tonnage_max=TONNAGE_MAX, tolerance=TOLERANCE, points=POINTS_GRILLE):
+    """
+    Tonnage limite pour chaque point d'un Parametres vectorisé (recette,
+    bâtiment... en tableaux), à `tolerance` près par défaut. Tableau de la
+    forme des champs ; tonnage_max là où rien ne dépasse, NaN là où même
+    0 t dépasse.
+    """
+    forme = _forme(p)
+    limite = np.broadcast_to(np.asarray(p.bat_longueur, dtype=float), forme)
+    # Grille : un axe de tonnages devant les axes de p
+    grille = np.linspace(0.0, tonnage_max, points + 1)
+    trop = _longueur(variante, p, grille.reshape((-1,) + (1,) * len(forme)), ordre) > limite
+    # Premier tonnage en dépassement (la grille commence à 0 : aucun flux)
+    premier = np.argmax(trop, axis=0)
+    jamais = ~trop.any(axis=0)
+    # Dépassement dès 0 t : aucun tonnage ne tient, encadrement vide
+    deborde = trop[0]
+    hi = np.where(jamais, tonnage_max, grille[premier])
+    lo = np.where(jamais | deborde, hi, grille[np.maximum(premier - 1, 0)])
+
+    # Invariant : lo tient, hi dépasse
+    while np.max(hi - lo) > tolerance:
+        mid = (lo + hi) / 2
+        ok = _longueur(variante, p, mid, ordre) <= limite
+        lo = np.where(ok, mid, lo)
+        hi = np.where(ok, hi, mid)
+    return np.where(deborde, np.nan, lo)
+
+
+def capacite(variante, p, loi=None, ordre=None, **options):
+    """
+    Capacité (Capacite) du bâtiment de `p` pour sa recette, empilée selon
+    `ordre`. `loi` : points (tonnage, jours) de l'autonomie du stock, sinon
+    celle de `p` ou LOI_STOCK_CONTINUE.
+    """
+    p = p.avec(loi_stock=loi or p.loi_stock or LOI_STOCK_CONTINUE)
+    tonnage_max = options.get("tonnage_max", TONNAGE_MAX)
+    tonnage = float(tonnages_maximaux(variante, p, ordre, **options))
+    # Infaisable : paramètres rendus à 0 t
+    faisable = not math.isnan(tonnage)
+    return Capacite(variante, p.avec(scenario=tonnage if faisable else 0.0), tonnage, atteinte=not faisable or tonnage < tonnage_max)
+
+
+def recettes_voisines(recette, delta=1.0):
+    """
+    Recette vectorisée : point 0 = `recette`, point i = part de la i-ème
+    matière active augmentée de `delta` points, les autres réduites en
+    proportion (total inchangé).
+    """
+    actives = [i for i, m in enumerate(recette) if m.pourcentage > 0]
+    total = sum(m.pourcentage for m in recette)
+    parts = np.tile([float(m.pourcentage) for m in recette], (len(actives) + 1, 1))
+    for ligne, i in enumerate(actives, start=1):
+        hausse = min(delta, total - parts[ligne, i])
+        autres = total - parts[ligne, i]
+        if autres > 0:
+            parts[ligne] *= (autres - hausse) / autres
+        parts[ligne, i] = recette[i].pourcentage + hausse
+    return tuple(Matiere(m.nom, parts[:, k], m.densite, m.couleur) for k, m in enumerate(recette)), actives
+
+
+def sensibilites(variante, p, delta=1.0, loi=None, ordre=None, **options):
+    """
+    Variation de la capacité (t/mois) quand la part d'une matière active
+    gagne `delta` points : dict nom -> écart, en une seule résolution. Vide
+    si le bâtiment déborde même sans flux.
+    """
+    voisines, actives = recettes_voisines(p.recette, delta)
+    p = p.avec(loi_stock=loi or p.loi_stock or LOI_STOCK_CONTINUE, recette=voisines)
+    tonnages = tonnages_maximaux(variante, p, ordre, **options)
+    if np.isnan(tonnages[0]):
+        return {}
+    return {p.recette[i].nom: float(tonnages[ligne] - tonnages[0]) for ligne, i in enumerate(actives, start=1)}
@@ -0,0 +1,151 @@
+"""
+Contrôle géométrique d'un plan : chevauchements, dégagements insuffisants,
+empiètements sur les allées et sorties du bâtiment, sur le tableau du plan
+(voir moteur.tableau) et d'éventuels obstacles (camions...).
+
+    conflits = controler(plan, obstacles=[("Camion allée 1", x, y, w, h)])
+    [c.libelle for c in conflits]
+
+Index spatial : balayage trié le long de Y. Les rectangles sont triés par
+début en Y ; les voisins d'un rectangle sont ceux qui commencent avant sa
+fin (plus le dégagement), trouvés par recherche dichotomique. Les paires
+candidates sont générées puis filtrées en X d'un bloc : coût en
+O(n log n + k), k paires proches en Y (quelques-unes par rectangle dans un
+plan séquentiel, une par rectangle et par allée).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .resultat import PASSAGE, SECHAGE, STOCK
+from .tableau import ALLEE, CODES, COTES
+
+# Genres de conflit
+CHEVAUCHEMENT = "chevauchement"
+DEGAGEMENT = "degagement"
+EMPIETEMENT = "empietement"
+HORS_BATIMENT = "hors_batiment"
+DEPASSEMENT = "depassement"
+
+TOLERANCE = 1e-6
+
+_OBSTACLE = -1
+
+
+@dataclass
+class Conflit:
+    genre: str
+    a: str
+    # Second élément (None pour une sortie du bâtiment)
+    b: str
+    # Profondeur du recouvrement, écart manquant ou longueur hors bâtiment (m)
+    mesure: float
+
+    @property
+    def libelle(self):
+        if self.genre == CHEVAUCHEMENT:
+            return f"{self.a} chevauche {self.b} ({self.mesure:.2f} m)"
+        if self.genre == DEGAGEMENT:
+            return f"{self.a} trop près de {self.b} (il manque {self.mesure:.2f} m)"
+        if self.genre == EMPIETEMENT:
+            return f"{self.a} empiète sur {self.b} ({self.mesure:.2f} m)"
+        if self.genre == DEPASSEMENT:
+            return f"{self.a} dépasse la longueur du bâtiment de {self.mesure:.2f} m"
+        return f"{self.a} sort du bâtiment de {self.mesure:.2f} m"
+
+
+def paires_proches(y0, y1, marge=0.0):
+    """
+    Indices (i, j) des paires de rectangles dont les intervalles Y, élargis
+    de `marge`, se recouvrent (chaque paire une fois).
+    """
+    n = len(y0)
+    ordre = np.argsort(y0, kind="stable")
+    debuts = y0[ordre]
+    # j suit i dans l'ordre trié et commence avant la fin de i (+ marge)
+    fin = np.searchsorted(debuts, y1[ordre] + marge, side="left")
+    premier = np.arange(1, n + 1)
+    nombre = np.maximum(fin - premier, 0)
+    i = np.repeat(np.arange(n), nombre)
+    j = np.arange(nombre.sum()) - np.repeat(np.cumsum(nombre) - nombre, nombre) + np.repeat(premier, nombre)
+    return ordre[i], ordre[j]
+
+
+def _libelles(plan, r):
+    noms = {CODES[SECHAGE]: "lot", CODES[PASSAGE]: "passage", CODES[STOCK]: "stock"}
+    libelles = []
+    for t, m, lot, cote in zip(r["type"].tolist(), r["matiere"].tolist(), r["lot"].tolist(), r["cote"].tolist()):
+        texte = f"{noms[t]} {plan.tableau.matieres[m]}"
+        if lot >= 0:
+            texte += f" J{lot + 1}"
+        if cote >= 0:
+            texte += f" ({COTES[cote]})"
+        libelles.append(texte)
+    return libelles
+
+
+def controler(plan, obstacles=(), degagement=None):
+    """
+    Conflits (liste de Conflit) du plan : recouvrements entre éléments placés
+    et avec les obstacles, écart inférieur à `degagement` (défaut :
+    espace_inter_matiere) entre matières différentes (sauf les deux moitiés,
+    accolées, du stock central d'une paire), éléments sur une allée, hors du
+    bâtiment ou au-delà de sa longueur. `obstacles` : (nom, x, y, w, h).
+    """
+    p = plan.parametres
+    degagement = p.espace_inter_matiere if degagement is None else degagement
+    rects = plan.tableau.rects
+    places = rects[rects["type"] != CODES[ALLEE]]
+    allees = rects[rects["type"] == CODES[ALLEE]]
+
+    libelles = _libelles(plan, places)
+    libelles += [f"allée {k + 1}" for k in range(len(allees))]
+    libelles += [o[0] for o in obstacles]
+    obs = np.array([o[1:] for o in obstacles], dtype=float).reshape(-1, 4)
+
+    x0 = np.concatenate([places["x"], allees["x"], obs[:, 0]])
+    y0 = np.concatenate([places["y"], allees["y"], obs[:, 1]])
+    x1 = x0 + np.concatenate([places["w"], allees["w"], obs[:, 2]])
+    y1 = y0 + np.concatenate([places["h"], allees["h"], obs[:, 3]])
+    # Code : type du tableau, ou _OBSTACLE ; matière et côté : -1 hors éléments placés
+    code = np.concatenate([places["type"].astype(int), allees["type"].astype(int), np.full(len(obs), _OBSTACLE)])
+    matiere = np.concatenate([places["matiere"], np.full(len(allees) + len(obs), -1)])
+    cote = np.concatenate([places["cote"], np.full(len(allees) + len(obs), -1)])
+
+    conflits = []
+    i, j = paires_proches(y0, y1, max(degagement, 0.0))
+    # Écart signé en X et en Y (négatif : recouvrement)
+    dx = np.maximum(x0[i] - x1[j], x0[j] - x1[i])
+    dy = np.maximum(y0[i] - y1[j], y0[j] - y1[i])
+    recouvre = (dx < -TOLERANCE) & (dy < -TOLERANCE)
+    profondeur = np.minimum(-dx, -dy)
+    ecart = np.hypot(np.maximum(dx, 0), np.maximum(dy, 0))
+
+    allee = CODES[ALLEE]
+    place_i, place_j = (code[i] != allee) & (code[i] != _OBSTACLE), (code[j] != allee) & (code[j] != _OBSTACLE)
+    for k in np.flatnonzero(recouvre & place_i & place_j):
+        conflits.append(Conflit(CHEVAUCHEMENT, libelles[i[k]], libelles[j[k]], float(profondeur[k])))
+    # Élément placé contre obstacle ; un obstacle dans une allée est à sa place
+    for k in np.flatnonzero(recouvre & ((place_i & (code[j] == _OBSTACLE)) | (place_j & (code[i] == _OBSTACLE)))):
+        conflits.append(Conflit(CHEVAUCHEMENT, libelles[i[k]], libelles[j[k]], float(profondeur[k])))
+    for k in np.flatnonzero(recouvre & ((place_i & (code[j] == allee)) | (place_j & (code[i] == allee)))):
+        a, b = (i[k], j[k]) if place_i[k] else (j[k], i[k])
+        conflits.append(Conflit(EMPIETEMENT, libelles[a], libelles[b], float(profondeur[k])))
+    # Les deux moitiés du stock central d'une paire (côtés G / D, même niveau) sont accolées par construction
+    stock = CODES[STOCK]
+    centre = (y0 + y1) / 2
+    moities = (code[i] == stock) & (code[j] == stock) & (cote[i] >= 0) & (cote[j] >= 0) & (cote[i] != cote[j]) \
+        & (np.abs(centre[i] - centre[j]) < TOLERANCE)
+    proche = ~recouvre & ~moities & place_i & place_j & (matiere[i] != matiere[j]) & (ecart < degagement - TOLERANCE)
+    for k in np.flatnonzero(proche):
+        conflits.append(Conflit(DEGAGEMENT, libelles[i[k]], libelles[j[k]], float(degagement - ecart[k])))
+
+    # Sorties du bâtiment (éléments placés et obstacles)
+    dedans = (code != allee)
+    sortie = np.maximum.reduce([-x0, x1 - p.bat_largeur, -y0, np.zeros_like(x0)])
+    for k in np.flatnonzero(dedans & (sortie > TOLERANCE)):
+        conflits.append(Conflit(HORS_BATIMENT, libelles[k], None, float(sortie[k])))
+    for k in np.flatnonzero(dedans & (y1 - p.bat_longueur > TOLERANCE)):
+        conflits.append(Conflit(DEPASSEMENT, libelles[k], None, float(y1[k] - p.bat_longueur)))
+    return conflits
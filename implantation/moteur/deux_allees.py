@@ -0,0 +1,165 @@
+"""Deux allées : séchage sur les deux ailes, stock central entre les allées (plan2allees-1)."""
+
+from .base import Strategie
+from .dimensionnement import forme_lot
+from .parametres import ALIGNEMENT_ALLEE, NB_LOTS, Parametres
+from .resultat import PASSAGE, SECHAGE, STOCK, Bande
+
+
+class DeuxAllees(Strategie):
+    """
+    Champs lus : bat_longueur, bat_largeur, largeur_allee, marge_securite,
+    largeur_stock (stock central), largeur_passage, alignement, coeff_forme,
+    espace_inter_matiere, espace_inter_lot, min_longueur_lot, flux/process
+    et recette. Chaque matière est séchée moitié à gauche, moitié à droite,
+    sauf les paires (gauche, droite) passées dans `ordre`, qui partagent un niveau.
+    """
+    nom = "deux_allees"
+    titre = "Deux allées : classique"
+    defaut = Parametres(
+        bat_longueur=70, bat_largeur=75, largeur_stock=12.0, largeur_allee=10.0,
+        marge_securite=0.0, largeur_passage=0.0, coeff_forme=0.5,
+        espace_inter_matiere=0.3, espace_inter_lot=0.5,
+        scenario=6000, h_sechage=0.4, h_stock=7.0,
+    )
+
+    def geometrie(self, p):
+        # --- STRUCTURE CENTRALE ---
+        largeur_structure_centrale = (p.largeur_allee * 2) + p.largeur_stock + (p.marge_securite * 2)
+        x_start_central = (p.bat_largeur - largeur_structure_centrale) / 2
+
+        x_allee_1_start = x_start_central + p.marge_securite
+        x_stock_start = x_allee_1_start + p.largeur_allee
+        x_allee_2_start = x_stock_start + p.largeur_stock
+        return {
+            # Largeur MAX dispo par aile
+            "largeur_aile": x_start_central,
+            "x_allee_1": x_allee_1_start,
+            "x_stock": x_stock_start,
+            "x_allee_2": x_allee_2_start,
+            "anchor_G": x_start_central,
+            "anchor_D": x_allee_2_start + p.largeur_allee + p.marge_securite,
+        }
+
+    def bandes(self, p, zones):
+        cote_allee = p.alignement == ALIGNEMENT_ALLEE
+        return [
+            Bande(0, zones["anchor_G"], depuis_droite=cote_allee),
+            Bande(zones["x_stock"], zones["x_stock"] + p.largeur_stock),
+            Bande(zones["anchor_D"], p.bat_largeur, depuis_droite=not cote_allee),
+        ]
+
+    def _dimensions(self, p, surfaces, width_base, cotes, largeur_stock):
+        """Lot sur `cotes` côtés (1 ou 2) et stock sur `largeur_stock` ; `surfaces` : ligne de Strategie.surfaces"""
+        _, couleur, surf_sechage_total, surf_stock = surfaces
+        surf_un_lot = (surf_sechage_total / cotes) / NB_LOTS
+        final_X, final_Y_lot, final_Y_mat, mode = forme_lot(
+            surf_un_lot, width_base, p.largeur_passage, p.min_longueur_lot
+        )
+        return {
+            "dim_x": final_X,
+            "dim_y_lot": final_Y_lot,
+            "dim_y_mat": final_Y_mat,
+            "len_stock": surf_stock / largeur_stock,
+            "surf_sech": surf_sechage_total,
+            "surf_stk": surf_stock,
+            "color": couleur,
+            "mode": mode,
+            "cotes": cotes,
+        }
+
+    def dimensionner_depuis(self, surfaces, p, paires=()):
+        width_base = max(0.1, self.geometrie(p)["largeur_aile"])
+        noms = {ligne[0] for ligne in surfaces}
+        # Une paire n'existe que si ses deux matières sont présentes
+        en_paire = {nom for paire in paires if all(n in noms for n in paire) for nom in paire}
+        dims = {}
+        for ligne in surfaces:
+            nom = ligne[0]
+            if nom in en_paire:
+                # Tout le volume d'un seul côté (3 lots), stock sur une demi-largeur
+                dims[nom] = self._dimensions(p, ligne, width_base, 1, p.largeur_stock / 2)
+            else:
+                dims[nom] = self._dimensions(p, ligne, width_base, 2, p.largeur_stock)
+        return dims
+
+    def ordre_niveaux(self, p, ordre=None):
+        """Niveaux le long de Y : nom (classique) ou paire (gauche, droite) sur un même niveau"""
+        return [m.nom for m in self.matieres_actives(p)] if ordre is None else list(ordre)
+
+    def preparer(self, p, ordre=None):
+        # Les paires de l'ordre sont dimensionnées d'un seul côté
+        niveaux = self.ordre_niveaux(p, ordre)
+        return ([n for n in niveaux if isinstance(n, tuple)],), niveaux
+
+    def _x_cotes(self, p, zones, w_lot):
+        """Position X des lots gauche / droite selon l'alignement"""
+        if p.alignement == ALIGNEMENT_ALLEE:
+            return zones["anchor_G"] - w_lot, zones["anchor_D"]
+        return 0, p.bat_largeur - w_lot
+
+    def _placer_lots(self, res, p, nom, d, x, y0, cote):
+        """3 lots : matière / passage engin / matière"""
+        for i in range(NB_LOTS):
+            y = y0 + (i * d["dim_y_lot"]) + (i * p.espace_inter_lot)
+            adapte = d["mode"] == "Adapté"
+            self._ajouter(res, SECHAGE, x, y, d["dim_x"], d["dim_y_mat"] / 2, matiere=nom, lot=i, cote=cote, adapte=adapte)
+            y_p = y + d["dim_y_mat"] / 2
+            if p.largeur_passage > 0:
+                self._ajouter(res, PASSAGE, x, y_p, d["dim_x"], p.largeur_passage, matiere=nom, lot=i, cote=cote)
+            y_m2 = y_p + p.largeur_passage
+            self._ajouter(res, SECHAGE, x, y_m2, d["dim_x"], d["dim_y_mat"] / 2, matiere=nom, lot=i, cote=cote, adapte=adapte)
+
+    def _placer_classique(self, res, p, nom, d, zones, curseur_y):
+        """Matière séchée des deux côtés, stock central centré sur le bloc ; renvoie le nouveau curseur"""
+        h_bloc = (NB_LOTS * d["dim_y_lot"]) + ((NB_LOTS - 1) * p.espace_inter_lot)
+        x_G, x_D = self._x_cotes(p, zones, d["dim_x"])
+        self._placer_lots(res, p, nom, d, x_G, curseur_y, "G")
+        self._placer_lots(res, p, nom, d, x_D, curseur_y, "D")
+
+        # --- STOCK CENTRAL (CENTRÉ) ---
+        y_center = curseur_y + h_bloc / 2
+        y_stock = y_center - (d["len_stock"] / 2)
+        self._ajouter(res, STOCK, zones["x_stock"], y_stock, p.largeur_stock, d["len_stock"], matiere=nom)
+
+        res.placements[nom] = {"y": curseur_y, "h_bloc": h_bloc, "x_G": x_G, "x_D": x_D, "y_centre": y_center}
+        return max(curseur_y + h_bloc, y_stock + d["len_stock"]) + p.espace_inter_matiere
+
+    def _placer_paire(self, res, p, gauche, droite, dims, zones, curseur_y):
+        """Séchage de `gauche` à gauche, de `droite` à droite, stock central scindé en deux"""
+        d_g, d_d = dims[gauche], dims[droite]
+        h_bloc_g = (NB_LOTS * d_g["dim_y_lot"]) + ((NB_LOTS - 1) * p.espace_inter_lot)
+        h_bloc_d = (NB_LOTS * d_d["dim_y_lot"]) + ((NB_LOTS - 1) * p.espace_inter_lot)
+        # Le curseur avance du MAX des hauteurs (Séchage G, Séchage D, Stock G, Stock D)
+        max_h_needed = max(h_bloc_g, h_bloc_d, d_g["len_stock"], d_d["len_stock"])
+
+        x_G = self._x_cotes(p, zones, d_g["dim_x"])[0]
+        x_D = self._x_cotes(p, zones, d_d["dim_x"])[1]
+        self._placer_lots(res, p, gauche, d_g, x_G, curseur_y, "G")
+        self._placer_lots(res, p, droite, d_d, x_D, curseur_y, "D")
+
+        # Stock central splitté, centré sur le niveau
+        y_center = curseur_y + max_h_needed / 2
+        demi = p.largeur_stock / 2
+        self._ajouter(res, STOCK, zones["x_stock"], y_center - d_g["len_stock"] / 2, demi, d_g["len_stock"], matiere=gauche, cote="G")
+        self._ajouter(res, STOCK, zones["x_stock"] + demi, y_center - d_d["len_stock"] / 2, demi, d_d["len_stock"], matiere=droite, cote="D")
+
+        res.placements[gauche] = {"y": curseur_y, "h_bloc": h_bloc_g, "x_G": x_G, "y_centre": y_center, "h_niveau": max_h_needed, "cote": "G"}
+        res.placements[droite] = {"y": curseur_y, "h_bloc": h_bloc_d, "x_D": x_D, "y_centre": y_center, "h_niveau": max_h_needed, "cote": "D"}
+        return curseur_y + max_h_needed + p.espace_inter_matiere
+
+    def placer(self, p, dims, zones, ordre=None):
+        res = self._resultat(p, dims, zones)
+        curseur_y = 0
+        for niveau in list(dims) if ordre is None else ordre:
+            if isinstance(niveau, tuple):
+                presents = [nom for nom in niveau if nom in dims]
+                if len(presents) == 2 and all(dims[nom]["cotes"] == 1 for nom in presents):
+                    curseur_y = self._placer_paire(res, p, *presents, dims, zones, curseur_y)
+                    continue
+            else:
+                presents = [niveau] if niveau in dims else []
+            for nom in presents:
+                curseur_y = self._placer_classique(res, p, nom, dims[nom], zones, curseur_y)
+        res.curseurs = {"principal": curseur_y}
+        return res
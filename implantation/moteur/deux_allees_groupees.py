@@ -0,0 +1,34 @@
+"""Deux allées avec Rebuts PAM et Fontes Foug groupés sur un même niveau (plan2allees-2)."""
+
+from .deux_allees import DeuxAllees
+from .parametres import ORDRE_PAM_FONTES, RECETTE_DEFAUT, ordonner_recette
+
+
+class DeuxAlleesGroupees(DeuxAllees):
+    """
+    Mêmes champs que DeuxAllees. Si les deux matières du groupe sont présentes,
+    tout le séchage de la première va à gauche, celui de la seconde à droite,
+    et le stock central est scindé en deux demi-largeurs sur le même niveau.
+    """
+    nom = "deux_allees_groupees"
+    titre = "Deux allées : Rebuts PAM & Fontes groupés"
+    groupe = ("Rebuts PAM", "Fontes Foug")
+    defaut = DeuxAllees.defaut.avec(
+        bat_longueur=57, largeur_stock=16.0,
+        recette=ordonner_recette(RECETTE_DEFAUT, ORDRE_PAM_FONTES),
+    )
+
+    def groupe_actif(self, p):
+        actives = {m.nom for m in self.matieres_actives(p)}
+        return all(nom in actives for nom in self.groupe)
+
+    def dimensionner_depuis(self, surfaces, p, paires=None):
+        return super().dimensionner_depuis(surfaces, p, [self.groupe] if paires is None else paires)
+
+    def ordre_niveaux(self, p, ordre=None):
+        niveaux = super().ordre_niveaux(p, ordre)
+        # Des paires explicites (ordre optimisé) remplacent le groupe par défaut
+        if not self.groupe_actif(p) or any(isinstance(n, tuple) for n in niveaux):
+            return niveaux
+        # Le groupe est toujours en tête, puis les autres matières (Classique)
+        return [self.groupe] + [nom for nom in niveaux if nom not in self.groupe]
@@ -0,0 +1,47 @@
+"""Formules de dimensionnement communes aux variantes (flux, surfaces, forme des lots)."""
+
+
+def flux_jour(p, matiere):
+    """Tonnage journalier d'une matière (t/jour)"""
+    return p.tonnage_jour * matiere.ratio
+
+
+def surface_sechage(p, matiere):
+    """Surface totale de séchage à plat : Vol = Surf x H, sur toute la rotation"""
+    vol_sechage = (flux_jour(p, matiere) * p.duree_sechage) / matiere.densite
+    return vol_sechage / p.h_sechage
+
+
+def surface_stock(p, matiere):
+    """Surface du stock sec, le coefficient de forme tenant compte du talus"""
+    vol_stock = (flux_jour(p, matiere) * p.jours_stock) / matiere.densite
+    return vol_stock / (p.h_stock * p.coeff_forme)
+
+
+def calculer_dimensions_lot(surface, width_max, min_y):
+    """Calcule h (Y) et w (X) en respectant min_y"""
+    y_theorique = surface / width_max
+    if y_theorique < min_y:
+        # Contrainte active : on fixe Y à min_y et on réduit X
+        return min_y, surface / min_y, True # h, w, is_adapted
+    else:
+        # Pas de contrainte : plein largeur
+        return y_theorique, width_max, False
+
+
+def forme_lot(surf_un_lot, width_base, largeur_passage, min_y):
+    """
+    Forme d'un lot avec passage engin (variantes deux allées).
+    Renvoie (final_X, final_Y_lot, final_Y_mat, mode) avec mode "Plein" ou "Adapté".
+    """
+    # 1. Essai avec largeur MAX
+    Y_mat_theo = surf_un_lot / width_base
+    Y_lot_theo = Y_mat_theo + largeur_passage
+
+    # 2. Contrainte longueur mini
+    if Y_lot_theo >= min_y:
+        return width_base, Y_lot_theo, Y_mat_theo, "Plein"
+
+    # Réduction largeur
+    Y_mat_dispo = max(0.1, min_y - largeur_passage)
+    return surf_un_lot / Y_mat_dispo, min_y, Y_mat_dispo, "Adapté"
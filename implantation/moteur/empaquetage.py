@@ -0,0 +1,142 @@
+"""
+Empaquetage 2D : variante du placement séquentiel (curseur_y) qui réutilise
+l'espace laissé à côté des lots étroits (forme « Adapté »).
+
+On part du placement séquentiel de la stratégie. Chaque lot (avec ses
+passages) et chaque stock devient un bloc rigide. Dans chaque bande (aile,
+zone stock), les blocs sont repris dans le même ordre et posés au plus bas
+puis au plus près de l'ancrage (bottom-left). Les blocs ne tournent pas, donc
+la profondeur Y des lots (≥ min_longueur_lot) est conservée. Deux blocs
+gardent entre eux `ecart_meme_matiere` s'ils sont de la même matière,
+`espace_inter_matiere` sinon. Si le séquentiel est valide (ni tas sous y = 0
+ni chevauchement) et plus court dans une bande, on le garde pour cette bande.
+
+    from implantation.moteur.empaquetage import empaqueter
+    compact = empaqueter(STRATEGIES["une_allee_sequentielle"].calculer(p))
+    compact.longueur_utilisee
+"""
+
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from . import STRATEGIES
+from .collisions import paires_proches
+from .resultat import STOCK
+
+TOLERANCE = 1e-9
+
+
+@dataclass
+class _Bloc:
+    matiere: str
+    x: float
+    y: float
+    w: float
+    h: float
+    elements: list = field(default_factory=list)
+
+
+def _blocs(elements):
+    """Regroupe les éléments d'un même lot (matière / passage / matière) en blocs rigides"""
+    groupes = {}
+    for e in elements:
+        cle = (e.type == STOCK, e.matiere, e.lot, e.cote)
+        groupes.setdefault(cle, []).append(e)
+    blocs = []
+    for membres in groupes.values():
+        x0 = min(e.x for e in membres)
+        y0 = min(e.y for e in membres)
+        x1 = max(e.x + e.w for e in membres)
+        y1 = max(e.y_fin for e in membres)
+        blocs.append(_Bloc(membres[0].matiere, x0, y0, x1 - x0, y1 - y0, membres))
+    return blocs
+
+
+def _bande_de(bloc, bandes):
+    """Bande qui contient le centre du bloc (la plus proche à défaut)"""
+    centre = bloc.x + bloc.w / 2
+    return min(range(len(bandes)), key=lambda i: max(bandes[i].x0 - centre, centre - bandes[i].x1, 0))
+
+
+def _empiler(blocs, largeur, ecart):
+    """Bottom-left : position (u, y) de chaque bloc, u mesuré depuis l'ancrage de la bande"""
+    poses = []
+    for b in blocs:
+        choix = None
+        cand_y = sorted({0.0} | {y + h + ecart(m, b.matiere) for _, y, w, h, m in poses})
+        cand_u = sorted({0.0} | {u + w + ecart(m, b.matiere) for u, _, w, h, m in poses})
+        for y in cand_y:
+            for u in cand_u:
+                if u > 0 and u + b.w > largeur + TOLERANCE:
+                    break
+                if all(
+                    u >= pu + pw + ecart(pm, b.matiere) - TOLERANCE or pu >= u + b.w + ecart(pm, b.matiere) - TOLERANCE
+                    or y >= py + ph + ecart(pm, b.matiere) - TOLERANCE or py >= y + b.h + ecart(pm, b.matiere) - TOLERANCE
+                    for pu, py, pw, ph, pm in poses
+                ):
+                    choix = (u, y)
+                    break
+            if choix:
+                break
+        poses.append((*choix, b.w, b.h, b.matiere))
+    return [(u, y) for u, y, *_ in poses]
+
+
+def _valide(blocs):
+    """Placement séquentiel sans tas hors bâtiment (y < 0) ni chevauchement"""
+    if any(b.y < -TOLERANCE for b in blocs):
+        return False
+    x0, y0 = np.array([b.x for b in blocs]), np.array([b.y for b in blocs])
+    x1, y1 = x0 + np.array([b.w for b in blocs]), y0 + np.array([b.h for b in blocs])
+    # Paires proches en Y seulement (index trié, voir moteur.collisions)
+    i, j = paires_proches(y0, y1)
+    return not np.any(
+        (x0[i] < x1[j] - TOLERANCE) & (x0[j] < x1[i] - TOLERANCE)
+        & (y0[i] < y1[j] - TOLERANCE) & (y0[j] < y1[i] - TOLERANCE)
+    )
+
+
+def empaqueter(res):
+    """Version empaquetée d'un ResultatImplantation séquentiel (mêmes matières et zones)"""
+    strategie = STRATEGIES[res.variante]
+    p = res.parametres
+    bandes = strategie.bandes(p, res.zones)
+    ecart_lot = strategie.ecart_meme_matiere(p)
+
+    def ecart(a, b):
+        return ecart_lot if a == b else p.espace_inter_matiere
+
+    par_bande = [[] for _ in bandes]
+    for bloc in _blocs(res.elements):
+        par_bande[_bande_de(bloc, bandes)].append(bloc)
+
+    elements = []
+    curseurs = {}
+    for i, (bande, blocs) in enumerate(zip(bandes, par_bande)):
+        if not blocs:
+            continue
+        # Ordre séquentiel d'origine : de bas en haut
+        blocs.sort(key=lambda b: b.y)
+        positions = _empiler(blocs, bande.largeur, ecart)
+        fin_sequentiel = max(b.y + b.h for b in blocs)
+        fin_paquet = max(y + b.h for (u, y), b in zip(positions, blocs))
+        if fin_paquet > fin_sequentiel + TOLERANCE and _valide(blocs):
+            elements += [e for b in blocs for e in b.elements]
+            curseurs[f"bande_{i}"] = fin_sequentiel
+            continue
+        for (u, y), b in zip(positions, blocs):
+            x = bande.x1 - u - b.w if bande.depuis_droite else bande.x0 + u
+            for e in b.elements:
+                e_y = e.y - b.y + y
+                elements.append(replace(e, x=e.x - b.x + x, y=e_y, depassement=e_y + e.h > p.bat_longueur))
+        curseurs[f"bande_{i}"] = fin_paquet
+
+    # Les positions par matière du séquentiel ne s'appliquent plus
+    return replace(res, elements=elements, placements={}, curseurs=curseurs)
+
+
+def gain_longueur(res):
+    """(résultat empaqueté, longueur gagnée sur le séquentiel)"""
+    compact = empaqueter(res)
+    return compact, res.longueur_utilisee - compact.longueur_utilisee
@@ -0,0 +1,144 @@
+"""
+Empreinte minimale : plus petit bâtiment (surface largeur × longueur) qui
+contient une recette donnée, pour chaque variante.
+
+La longueur nécessaire est une sortie directe du moteur (longueur utilisée),
+et elle ne croît jamais quand le bâtiment s'élargit. Pour chaque couple
+(longueur, largeur du stock) d'une grille bornée, on cherche donc par
+dichotomie la plus petite largeur qui tient dans la longueur. Toutes les
+dichotomies avancent ensemble sur des tableaux (noyaux de `balayage`),
+avec l'ordre (et les paires) de Strategie.calculer.
+
+    from implantation.moteur.empreinte import empreintes_minimales
+    for variante, e in empreintes_minimales(scenario=6000).items():
+        print(variante, e.bat_largeur, e.bat_longueur, e.surface)
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import STRATEGIES, ordonner_recette
+from .balayage import evaluer_vectorise
+
+# Bornes de la largeur de stock par variante (sliders des applis) ; None = sans stock réglable
+BORNES_STOCK = {
+    "une_allee_scindee": (2.0, 20.0),
+    "une_allee_sequentielle": None,
+    "deux_allees": (4.0, 20.0),
+    "deux_allees_groupees": (4.0, 20.0),
+}
+
+
+@dataclass
+class Empreinte:
+    variante: str
+    parametres: object  # Parametres résolus (bat_largeur, bat_longueur, largeur_stock)
+    resultat: object    # ResultatImplantation du moteur scalaire
+
+    @property
+    def bat_largeur(self):
+        return self.parametres.bat_largeur
+
+    @property
+    def bat_longueur(self):
+        return self.parametres.bat_longueur
+
+    @property
+    def surface(self):
+        return self.parametres.bat_largeur * self.parametres.bat_longueur
+
+
+def largeur_minimale_structure(variante, p, largeur_stock, largeur_min_sechage):
+    """Largeur sous laquelle la zone de séchage n'existe plus (allées + stock + marges)"""
+    if variante == "une_allee_scindee":
+        return p.largeur_allee + p.marge_securite + largeur_stock + largeur_min_sechage
+    if variante == "une_allee_sequentielle":
+        return largeur_min_sechage + 2 * p.marge_securite
+    # Deux ailes de séchage autour de la structure centrale
+    return 2 * p.largeur_allee + largeur_stock + 2 * p.marge_securite + 2 * largeur_min_sechage
+
+
+def _longueur(variante, p, ordre, **champs):
+    return evaluer_vectorise(variante, p.avec(**champs), ordre)["longueur_utilisee"]
+
+
+def _dichotomie_largeur(variante, p, ordre, longueurs, stocks, w_min, w_max, tolerance):
+    """
+    Plus petite largeur (par couple longueur × stock) dont la longueur utilisée
+    tient dans la longueur ; NaN si même w_max ne suffit pas.
+    """
+    forme = np.broadcast_shapes(longueurs.shape, stocks.shape)
+    lo = np.broadcast_to(w_min, forme).astype(float)
+    hi = np.full(forme, float(w_max))
+    faisable = _longueur(variante, p, ordre, bat_largeur=hi, largeur_stock=stocks) <= longueurs
+    # Invariant : hi faisable, lo infaisable (ou borne basse)
+    deja = _longueur(variante, p, ordre, bat_largeur=lo, largeur_stock=stocks) <= longueurs
+    hi = np.where(deja, lo, hi)
+    while np.max(hi - lo) > tolerance:
+        mid = (lo + hi) / 2
+        ok = _longueur(variante, p, ordre, bat_largeur=mid, largeur_stock=stocks) <= longueurs
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+    return np.where(faisable, hi, np.nan)
+
+
+def empreinte_minimale(variante, base=None, ordre=None, pas=0.5, bornes_stock=None, pas_stock=0.5,
+                       largeur_max=100.0, longueur_max=200.0, largeur_min_sechage=5.0):
+    """
+    Configuration de surface minimale pour `variante`, empilée selon
+    `ordre`. Les dimensions du bâtiment sont arrondies au `pas` supérieur et
+    bornées comme les sliders des applis. Renvoie None si rien ne tient dans
+    ces bornes.
+    """
+    strategie = STRATEGIES[variante]
+    p = (base or strategie.defaut).avec(largeur_utile=None)
+    bornes_stock = bornes_stock if bornes_stock is not None else BORNES_STOCK[variante]
+
+    if bornes_stock is None:
+        stocks = np.array([[p.largeur_stock]])
+    else:
+        stocks = np.arange(bornes_stock[0], bornes_stock[1] + pas_stock / 2, pas_stock)[None, :]
+    w_min = largeur_minimale_structure(variante, p, stocks, largeur_min_sechage)
+
+    # Longueurs bornées par le bâtiment le plus large (plancher) et le plus étroit
+    l_bas = _longueur(variante, p, ordre, bat_largeur=np.full(stocks.shape, largeur_max), largeur_stock=stocks)
+    l_haut = _longueur(variante, p, ordre, bat_largeur=np.maximum(w_min, 0.1), largeur_stock=stocks)
+    l_min = np.floor(l_bas.min() / pas) * pas
+    l_max = min(np.ceil(l_haut.max() / pas) * pas, longueur_max)
+    if l_min > l_max:
+        return None
+    longueurs = np.arange(l_min, l_max + pas / 2, pas)[:, None]
+
+    largeurs = _dichotomie_largeur(variante, p, ordre, longueurs, stocks, w_min, largeur_max, pas * 1e-7)
+    # Arrondi au pas : la longueur ne croît pas avec la largeur, l'arrondi reste faisable
+    largeurs = np.ceil(np.round(largeurs / pas, 6)) * pas
+    surfaces = largeurs * longueurs
+    if np.all(np.isnan(surfaces)):
+        return None
+
+    i, j = np.unravel_index(np.nanargmin(surfaces), surfaces.shape)
+    resolu = p.avec(
+        bat_largeur=float(largeurs[i, j]), bat_longueur=float(longueurs[i, 0]),
+        largeur_stock=float(stocks[0, j]),
+    )
+    return Empreinte(variante=variante, parametres=resolu, resultat=strategie.calculer(resolu, ordre))
+
+
+def empreintes_minimales(recette=None, scenario=None, jours_ouvres=None, **options):
+    """
+    Empreinte minimale des quatre variantes pour une même recette et un même
+    flux (les autres paramètres restent ceux de chaque variante).
+    """
+    empreintes = {}
+    for variante, strategie in STRATEGIES.items():
+        changements = {}
+        if recette is not None:
+            # Chaque variante garde son ordre d'empilement
+            changements["recette"] = ordonner_recette(recette, [m.nom for m in strategie.defaut.recette])
+        if scenario is not None:
+            changements["scenario"] = scenario
+        if jours_ouvres is not None:
+            changements["jours_ouvres"] = jours_ouvres
+        empreintes[variante] = empreinte_minimale(variante, strategie.defaut.avec(**changements), **options)
+    return empreintes
@@ -0,0 +1,83 @@
+"""
+Équilibrage de la variante une allée scindée : largeur du stock (droite) qui
+minimise max(longueur séchage à gauche, longueur stock à droite).
+
+Avec A et B les surfaces totales de séchage et de stock, D la largeur
+disponible, n le nombre de matières actives et s la largeur du stock :
+
+    gauche(s) = A / (D - s) + n (NB_LOTS - 1) espace_inter_lot + (n - 1) espace_inter_matiere
+    droite(s) = B / s + (n - 1) espace_inter_matiere
+
+gauche croît avec s et droite décroît : l'optimum est à leur égalité,
+racine d'un trinôme, puis ramené dans les bornes du slider. Les formules
+acceptent des tableaux de largeurs (courbe largeur -> longueur nécessaire).
+
+    e = equilibrer(p, bornes=(2.0, 30.0))
+    e.largeur_stock, e.longueur
+"""
+
+import math
+from dataclasses import dataclass
+
+from .dimensionnement import surface_sechage, surface_stock
+from .parametres import NB_LOTS
+
+
+@dataclass
+class Equilibre:
+    largeur_stock: float
+    longueur_gauche: float
+    longueur_droite: float
+
+    @property
+    def longueur(self):
+        """Longueur nécessaire (côté le plus long)"""
+        return max(self.longueur_gauche, self.longueur_droite)
+
+    @property
+    def ecart(self):
+        return self.longueur_gauche - self.longueur_droite
+
+
+def _termes(p):
+    """(A, B, D, espaces à gauche, espaces à droite) de `p`"""
+    actives = [m for m in p.recette if m.pourcentage > 0]
+    n = len(actives)
+    entre_matieres = max(n - 1, 0) * p.espace_inter_matiere
+    return (
+        sum(surface_sechage(p, m) for m in actives),
+        sum(surface_stock(p, m) for m in actives),
+        p.bat_largeur - p.largeur_allee - p.marge_securite,
+        n * (NB_LOTS - 1) * p.espace_inter_lot + entre_matieres,
+        entre_matieres,
+    )
+
+
+def longueurs_cotes(p, largeur_stock):
+    """(longueur séchage à gauche, longueur stock à droite) pour une largeur de stock (ou un tableau)"""
+    A, B, D, espaces_g, espaces_d = _termes(p)
+    # Même plancher que la géométrie de la stratégie
+    largeur_sechage = D - largeur_stock
+    largeur_sechage = largeur_sechage * (largeur_sechage >= 0.1) + 0.1 * (largeur_sechage < 0.1)
+    return A / largeur_sechage + espaces_g, B / largeur_stock + espaces_d
+
+
+def equilibrer(p, bornes=None):
+    """
+    Equilibre de `p` (sa largeur de stock est ignorée). `bornes` : (min, max)
+    de la largeur du stock, par défaut ]0, largeur disponible[.
+    """
+    A, B, D, espaces_g, espaces_d = _termes(p)
+    c = espaces_g - espaces_d
+    if A + B <= 0:
+        s = p.largeur_stock
+    elif c == 0:
+        s = B * D / (A + B)
+    else:
+        # A / (D - s) + c = B / s  <=>  c s² - (A + B + c D) s + B D = 0, racine dans ]0, D[
+        b = A + B + c * D
+        s = (b - math.sqrt(b * b - 4 * c * B * D)) / (2 * c)
+    if bornes is not None:
+        s = min(max(s, bornes[0]), bornes[1])
+    gauche, droite = longueurs_cotes(p, s)
+    return Equilibre(float(s), float(gauche), float(droite))
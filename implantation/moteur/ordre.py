@@ -0,0 +1,198 @@
+"""
+Ordre des matières le long de Y et paires gauche / droite (variantes à deux
+allées) qui minimisent la longueur utilisée.
+
+Un niveau est une matière seule (séchée des deux côtés) ou une paire qui
+partage un niveau (une matière par côté, stock central scindé). Son avance
+ne dépend que de son contenu : on mesure chaque niveau candidat une fois avec
+le moteur, puis on cherche le découpage en niveaux le moins long :
+- recherche exacte (séparation et évaluation) jusqu'à `n_exact` matières ;
+- au-delà, appariement glouton par gain décroissant puis échanges locaux.
+
+Dans les variantes à une allée la longueur est une somme de blocs par
+matière : l'ordre n'y change rien, l'ordre courant est renvoyé tel quel.
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+
+from . import STRATEGIES
+from .deux_allees import DeuxAllees
+from .deux_allees_groupees import DeuxAlleesGroupees
+
+
+@dataclass
+class OrdreOptimise:
+    variante: str
+    ordre: list               # niveaux à passer à Strategie.calculer(p, ordre)
+    longueur: float           # longueur utilisée avec cet ordre
+    longueur_initiale: float  # longueur utilisée avec l'ordre par défaut
+    exact: bool = True
+
+    @property
+    def gain(self):
+        return self.longueur_initiale - self.longueur
+
+
+def _mesurer(strategie, p, niveau):
+    """(avance du curseur, étendue) d'un niveau posé seul"""
+    res = strategie.calculer(p, [niveau])
+    return res.curseurs["principal"] - p.espace_inter_matiere, res.longueur_utilisee
+
+
+class _Niveaux:
+    """Coûts des niveaux candidats : poids = avance + espace inter-matière"""
+
+    def __init__(self, strategie, p, noms, paires):
+        self.esp = p.espace_inter_matiere
+        self.seul = {}
+        self.paire = {}
+        # Étendue - avance : ce que le dernier niveau laisse dépasser (ou non) de son curseur
+        self.reste = {}
+        for nom in noms:
+            avance, etendue = _mesurer(strategie, p, nom)
+            self.seul[nom] = avance + self.esp
+            self.reste[nom] = etendue - avance
+        for a, b in paires:
+            avance, etendue = _mesurer(strategie, p, (a, b))
+            self.paire[frozenset((a, b))] = avance + self.esp
+            self.reste[(a, b)] = etendue - avance
+
+    def poids(self, niveau):
+        return self.paire[frozenset(niveau)] if isinstance(niveau, tuple) else self.seul[niveau]
+
+    def longueur(self, niveaux):
+        return sum(self.poids(n) for n in niveaux) - self.esp + min(self.reste[n] for n in niveaux)
+
+    def borne(self, nom, restants):
+        """Minorant de la part d'une matière : seule, ou la moitié d'une paire"""
+        meilleur = self.seul[nom]
+        for autre in restants:
+            cout = self.paire.get(frozenset((nom, autre)))
+            if cout is not None:
+                meilleur = min(meilleur, cout / 2)
+        return meilleur
+
+
+def _paire(niveaux, a, b):
+    """Paire dans le sens déjà connu des niveaux mesurés"""
+    return (a, b) if (a, b) in niveaux.reste else (b, a)
+
+
+def _heuristique(niveaux, noms):
+    """Appariement glouton par gain décroissant, puis échanges tant que la longueur baisse"""
+    gains = sorted(
+        ((niveaux.seul[a] + niveaux.seul[b] - cout, tuple(sorted(cle, key=noms.index)))
+         for cle, cout in niveaux.paire.items() for a, b in [tuple(cle)]),
+        reverse=True,
+    )
+    libres = set(noms)
+    solution = []
+    for gain, (a, b) in gains:
+        if gain > 0 and a in libres and b in libres:
+            solution.append(_paire(niveaux, a, b))
+            libres -= {a, b}
+    solution += [nom for nom in noms if nom in libres]
+
+    ameliore = True
+    while ameliore:
+        ameliore = False
+        actuelle = niveaux.longueur(solution)
+        for i, j in combinations(range(len(solution)), 2):
+            membres = [m for n in (solution[i], solution[j]) for m in (n if isinstance(n, tuple) else (n,))]
+            for variante in _recompositions(niveaux, membres):
+                candidat = [n for k, n in enumerate(solution) if k not in (i, j)] + variante
+                longueur = niveaux.longueur(candidat)
+                if longueur < actuelle - 1e-9:
+                    solution, actuelle, ameliore = candidat, longueur, True
+                    break
+            if ameliore:
+                break
+    return solution
+
+
+def _recompositions(niveaux, membres):
+    """Autres découpages en niveaux de 2 à 4 matières (paires mesurées uniquement)"""
+    if not membres:
+        yield []
+        return
+    tete, reste = membres[0], membres[1:]
+    for suite in _recompositions(niveaux, reste):
+        yield [tete] + suite
+    for k, autre in enumerate(reste):
+        if frozenset((tete, autre)) in niveaux.paire:
+            for suite in _recompositions(niveaux, reste[:k] + reste[k + 1:]):
+                yield [_paire(niveaux, tete, autre)] + suite
+
+
+def _exacte(niveaux, noms, incumbent):
+    """Séparation et évaluation sur les découpages en seuls / paires"""
+    # Les matières les plus coûteuses d'abord : la borne se resserre plus vite
+    noms = sorted(noms, key=lambda n: -niveaux.seul[n])
+    reste_min = min(niveaux.reste.values())
+    meilleur = [niveaux.longueur(incumbent), incumbent]
+
+    def explorer(restants, cout, solution):
+        if not restants:
+            longueur = niveaux.longueur(solution)
+            if longueur < meilleur[0] - 1e-9:
+                meilleur[:] = [longueur, list(solution)]
+            return
+        borne = cout + sum(niveaux.borne(n, restants) for n in restants) - niveaux.esp + reste_min
+        if borne >= meilleur[0] - 1e-9:
+            return
+        tete, autres = restants[0], restants[1:]
+        for k, autre in enumerate(autres):
+            if frozenset((tete, autre)) in niveaux.paire:
+                niveau = _paire(niveaux, tete, autre)
+                explorer(autres[:k] + autres[k + 1:], cout + niveaux.poids(niveau), solution + [niveau])
+        explorer(autres, cout + niveaux.seul[tete], solution + [tete])
+
+    explorer(noms, 0.0, [])
+    return meilleur[1]
+
+
+def _ranger(niveaux, solution, noms):
+    """Paires en tête, puis matières seules dans l'ordre de la recette ; le dernier niveau dépasse le moins"""
+    rang = {nom: i for i, nom in enumerate(noms)}
+    cle = lambda n: (0, rang[n[0]]) if isinstance(n, tuple) else (1, rang[n])
+    solution = sorted(solution, key=cle)
+    dernier = min(solution, key=lambda n: niveaux.reste[n])
+    # À égalité (aux arrondis près), le niveau déjà en dernier y reste
+    if niveaux.reste[solution[-1]] <= niveaux.reste[dernier] + 1e-9:
+        dernier = solution[-1]
+    return [n for n in solution if n != dernier] + [dernier]
+
+
+def optimiser_ordre(variante, p, apparier=None, n_exact=12):
+    """
+    Ordre (et paires) minimisant la longueur utilisée de `variante`.
+    `apparier` autorise les paires libres ; par défaut seulement dans la
+    variante groupée, la variante classique ne garde que son groupe éventuel.
+    """
+    strategie = STRATEGIES[variante]
+    longueur_initiale = strategie.calculer(p).longueur_utilisee
+    ordre_initial = strategie.ordre_niveaux(p) if isinstance(strategie, DeuxAllees) else [m.nom for m in strategie.matieres_actives(p)]
+    if not isinstance(strategie, DeuxAllees) or len(strategie.matieres_actives(p)) < 2:
+        return OrdreOptimise(variante, ordre_initial, longueur_initiale, longueur_initiale)
+
+    noms = [m.nom for m in strategie.matieres_actives(p)]
+    if apparier is None:
+        apparier = isinstance(strategie, DeuxAlleesGroupees)
+    if apparier:
+        paires = list(combinations(noms, 2))
+    else:
+        paires = [n for n in ordre_initial if isinstance(n, tuple)]
+    niveaux = _Niveaux(strategie, p, noms, paires)
+
+    solution = _heuristique(niveaux, noms)
+    exact = len(noms) <= n_exact
+    if exact:
+        solution = _exacte(niveaux, noms, solution)
+    ordre = _ranger(niveaux, solution, noms)
+
+    # Contrôle par le moteur (l'étendue d'un niveau intermédiaire peut déborder du suivant)
+    longueur = strategie.calculer(p, ordre).longueur_utilisee
+    if longueur > longueur_initiale:
+        return OrdreOptimise(variante, ordre_initial, longueur_initiale, longueur_initiale, exact)
+    return OrdreOptimise(variante, ordre, longueur, longueur_initiale, exact)
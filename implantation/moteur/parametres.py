@@ -0,0 +1,134 @@
+"""Paramètres d'entrée du moteur d'implantation (indépendants de Streamlit)."""
+
+from dataclasses import dataclass, field, replace
+
+# Rotation séchage J1 / J2 / J3
+NB_LOTS = 3
+
+# Profondeur minimale d'un lot (Y), contrainte engin
+MIN_LONGUEUR_LOT_Y = 4.5
+
+ALIGNEMENT_ALLEE = "Côté Allée (Vide vers le mur)"
+ALIGNEMENT_MUR = "Côté Mur (Vide vers l'allée)"
+
+
+@dataclass(frozen=True)
+class Matiere:
+    nom: str
+    pourcentage: float  # part de la recette (%)
+    densite: float      # t/m³
+    couleur: str = "#aaaaaa"
+
+    @property
+    def ratio(self):
+        return self.pourcentage / 100
+
+
+COULEURS = {
+    "Rebuts PAM": "#ff9933",
+    "Jets Blénod": "#0a82d3",
+    "Gueuset": "#aaaaaa",
+    "Fontes Foug": "#ffcc66",
+    "Ferraille": "#da1884",
+}
+
+
+def recette(pourcentages, densites):
+    """Construit la recette (tuple ordonné de Matiere) depuis deux dicts nom -> valeur"""
+    return tuple(
+        Matiere(nom, pourcentages[nom], densites[nom], COULEURS.get(nom, "#aaaaaa"))
+        for nom in pourcentages
+    )
+
+
+RECETTE_DEFAUT = recette(
+    {"Rebuts PAM": 18, "Jets Blénod": 37, "Gueuset": 0, "Fontes Foug": 15, "Ferraille": 30},
+    {"Rebuts PAM": 1.5, "Jets Blénod": 1.0, "Gueuset": 1.0, "Fontes Foug": 1.0, "Ferraille": 1.25},
+)
+
+
+def ordonner_recette(recette, noms):
+    """Réordonne une recette selon `noms` (les matières non citées restent à la fin)"""
+    rang = {nom: i for i, nom in enumerate(noms)}
+    return tuple(sorted(recette, key=lambda m: rang.get(m.nom, len(rang))))
+
+
+# Ordre des variantes où Rebuts PAM et Fontes Foug se suivent
+ORDRE_PAM_FONTES = ("Rebuts PAM", "Fontes Foug", "Jets Blénod", "Gueuset", "Ferraille")
+
+
+def jours_stock_defaut(scenario):
+    """Autonomie du stock sec (jours) selon le volume mensuel"""
+    # Écrit sans `if` pour accepter aussi un tableau NumPy de scénarios
+    return 10 + 5 * (scenario == 3000)
+
+
+# Loi continue passant par les deux scénarios historiques (15 j à 3000 t, 10 j
+# à 6000 t), constante au-delà ; le tonnage stocké (flux x jours) reste croissant
+LOI_STOCK_CONTINUE = ((3000, 15), (6000, 10))
+
+
+def jours_stock_loi(scenario, loi):
+    """
+    Autonomie (jours) interpolée linéairement entre les points (tonnage
+    mensuel, jours) de `loi`, constante hors de ses bornes.
+    """
+    # NumPy chargé à la demande : le moteur reste importable sans lui
+    from numpy import interp
+    tonnages, jours = zip(*sorted(loi))
+    return interp(scenario, tonnages, jours)
+
+
+@dataclass(frozen=True)
+class Parametres:
+    """
+    Jeu complet de paramètres d'un plan. Chaque variante ne lit que les champs
+    qui la concernent (voir la docstring de chaque stratégie).
+    """
+    # Bâtiment
+    bat_longueur: float = 60
+    bat_largeur: float = 50
+    largeur_allee: float = 8.0
+    marge_securite: float = 0.0
+    # Largeur de la zone stock (droite en 1 allée, centrale en 2 allées)
+    largeur_stock: float = 6.5
+    # Largeur max utilisable pour les tas (1 allée séquentielle), None = largeur bâtiment
+    largeur_utile: float = None
+    largeur_passage: float = 0.0
+    alignement: str = ALIGNEMENT_ALLEE
+
+    # Séparations
+    espace_inter_matiere: float = 0.3
+    espace_inter_lot: float = 0.3
+    espace_inter_phase: float = 0.5
+
+    # Flux & process
+    scenario: float = 6000
+    jours_ouvres: int = 20
+    # Autonomie du stock : points (tonnage mensuel, jours) interpolés, None = jours_stock_defaut
+    loi_stock: tuple = None
+    h_sechage: float = 0.4
+    h_stock: float = 7.0
+    coeff_forme: float = 1.0
+    duree_sechage: int = NB_LOTS
+    min_longueur_lot: float = MIN_LONGUEUR_LOT_Y
+
+    recette: tuple = field(default=RECETTE_DEFAUT)
+
+    @property
+    def tonnage_jour(self):
+        return self.scenario / self.jours_ouvres
+
+    @property
+    def jours_stock(self):
+        if self.loi_stock is None:
+            return jours_stock_defaut(self.scenario)
+        return jours_stock_loi(self.scenario, self.loi_stock)
+
+    @property
+    def total_pourcentage(self):
+        return sum(m.pourcentage for m in self.recette)
+
+    def avec(self, **changements):
+        """Copie modifiée (les paramètres sont immuables)"""
+        return replace(self, **changements)
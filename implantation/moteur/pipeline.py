@@ -0,0 +1,117 @@
+"""
+Recalcul incrémental d'un plan : le calcul est découpé en étapes mises en
+cache, chacune avec ses entrées explicites (champs de Parametres lus et
+étape amont).
+
+    flux        recette, scenario, jours_ouvres, loi_stock, hauteurs, coeff_forme,
+                durée
+                -> surfaces de séchage et de stock par matière (Strategie.surfaces)
+    dimensions  surfaces (valeur de `flux`, passée à Strategie.dimensionner_depuis)
+                + géométrie du bâtiment, passage, longueur mini des lots, paires
+                de l'ordre
+    placement   dimensions + longueur du bâtiment, alignement, espacements,
+                ordre le long de Y
+
+Une étape n'est recalculée que si l'une de ses entrées a changé : changer
+l'alignement ne relance que le placement, le coefficient de forme relance
+flux (surfaces de stock) puis l'aval. `dimensions` dépend de la valeur des
+surfaces et non des champs de `flux` : deux réglages qui donnent les mêmes
+surfaces (densité d'une matière à 0 %) partagent dimensions et placement.
+
+    pipeline = Pipeline()
+    plan = pipeline.calculer("deux_allees", p)
+    plan = pipeline.calculer("deux_allees", p.avec(alignement=ALIGNEMENT_MUR))
+    pipeline.recalculees        # ['placement']
+
+Le dessin et le rendu de l'aperçu sont les deux étapes suivantes, côté
+application (voir implantation.panneaux.apercu_plan).
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import fields, replace
+
+from . import STRATEGIES
+from .parametres import Parametres
+
+FLUX = "flux"
+DIMENSIONS = "dimensions"
+PLACEMENT = "placement"
+ETAPES = (FLUX, DIMENSIONS, PLACEMENT)
+
+# Champs lus par chaque étape (les stratégies ne lisent les champs de flux
+# qu'à travers Strategie.surfaces)
+CHAMPS_FLUX = ("recette", "scenario", "jours_ouvres", "loi_stock", "duree_sechage", "h_sechage", "h_stock", "coeff_forme")
+CHAMPS_DIMENSIONS = (
+    "bat_largeur", "largeur_allee", "largeur_stock", "largeur_utile", "marge_securite",
+    "largeur_passage", "min_longueur_lot", "espace_inter_phase",
+)
+# Tout le reste : un champ ajouté à Parametres relance au moins le placement
+CHAMPS_PLACEMENT = tuple(f.name for f in fields(Parametres) if f.name not in CHAMPS_FLUX)
+
+
+def _valeurs(p, champs):
+    return tuple(getattr(p, nom) for nom in champs)
+
+
+def _fige(valeur):
+    """Listes en tuples (clés de cache)"""
+    if isinstance(valeur, (list, tuple)):
+        return tuple(_fige(v) for v in valeur)
+    return valeur
+
+
+class Pipeline:
+    """Étapes flux -> dimensions -> placement, chacune avec son cache LRU"""
+
+    def __init__(self, capacite=64):
+        self.capacite = capacite
+        self._caches = {nom: OrderedDict() for nom in ETAPES}
+        self._verrou = threading.Lock()
+        # Étapes recalculées au dernier appel, et depuis la création
+        self.recalculees = []
+        self.compteurs = dict.fromkeys(ETAPES, 0)
+
+    def _etape(self, nom, cle, calcul, recalculees):
+        cache = self._caches[nom]
+        with self._verrou:
+            if cle in cache:
+                cache.move_to_end(cle)
+                return cache[cle]
+        valeur = calcul()
+        recalculees.append(nom)
+        with self._verrou:
+            self.compteurs[nom] += 1
+            cache[cle] = valeur
+            while len(cache) > self.capacite:
+                cache.popitem(last=False)
+        return valeur
+
+    def calculer(self, variante, p, ordre=None):
+        """Même résultat que STRATEGIES[variante].calculer(p, ordre), étapes inchangées relues"""
+        strategie = STRATEGIES[variante]
+        recalculees = []
+        args, niveaux = strategie.preparer(p, ordre)
+
+        flux = self._etape(FLUX, _valeurs(p, CHAMPS_FLUX), lambda: strategie.surfaces(p), recalculees)
+        cle_dims = (variante, flux, _valeurs(p, CHAMPS_DIMENSIONS), _fige(args))
+        # Dimensions tirées des surfaces de l'étape flux, sans les recalculer depuis p
+        dims = self._etape(DIMENSIONS, cle_dims, lambda: strategie.dimensionner_depuis(flux, p, *args), recalculees)
+        cle_placement = (cle_dims, _valeurs(p, CHAMPS_PLACEMENT), _fige(niveaux))
+        res = self._etape(
+            PLACEMENT, cle_placement,
+            lambda: strategie.placer(p, dims, strategie.geometrie(p), niveaux), recalculees,
+        )
+
+        self.recalculees = recalculees
+        # Un placement relu a pu être calculé avec d'autres champs de flux
+        return res if res.parametres == p else replace(res, parametres=p)
+
+    def vider(self):
+        with self._verrou:
+            for cache in self._caches.values():
+                cache.clear()
+
+
+# Instance partagée (dépôt, simulateurs)
+PIPELINE = Pipeline()
@@ -0,0 +1,116 @@
+"""Résultat d'un calcul d'implantation : éléments placés et indicateurs."""
+
+from dataclasses import dataclass, field
+
+# Types d'éléments placés
+SECHAGE = "sechage"
+PASSAGE = "passage"
+STOCK = "stock"
+
+
+@dataclass
+class Element:
+    """Rectangle placé dans le bâtiment (coordonnées en m, origine coin FOUG/SNCF)"""
+    type: str
+    x: float
+    y: float
+    w: float
+    h: float
+    matiere: str = None
+    lot: int = None      # index J1/J2/J3 pour le séchage
+    cote: str = None     # "G" / "D" en deux allées
+    adapte: bool = False
+    depassement: bool = False
+
+    @property
+    def y_fin(self):
+        return self.y + self.h
+
+    @property
+    def surface(self):
+        return self.w * self.h
+
+
+@dataclass
+class Bande:
+    """Bande de largeur fixe le long de Y (aile, zone stock) où les tas peuvent être empaquetés"""
+    x0: float
+    x1: float
+    # Tas calés contre x1 (aile gauche alignée sur l'allée, aile droite côté mur)
+    depuis_droite: bool = False
+
+    @property
+    def largeur(self):
+        return self.x1 - self.x0
+
+
+@dataclass
+class ResultatImplantation:
+    variante: str
+    parametres: object
+    # Dimensionnement par matière (clés propres à chaque variante)
+    matieres: dict = field(default_factory=dict)
+    # Position des blocs par matière (y de départ, hauteur du bloc, x des côtés...)
+    placements: dict = field(default_factory=dict)
+    # Géométrie fixe : allées, zone stock, ancrages
+    zones: dict = field(default_factory=dict)
+    elements: list = field(default_factory=list)
+    # Position finale de chaque curseur d'empilement (espace inter-matière inclus)
+    curseurs: dict = field(default_factory=dict)
+    surf_sechage_tot: float = 0.0
+    surf_stock_tot: float = 0.0
+
+    @property
+    def longueur_utilisee(self):
+        """Longueur (Y) réellement occupée par les tas"""
+        return max((e.y_fin for e in self.elements), default=0.0)
+
+    @property
+    def depassement(self):
+        return any(e.depassement for e in self.elements)
+
+    @property
+    def marge_longueur(self):
+        """Longueur restante (négative si dépassement)"""
+        return self.parametres.bat_longueur - self.longueur_utilisee
+
+    @property
+    def nb_adaptes(self):
+        """Nombre de matières dont au moins un lot est en forme « Adapté »"""
+        return len({e.matiere for e in self.elements if e.adapte})
+
+    def elements_de(self, type):
+        return [e for e in self.elements if e.type == type]
+
+    @property
+    def tableau(self):
+        """
+        Éléments et allées en tableau structuré NumPy (voir moteur.tableau),
+        construit au premier accès puis gardé tant que la liste des éléments
+        reste la même (identité, et longueur pour les ajouts en place).
+        """
+        elements, n, tableau = self.__dict__.get("_tableau", (None, None, None))
+        if elements is not self.elements or n != len(self.elements):
+            # NumPy chargé à la demande : le moteur reste importable sans lui
+            from .tableau import tableau_plan
+            tableau = tableau_plan(self)
+            self._tableau = (self.elements, len(self.elements), tableau)
+        return tableau
+
+    def indicateurs(self):
+        """KPIs du plan (dict sérialisable en JSON), calculés sur le tableau"""
+        return self.tableau.indicateurs()
+
+    # Sérialisation (dépôt) : les éléments sont stockés en tableau
+    def __getstate__(self):
+        etat = dict(self.__dict__)
+        etat.pop("_tableau", None)
+        etat["elements"] = self.tableau
+        return etat
+
+    def __setstate__(self, etat):
+        tableau = etat["elements"]
+        if not isinstance(tableau, list):
+            etat["elements"] = tableau.elements()
+            etat["_tableau"] = (etat["elements"], len(etat["elements"]), tableau)
+        self.__dict__.update(etat)
@@ -0,0 +1,152 @@
+"""
+Robustesse (Monte Carlo) : parts de recette et densités tirées selon des lois
+données, moteur évalué sur tous les tirages d'un coup (noyaux de `balayage`).
+
+Les tirages sont découpés en lots de taille fixe, chacun avec sa graine
+dérivée (SeedSequence.spawn) : le résultat ne dépend que de `n` et de
+`graine`, pas du nombre de processus qui traitent les lots.
+
+    inc = incertitudes_autour(p.recette, "normale", d_part=2.0, d_densite=0.10)
+    r = analyser("deux_allees", p, inc, n=10**6, graine=42)
+    r.proba_depassement, r.percentiles()
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from .balayage import evaluer_vectorise
+
+# Tirages par lot (un lot = une tâche du pool)
+TAILLE_LOT = 50_000
+
+FORMES = ("normale", "uniforme", "triangulaire")
+
+
+@dataclass(frozen=True)
+class Loi:
+    """normale (moyenne, écart-type), uniforme (min, max) ou triangulaire (min, mode, max)"""
+    forme: str
+    parametres: tuple
+
+    def tirer(self, rng, n):
+        if self.forme == "normale":
+            return rng.normal(*self.parametres, size=n)
+        if self.forme == "uniforme":
+            return rng.uniform(*self.parametres, size=n)
+        if self.forme == "triangulaire":
+            return rng.triangular(*self.parametres, size=n)
+        raise ValueError(f"Loi inconnue : {self.forme}")
+
+
+def normale(moyenne, ecart_type):
+    return Loi("normale", (moyenne, ecart_type))
+
+
+def uniforme(minimum, maximum):
+    return Loi("uniforme", (minimum, maximum))
+
+
+def triangulaire(minimum, mode, maximum):
+    return Loi("triangulaire", (minimum, mode, maximum))
+
+
+@dataclass(frozen=True)
+class Incertitude:
+    """Lois de la part (%) et de la densité (t/m³) d'une matière ; None = valeur nominale"""
+    part: Loi = None
+    densite: Loi = None
+
+
+def _loi_autour(forme, centre, ecart):
+    if forme == "normale":
+        return normale(centre, ecart)
+    if forme == "uniforme":
+        return uniforme(centre - ecart, centre + ecart)
+    return triangulaire(centre - ecart, centre, centre + ecart)
+
+
+def incertitudes_autour(recette, forme="normale", d_part=2.0, d_densite=0.10):
+    """
+    Même loi pour toutes les matières présentes, centrée sur la recette :
+    `d_part` en points de %, `d_densite` en fraction de la densité
+    (écart-type pour la normale, demi-largeur sinon).
+    """
+    return {
+        m.nom: Incertitude(
+            part=_loi_autour(forme, m.pourcentage, d_part) if d_part else None,
+            densite=_loi_autour(forme, m.densite, d_densite * m.densite) if d_densite else None,
+        )
+        for m in recette if m.pourcentage > 0
+    }
+
+
+def tirer_recette(recette, incertitudes, rng, n, normaliser=True, densite_min=0.1):
+    """Recette dont parts et densités sont des tableaux de `n` tirages"""
+    parts, densites = {}, {}
+    for m in recette:
+        inc = incertitudes.get(m.nom, Incertitude())
+        parts[m.nom] = np.clip(inc.part.tirer(rng, n), 0, None) if inc.part else np.full(n, float(m.pourcentage))
+        densites[m.nom] = np.clip(inc.densite.tirer(rng, n), densite_min, None) if inc.densite else np.full(n, float(m.densite))
+    if normaliser:
+        # Le tonnage total reste celui du scénario : les parts sont ramenées au total nominal
+        total = sum(parts.values())
+        cible = sum(m.pourcentage for m in recette)
+        parts = {nom: np.divide(v * cible, total, out=np.zeros(n), where=total > 0) for nom, v in parts.items()}
+    return tuple(replace(m, pourcentage=parts[m.nom], densite=densites[m.nom]) for m in recette)
+
+
+def _evaluer_lot(variante, p, incertitudes, graine, n, normaliser, ordre):
+    rng = np.random.default_rng(graine)
+    indicateurs = evaluer_vectorise(variante, p.avec(recette=tirer_recette(p.recette, incertitudes, rng, n, normaliser)), ordre)
+    return indicateurs["longueur_utilisee"], indicateurs["nb_adaptes"]
+
+
+@dataclass
+class ResultatRobustesse:
+    variante: str
+    bat_longueur: float
+    n: int
+    graine: int
+    longueurs: np.ndarray = field(repr=False, default=None)
+    nb_adaptes: np.ndarray = field(repr=False, default=None)
+
+    @property
+    def proba_depassement(self):
+        return float(np.mean(self.longueurs > self.bat_longueur))
+
+    def percentiles(self, q=(50, 95, 99)):
+        """Longueur utilisée aux percentiles `q` (dict q -> m)"""
+        return {k: float(v) for k, v in zip(q, np.percentile(self.longueurs, q))}
+
+    @property
+    def proba_adapte(self):
+        """Probabilité qu'au moins une matière passe en forme « Adapté »"""
+        return float(np.mean(self.nb_adaptes > 0))
+
+
+def analyser(variante, p, incertitudes, n=100_000, graine=0, processus=None, normaliser=True, taille_lot=TAILLE_LOT, ordre=None):
+    """
+    Tire `n` recettes et évalue `variante` sur le bâtiment de `p`, empilée
+    selon `ordre` (celui de Strategie.calculer : noms, paires).
+    `processus` : nombre de processus du pool (None = selon les CPU, 1 = sans pool).
+    """
+    tailles = [taille_lot] * (n // taille_lot) + ([n % taille_lot] if n % taille_lot else [])
+    graines = np.random.SeedSequence(graine).spawn(len(tailles))
+    taches = [(variante, p, incertitudes, g, t, normaliser, ordre) for g, t in zip(graines, tailles)]
+
+    if processus is None:
+        processus = min(os.cpu_count() or 1, len(taches))
+    if processus > 1:
+        with ProcessPoolExecutor(max_workers=processus) as pool:
+            lots = list(pool.map(_evaluer_lot, *zip(*taches)))
+    else:
+        lots = [_evaluer_lot(*t) for t in taches]
+
+    return ResultatRobustesse(
+        variante=variante, bat_longueur=p.bat_longueur, n=n, graine=graine,
+        longueurs=np.concatenate([l for l, _ in lots]),
+        nb_adaptes=np.concatenate([a for _, a in lots]),
+    )
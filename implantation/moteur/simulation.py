@@ -0,0 +1,181 @@
+"""
+Simulation à événements discrets (pas journalier) de la rotation de séchage
+J1/J2/J3 et du remplissage des stocks sur une année.
+
+Chaque jour, dans cet ordre :
+1. les lots dont le contenu a séché `duree_sechage` jours passent au stock ;
+2. le four consomme le stock (tous les jours, ou seulement les jours ouvrés) ;
+3. un jour ouvré hors fermeture, l'arrivage remplit le lot suivant de la
+   rotation ; si ce lot n'est pas vide, la rotation est en conflit.
+
+Les capacités sont les surfaces des lots et des stocks du plan dessiné.
+Les jours où une occupation dépasse la capacité sont signalés, ainsi que
+les ruptures de stock et les conflits de rotation. Toutes les matières
+avancent ensemble (tableaux NumPy), un an se simule en quelques ms.
+
+    sim = simuler(STRATEGIES["deux_allees"].calculer(p), ConfigSimulation(variabilite=0.2))
+    sim.alertes()
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .dimensionnement import flux_jour
+from .parametres import NB_LOTS
+from .resultat import SECHAGE, STOCK
+
+# Tolérance relative avant de signaler un dépassement de surface
+TOLERANCE = 1e-6
+
+
+@dataclass(frozen=True)
+class ConfigSimulation:
+    jours: int = 365
+    # Le four consomme tous les jours calendaires (sinon seulement les jours ouvrés)
+    consommation_continue: bool = True
+    # Plages (premier jour, dernier jour) sans arrivage, ex. ((213, 233),) pour trois semaines en août
+    fermetures: tuple = ()
+    # Coefficient de variation des arrivages journaliers (0 = arrivages nominaux)
+    variabilite: float = 0.0
+    # Remplissage du stock au jour 0 (fraction de sa capacité)
+    niveau_initial: float = 0.5
+    graine: int = 0
+
+
+def calendrier(jours_ouvres, jours=365):
+    """Jours ouvrés (booléens) : `jours_ouvres` par mois, répartis régulièrement dans le mois"""
+    ouvre = np.zeros(jours, dtype=bool)
+    debut_mois = np.linspace(0, jours, 13).round().astype(int)
+    for debut, fin in zip(debut_mois[:-1], debut_mois[1:]):
+        longueur = fin - debut
+        k = np.arange(longueur)
+        ouvre[debut:fin] = np.floor((k + 1) * jours_ouvres / longueur) > np.floor(k * jours_ouvres / longueur)
+    return ouvre
+
+
+@dataclass
+class ResultatSimulation:
+    matieres: list
+    # Surfaces occupées (m²) : lots (matière, jour, lot) et stocks (matière, jour)
+    occupation_lots: np.ndarray
+    occupation_stock: np.ndarray
+    # Surfaces dessinées (m²) : lots (matière, lot) et stocks (matière)
+    capacite_lots: np.ndarray
+    capacite_stock: np.ndarray
+    conflits_rotation: np.ndarray  # (matière, jour)
+    ruptures_stock: np.ndarray     # (matière, jour)
+
+    @property
+    def depassement_lots(self):
+        """(matière, jour) : un lot occupe plus que sa surface dessinée"""
+        return np.any(self.occupation_lots > self.capacite_lots[:, None, :] * (1 + TOLERANCE), axis=2)
+
+    @property
+    def depassement_stock(self):
+        return self.occupation_stock > self.capacite_stock[:, None] * (1 + TOLERANCE)
+
+    @property
+    def taux_stock(self):
+        """Occupation des stocks en fraction de leur surface (matière, jour)"""
+        return self.occupation_stock / np.maximum(self.capacite_stock[:, None], TOLERANCE)
+
+    def alertes(self):
+        """Jours signalés par matière : dict nom -> {motif: [jours]}"""
+        motifs = {
+            "lot": self.depassement_lots,
+            "stock": self.depassement_stock,
+            "rupture": self.ruptures_stock,
+            "rotation": self.conflits_rotation,
+        }
+        return {
+            nom: {motif: np.flatnonzero(drapeaux[i]).tolist() for motif, drapeaux in motifs.items() if drapeaux[i].any()}
+            for i, nom in enumerate(self.matieres)
+        }
+
+
+def _capacites(plan, noms):
+    """Surfaces (lots par matière x J1/J2/J3, stocks par matière), sommées sur le tableau du plan"""
+    tableau = plan.tableau
+    # Indice de matière du tableau -> rang dans `noms` (-1 : matière ignorée)
+    rang = np.array([noms.index(nom) if nom in noms else -1 for nom in tableau.matieres] + [-1], dtype=int)
+    lots = np.zeros((len(noms), NB_LOTS))
+    stocks = np.zeros(len(noms))
+    sech = tableau.du_type(SECHAGE)
+    i = rang[sech["matiere"]]
+    np.add.at(lots, (i[i >= 0], sech["lot"][i >= 0]), (sech["w"] * sech["h"])[i >= 0])
+    stk = tableau.du_type(STOCK)
+    i = rang[stk["matiere"]]
+    np.add.at(stocks, i[i >= 0], (stk["w"] * stk["h"])[i >= 0])
+    return lots, stocks
+
+
+def simuler(plan, config=ConfigSimulation()):
+    """Simule une année de flux sur un ResultatImplantation"""
+    p = plan.parametres
+    matieres = [m for m in p.recette if m.nom in plan.matieres]
+    noms = [m.nom for m in matieres]
+    capacite_lots, capacite_stock = _capacites(plan, noms)
+
+    # Tonnages -> surfaces (séchage à plat, stock talué)
+    densite = np.array([m.densite for m in matieres], dtype=float)
+    par_t_sechage = 1 / (densite * p.h_sechage)
+    par_t_stock = 1 / (densite * p.h_stock * p.coeff_forme)
+
+    flux = np.array([flux_jour(p, m) for m in matieres], dtype=float)
+    ouvre = calendrier(p.jours_ouvres, config.jours)
+    arrive = ouvre.copy()
+    for debut, fin in config.fermetures:
+        arrive[debut:fin + 1] = False
+    if config.consommation_continue:
+        consomme = np.ones(config.jours, dtype=bool)
+        conso = flux * p.jours_ouvres * 12 / config.jours
+    else:
+        consomme, conso = ouvre, flux
+
+    rng = np.random.default_rng(config.graine)
+    alea = np.clip(rng.normal(1.0, config.variabilite, size=(config.jours, len(noms))), 0, None) if config.variabilite else None
+
+    n = len(noms)
+    # Rotation déjà en régime au jour 0 : lots remplis les derniers jours ouvrés
+    # de l'année précédente (même calendrier), J1 étant le plus ancien
+    remplis = config.jours - np.flatnonzero(ouvre)[-NB_LOTS:]
+    age = np.tile(remplis.astype(float), (n, 1))      # jours depuis le remplissage
+    charge = np.where(age < p.duree_sechage, flux[:, None], 0.0)  # tonnes dans chaque lot
+    stock = config.niveau_initial * capacite_stock / par_t_stock
+    occupation_lots = np.zeros((n, config.jours, NB_LOTS))
+    occupation_stock = np.zeros((n, config.jours))
+    conflits = np.zeros((n, config.jours), dtype=bool)
+    ruptures = np.zeros((n, config.jours), dtype=bool)
+    rotation = 0
+
+    for jour in range(config.jours):
+        # 1. Fin de séchage : le lot sec part au stock
+        sec = age >= p.duree_sechage
+        stock += (charge * sec).sum(axis=1)
+        charge[sec] = 0
+
+        # 2. Consommation du four
+        if consomme[jour]:
+            stock -= conso
+            ruptures[:, jour] = stock < -TOLERANCE
+            np.maximum(stock, 0, out=stock)
+
+        # 3. Arrivage dans le lot suivant de la rotation J1 > J2 > J3
+        if arrive[jour]:
+            k = rotation % NB_LOTS
+            conflits[:, jour] = charge[:, k] > 0
+            charge[:, k] += flux * (alea[jour] if alea is not None else 1)
+            age[:, k] = 0
+            rotation += 1
+
+        occupation_lots[:, jour] = charge * par_t_sechage[:, None]
+        occupation_stock[:, jour] = stock * par_t_stock
+        age += 1
+
+    return ResultatSimulation(
+        matieres=noms,
+        occupation_lots=occupation_lots, occupation_stock=occupation_stock,
+        capacite_lots=capacite_lots, capacite_stock=capacite_stock,
+        conflits_rotation=conflits, ruptures_stock=ruptures,
+    )
@@ -0,0 +1,121 @@
+"""
+Représentation compacte d'un plan : un tableau structuré NumPy, une ligne
+par rectangle placé (lots, passages, stocks, allées), lu par le dessin, les
+indicateurs, la simulation et la sérialisation du dépôt.
+
+    t = plan.tableau                         # construit une fois par plan
+    t.rects["y"] + t.rects["h"]              # fin de chaque rectangle
+    t.du_type(STOCK)                         # stocks seuls
+    t.indicateurs()                          # == plan.indicateurs()
+
+Champs : x, y, w, h (m), type (indice dans TYPES), matiere (indice dans
+`matieres`, -1 pour une allée), lot (-1 hors séchage), cote (indice dans
+COTES, -1 en une allée) et drapeaux (ADAPTE, DEPASSEMENT).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .resultat import PASSAGE, SECHAGE, STOCK, Element
+
+# Allée de circulation (géométrie fixe, hors éléments placés)
+ALLEE = "allee"
+TYPES = (SECHAGE, PASSAGE, STOCK, ALLEE)
+CODES = {t: i for i, t in enumerate(TYPES)}
+COTES = ("G", "D")
+
+# Drapeaux (bits)
+ADAPTE = 1
+DEPASSEMENT = 2
+
+DTYPE = np.dtype([
+    ("x", "f8"), ("y", "f8"), ("w", "f8"), ("h", "f8"),
+    ("type", "u1"), ("matiere", "i2"), ("lot", "i1"), ("cote", "i1"), ("drapeaux", "u1"),
+])
+
+
+@dataclass
+class TableauPlan:
+    rects: np.ndarray
+    # Noms des matières (champ `matiere` = indice)
+    matieres: tuple
+    bat_longueur: float
+
+    def __len__(self):
+        return len(self.rects)
+
+    def du_type(self, type):
+        return self.rects[self.rects["type"] == CODES[type]]
+
+    @property
+    def places(self):
+        """Éléments placés (sans les allées)"""
+        return self.rects[self.rects["type"] != CODES[ALLEE]]
+
+    @property
+    def longueur_utilisee(self):
+        places = self.places
+        return float((places["y"] + places["h"]).max()) if len(places) else 0.0
+
+    @property
+    def depassement(self):
+        return bool((self.places["drapeaux"] & DEPASSEMENT).any())
+
+    @property
+    def nb_adaptes(self):
+        places = self.places
+        return len(np.unique(places["matiere"][(places["drapeaux"] & ADAPTE) > 0]))
+
+    def surface(self, type):
+        r = self.du_type(type)
+        return float(np.dot(r["w"], r["h"]))
+
+    def indicateurs(self):
+        """KPIs du plan (voir ResultatImplantation.indicateurs)"""
+        longueur = self.longueur_utilisee
+        return {
+            "surf_sechage_tot": self.surface(SECHAGE),
+            "surf_stock_tot": self.surface(STOCK),
+            "longueur_utilisee": longueur,
+            "marge_longueur": self.bat_longueur - longueur,
+            "depassement": self.depassement,
+            "nb_adaptes": self.nb_adaptes,
+        }
+
+    def elements(self):
+        """Liste d'Element équivalente (allées exclues)"""
+        return [
+            Element(
+                TYPES[t], x, y, w, h,
+                matiere=self.matieres[m] if m >= 0 else None,
+                lot=lot if lot >= 0 else None,
+                cote=COTES[c] if c >= 0 else None,
+                adapte=bool(d & ADAPTE), depassement=bool(d & DEPASSEMENT),
+            )
+            for x, y, w, h, t, m, lot, c, d in self.places.tolist()
+        ]
+
+
+def tableau_plan(plan):
+    """TableauPlan d'un ResultatImplantation : ses éléments puis ses allées"""
+    p = plan.parametres
+    matieres = tuple(plan.matieres)
+    # Matière absente des dimensions (plan reconstruit à la main) : ajoutée en fin
+    for e in plan.elements:
+        if e.matiere is not None and e.matiere not in matieres:
+            matieres += (e.matiere,)
+    rang = {nom: i for i, nom in enumerate(matieres)}
+    lignes = [
+        (
+            e.x, e.y, e.w, e.h, CODES[e.type], rang.get(e.matiere, -1),
+            -1 if e.lot is None else e.lot, COTES.index(e.cote) if e.cote in COTES else -1,
+            ADAPTE * bool(e.adapte) | DEPASSEMENT * bool(e.depassement),
+        )
+        for e in plan.elements
+    ]
+    lignes += [
+        (x, 0.0, p.largeur_allee, p.bat_longueur, CODES[ALLEE], -1, -1, -1, 0)
+        for cle, x in plan.zones.items() if cle.startswith("x_allee")
+    ]
+    return TableauPlan(np.array(lignes, dtype=DTYPE).reshape(-1), matieres, p.bat_longueur)
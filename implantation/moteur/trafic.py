@@ -0,0 +1,268 @@
+"""
+Trafic dans les allées des variantes deux allées : simulation à événements
+discrets (file de priorité `heapq`, temps en minutes) des camions qui
+déchargent aux lots de séchage et des chargeuses qui transfèrent les lots
+secs vers le stock central.
+
+- Une allée offre `voies` emplacements côte à côte (largeur de l'allée /
+  largeur camion + jeu). Un véhicule occupe une voie de l'entrée (y = 0,
+  côté FOUG) jusqu'à son retour ; s'il n'y en a pas de libre, il attend
+  dans la file de l'allée (premier arrivé, premier servi).
+- Aile gauche desservie par l'ALLÉE 1, aile droite par l'ALLÉE 2. Le lot
+  reçu suit la rotation J1/J2/J3 des jours ouvrés ; une matière présente
+  des deux côtés alterne ses camions entre les deux ailes.
+- Un chargement sec `duree_sechage` jours après sa livraison est repris au
+  godet par la première chargeuse libre (premier jour ouvré suivant, en
+  début de poste), un aller-retour lot -> stock par godet.
+
+    r = simuler_trafic(STRATEGIES["deux_allees"].calculer(p), ConfigTrafic(jours=30))
+    r.allees[0].utilisation, r.attente_moyenne("camion")
+"""
+
+import heapq
+import math
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .dimensionnement import flux_jour
+from .parametres import NB_LOTS
+from .resultat import SECHAGE, STOCK
+from .simulation import calendrier
+
+CAMION = "camion"
+CHARGEUSE = "chargeuse"
+
+# Côté des lots -> allée qui les dessert
+ALLEES = {"G": "ALLÉE 1", "D": "ALLÉE 2"}
+
+
+@dataclass(frozen=True)
+class ConfigTrafic:
+    jours: int = 30
+    # Camions (mêmes gabarits que le dessin : 2.5 m de large, allée >= largeur + 0.5)
+    charge_camion: float = 25.0     # t
+    largeur_camion: float = 2.5     # m
+    jeu_lateral: float = 0.5        # m entre deux véhicules
+    vitesse_camion: float = 100.0   # m/min (6 km/h)
+    duree_dechargement: float = 12.0  # min, manœuvre comprise
+    # Poste : arrivages entre debut et fin (minutes depuis minuit)
+    debut_poste: float = 6 * 60
+    fin_poste: float = 22 * 60
+    # Arrivages tirés au hasard dans le poste (sinon réguliers)
+    arrivees_aleatoires: bool = True
+    # Chargeuses
+    nb_chargeuses: int = 2
+    godet: float = 4.0              # t par aller-retour
+    vitesse_chargeuse: float = 150.0  # m/min
+    duree_godet: float = 1.0        # min (chargement + vidage)
+    graine: int = 0
+
+
+def voies(largeur_allee, config=ConfigTrafic()):
+    """Nombre de véhicules de front dans une allée (0 si un camion ne passe pas)"""
+    return int((largeur_allee + config.jeu_lateral) // (config.largeur_camion + config.jeu_lateral))
+
+
+@dataclass
+class StatsAllee:
+    nom: str
+    voies: int
+    # Fraction du temps de poste où les voies sont occupées
+    utilisation: float
+    file_moyenne: float
+    file_max: int
+    passages: int
+
+
+@dataclass
+class ResultatTrafic:
+    jours: int
+    allees: list
+    # Attente (min) avant d'entrer dans l'allée, par type de véhicule
+    attentes: dict = field(repr=False)
+    # Attente (min) d'un transfert prêt avant qu'une chargeuse le prenne
+    attentes_transfert: np.ndarray = field(repr=False)
+    utilisation_chargeuses: float
+    nb_evenements: int
+
+    def attente_moyenne(self, type=CAMION):
+        a = self.attentes[type]
+        return float(a.mean()) if len(a) else 0.0
+
+    def attente_percentile(self, type=CAMION, q=95):
+        a = self.attentes[type]
+        return float(np.percentile(a, q)) if len(a) else 0.0
+
+
+class _Allee:
+    """Voies d'une allée et file d'attente, avec intégrales pour les moyennes"""
+
+    def __init__(self, nom, voies):
+        self.nom, self.voies = nom, voies
+        self.occupees = 0
+        self.file = deque()
+        self.t_maj = 0.0
+        self.aire_file = 0.0
+        self.aire_occupation = 0.0
+        self.file_max = 0
+        self.passages = 0
+
+    def avancer(self, t):
+        dt = t - self.t_maj
+        self.aire_file += len(self.file) * dt
+        self.aire_occupation += self.occupees * dt
+        self.t_maj = t
+
+
+class _Simulation:
+    def __init__(self, config, allees):
+        self.config = config
+        self.allees = allees
+        self.evenements = []
+        self.sequence = 0
+        self.traites = 0
+        self.attentes = {CAMION: [], CHARGEUSE: []}
+        self.attentes_transfert = []
+        self.chargeuses_libres = config.nb_chargeuses
+        self.occupation_chargeuses = 0.0
+        self.transferts = deque()
+
+    def planifier(self, t, action, *args):
+        # `sequence` départage les événements simultanés (ordre d'insertion)
+        heapq.heappush(self.evenements, (t, self.sequence, action, args))
+        self.sequence += 1
+
+    def executer(self):
+        while self.evenements:
+            t, _, action, args = heapq.heappop(self.evenements)
+            self.traites += 1
+            action(t, *args)
+
+    # --- Allées ---
+    def demander(self, t, allee, type, duree):
+        allee.avancer(t)
+        if allee.occupees < allee.voies:
+            self._entrer(t, allee, type, duree, t)
+        else:
+            allee.file.append((type, duree, t))
+            allee.file_max = max(allee.file_max, len(allee.file))
+
+    def _entrer(self, t, allee, type, duree, t_demande):
+        allee.occupees += 1
+        allee.passages += 1
+        self.attentes[type].append(t - t_demande)
+        self.planifier(t + duree, self.sortir, allee, type, t_demande)
+
+    def sortir(self, t, allee, type, t_demande):
+        allee.avancer(t)
+        allee.occupees -= 1
+        if allee.file:
+            self._entrer(t, allee, *allee.file.popleft())
+        if type == CHARGEUSE:
+            # La chargeuse était prise dès sa demande de voie
+            self.occupation_chargeuses += t - t_demande
+            self.chargeuses_libres += 1
+            self.lancer_transfert(t)
+
+    # --- Chargeuses ---
+    def transfert_pret(self, t, allee, duree):
+        self.transferts.append((allee, duree, t))
+        self.lancer_transfert(t)
+
+    def lancer_transfert(self, t):
+        if self.chargeuses_libres and self.transferts:
+            allee, duree, t_pret = self.transferts.popleft()
+            self.chargeuses_libres -= 1
+            self.attentes_transfert.append(t - t_pret)
+            self.demander(t, allee, CHARGEUSE, duree)
+
+
+def _positions(plan):
+    """(matière, côté, lot) -> y du centre du lot ; (matière, côté) -> y du centre du stock"""
+    lots, stocks = {}, {}
+    for e in plan.elements:
+        if e.type == SECHAGE:
+            lots.setdefault((e.matiere, e.cote, e.lot), []).append(e.y + e.h / 2)
+        elif e.type == STOCK:
+            stocks.setdefault((e.matiere, e.cote), []).append(e.y + e.h / 2)
+    return (
+        {k: sum(v) / len(v) for k, v in lots.items()},
+        {k: sum(v) / len(v) for k, v in stocks.items()},
+    )
+
+
+def simuler_trafic(plan, config=ConfigTrafic()):
+    """Simule `config.jours` jours de trafic sur un ResultatImplantation deux allées"""
+    p = plan.parametres
+    n_voies = voies(p.largeur_allee, config)
+    if n_voies == 0:
+        raise ValueError(f"Allée de {p.largeur_allee} m trop étroite pour un camion de {config.largeur_camion} m")
+    allees = {cote: _Allee(nom, n_voies) for cote, nom in ALLEES.items()}
+    sim = _Simulation(config, allees)
+    rng = np.random.default_rng(config.graine)
+
+    y_lots, y_stocks = _positions(plan)
+    matieres = [m for m in p.recette if m.nom in plan.matieres]
+    cotes = {m.nom: sorted({c for (nom, c, _) in y_lots if nom == m.nom}) for m in matieres}
+
+    ouvre = calendrier(p.jours_ouvres, config.jours)
+    jours_ouvres = np.flatnonzero(ouvre)
+    poste = config.fin_poste - config.debut_poste
+    alterne = {m.nom: 0 for m in matieres}
+
+    for rang, jour in enumerate(jours_ouvres):
+        lot = rang % NB_LOTS
+        # Camions du jour : flux de chaque matière découpé en chargements
+        camions = []
+        for m in matieres:
+            reste = flux_jour(p, m)
+            while reste > 1e-9 and cotes[m.nom]:
+                charge = min(config.charge_camion, reste)
+                reste -= charge
+                cote = cotes[m.nom][alterne[m.nom] % len(cotes[m.nom])]
+                alterne[m.nom] += 1
+                camions.append((m.nom, cote, charge))
+        if config.arrivees_aleatoires:
+            instants = np.sort(rng.uniform(0, poste, len(camions)))
+            rng.shuffle(camions)
+        else:
+            instants = (np.arange(len(camions)) + 0.5) * poste / max(len(camions), 1)
+
+        # Reprise au godet : premier jour ouvré où le chargement est sec
+        suivants = jours_ouvres[jours_ouvres >= jour + p.duree_sechage]
+        for (nom, cote, charge), instant in zip(camions, instants):
+            y_lot = y_lots[(nom, cote, lot)]
+            t = jour * 1440 + config.debut_poste + instant
+            duree = 2 * y_lot / config.vitesse_camion + config.duree_dechargement
+            sim.planifier(t, sim.demander, allees[cote], CAMION, duree)
+
+            if len(suivants):
+                y_stock = y_stocks.get((nom, cote), y_stocks.get((nom, None), y_lot))
+                # Aller-retour lot -> stock : le long de l'allée puis à travers
+                trajet = 2 * (abs(y_lot - y_stock) + p.largeur_allee) / config.vitesse_chargeuse
+                t_pret = suivants[0] * 1440 + config.debut_poste
+                for _ in range(math.ceil(charge / config.godet - 1e-9)):
+                    sim.planifier(t_pret, sim.transfert_pret, allees[cote], trajet + config.duree_godet)
+
+    sim.executer()
+
+    temps_ouvert = max(len(jours_ouvres) * poste, 1e-9)
+    fin = max([config.jours * 1440] + [a.t_maj for a in allees.values()])
+    stats = []
+    for a in allees.values():
+        a.avancer(fin)
+        stats.append(StatsAllee(
+            nom=a.nom, voies=a.voies,
+            utilisation=float(a.aire_occupation / (a.voies * temps_ouvert)),
+            file_moyenne=float(a.aire_file / temps_ouvert),
+            file_max=a.file_max, passages=a.passages,
+        ))
+    return ResultatTrafic(
+        jours=config.jours, allees=stats,
+        attentes={k: np.array(v) for k, v in sim.attentes.items()},
+        attentes_transfert=np.array(sim.attentes_transfert),
+        utilisation_chargeuses=float(sim.occupation_chargeuses / (max(config.nb_chargeuses, 1) * temps_ouvert)),
+        nb_evenements=sim.traites,
+    )
@@ -0,0 +1,78 @@
+"""Une allée centrale : séchage à gauche, stock sec à droite (plan1allee-1)."""
+
+from .base import Strategie
+from .parametres import NB_LOTS, Parametres
+from .resultat import SECHAGE, STOCK, Bande
+
+
+class UneAlleeScindee(Strategie):
+    """
+    Champs lus : bat_longueur, bat_largeur, largeur_allee, marge_securite,
+    largeur_stock (stock à droite), espace_inter_matiere, espace_inter_lot,
+    flux/process et recette. Les deux côtés s'empilent indépendamment.
+    """
+    nom = "une_allee_scindee"
+    titre = "Une allée : séchage / stock séparés"
+    defaut = Parametres(
+        bat_longueur=60, bat_largeur=50, largeur_allee=8.0, marge_securite=0.0,
+        largeur_stock=6.5, espace_inter_matiere=0.3, espace_inter_lot=0.3,
+        scenario=6000, h_sechage=0.4, h_stock=7.0,
+    )
+
+    def geometrie(self, p):
+        largeur_dispo = p.bat_largeur - p.largeur_allee - p.marge_securite
+        largeur_sechage = max(0.1, largeur_dispo - p.largeur_stock)
+        x_allee = largeur_sechage
+        return {
+            "largeur_dispo": largeur_dispo,
+            "largeur_sechage": largeur_sechage,
+            "x_allee": x_allee,
+            "x_marge": x_allee + p.largeur_allee,
+            "x_stock": x_allee + p.largeur_allee + p.marge_securite,
+        }
+
+    def bandes(self, p, zones):
+        # Séchage à gauche de l'allée, stock à droite
+        return [Bande(0, zones["largeur_sechage"], depuis_droite=True),
+                Bande(zones["x_stock"], zones["x_stock"] + p.largeur_stock)]
+
+    def dimensionner_depuis(self, surfaces, p):
+        zones = self.geometrie(p)
+        dims = {}
+        for nom, couleur, surf_sechage, surf_stock in surfaces:
+            dims[nom] = {
+                "surf_sech": surf_sechage,
+                "surf_stk": surf_stock,
+                "longueur_sechage": surf_sechage / zones["largeur_sechage"],
+                "longueur_stock": surf_stock / p.largeur_stock,
+                "color": couleur,
+            }
+        return dims
+
+    def placer(self, p, dims, zones, ordre=None):
+        res = self._resultat(p, dims, zones)
+        noms = self._ordonner(dims, ordre)
+
+        # --- CÔTÉ GAUCHE : SÉCHAGE ---
+        curseur_y = 0
+        for nom in noms:
+            d = dims[nom]
+            l_jour = d["longueur_sechage"] / NB_LOTS
+            # Hauteur bloc = 3 * l_jour + 2 * espace_inter_lot
+            h_bloc = (NB_LOTS * l_jour) + ((NB_LOTS - 1) * p.espace_inter_lot)
+            for i in range(NB_LOTS):
+                y_pos = curseur_y + (i * l_jour) + (i * p.espace_inter_lot)
+                self._ajouter(res, SECHAGE, 0, y_pos, zones["largeur_sechage"], l_jour, matiere=nom, lot=i, cote="G")
+            res.placements[nom] = {"y": curseur_y, "h_bloc": h_bloc, "l_jour": l_jour}
+            curseur_y += h_bloc + p.espace_inter_matiere
+
+        # --- CÔTÉ DROIT : STOCK SEC (empilé avec le même espace inter-matière) ---
+        curseur_y_droit = 0
+        for nom in noms:
+            l_stock = dims[nom]["longueur_stock"]
+            self._ajouter(res, STOCK, zones["x_stock"], curseur_y_droit, p.largeur_stock, l_stock, matiere=nom, cote="D")
+            res.placements[nom]["y_stock"] = curseur_y_droit
+            curseur_y_droit += l_stock + p.espace_inter_matiere
+
+        res.curseurs = {"gauche": curseur_y, "droite": curseur_y_droit}
+        return res
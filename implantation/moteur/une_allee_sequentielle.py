@@ -0,0 +1,92 @@
+"""Une allée extérieure : J1 > J2 > J3 > Stock empilés par matière (plan1allee-2)."""
+
+from .base import Strategie
+from .dimensionnement import calculer_dimensions_lot
+from .parametres import NB_LOTS, ORDRE_PAM_FONTES, RECETTE_DEFAUT, Parametres, ordonner_recette
+from .resultat import SECHAGE, STOCK, Bande
+
+
+class UneAlleeSequentielle(Strategie):
+    """
+    Champs lus : bat_longueur, bat_largeur, largeur_allee, largeur_utile,
+    marge_securite, coeff_forme, espace_inter_matiere, espace_inter_phase,
+    min_longueur_lot, flux/process et recette.
+    """
+    nom = "une_allee_sequentielle"
+    titre = "Une allée : séquentiel J1/J2/J3/Stock"
+    defaut = Parametres(
+        bat_longueur=84, bat_largeur=36, largeur_allee=10.0, largeur_utile=36.0,
+        marge_securite=0.0, coeff_forme=0.65, espace_inter_matiere=0.3,
+        espace_inter_phase=0.5, scenario=6000, h_sechage=0.4, h_stock=7.0,
+        recette=ordonner_recette(RECETTE_DEFAUT, ORDRE_PAM_FONTES),
+    )
+
+    def geometrie(self, p):
+        largeur_utile = p.bat_largeur if p.largeur_utile is None else p.largeur_utile
+        return {
+            # Largeur effective (max X dispo)
+            "largeur_max_x": max(1.0, largeur_utile - (2 * p.marge_securite)),
+            "x_start": p.marge_securite,
+            "x_allee": -p.largeur_allee,
+        }
+
+    def bandes(self, p, zones):
+        # Une seule bande le long de l'allée extérieure (x = 0)
+        return [Bande(zones["x_start"], zones["x_start"] + zones["largeur_max_x"])]
+
+    def ecart_meme_matiere(self, p):
+        return p.espace_inter_phase
+
+    def dimensionner_depuis(self, surfaces, p):
+        largeur_max_x = self.geometrie(p)["largeur_max_x"]
+        dims = {}
+        for nom, couleur, surf_sechage, surf_stock in surfaces:
+            # --- SÉCHAGE (1 JOUR) ---
+            surf_jour = surf_sechage / NB_LOTS
+            h_jour, w_jour, adapt_jour = calculer_dimensions_lot(surf_jour, largeur_max_x, p.min_longueur_lot)
+
+            # --- STOCKAGE ---
+            h_stock_calc, w_stock, adapt_stock = calculer_dimensions_lot(surf_stock, largeur_max_x, p.min_longueur_lot)
+
+            dims[nom] = {
+                # Dims Jour
+                "h_jour": h_jour,
+                "w_jour": w_jour,
+                "adapt_jour": adapt_jour,
+                "surf_jour": surf_jour,
+                # Dims Stock
+                "h_stock": h_stock_calc,
+                "w_stock": w_stock,
+                "adapt_stock": adapt_stock,
+                # Meta
+                "surf_sech": surf_jour * NB_LOTS,
+                "surf_stk": surf_stock,
+                "len_totale": (h_jour * NB_LOTS) + h_stock_calc + (NB_LOTS * p.espace_inter_phase),
+                "color": couleur,
+            }
+        return dims
+
+    def placer(self, p, dims, zones, ordre=None):
+        res = self._resultat(p, dims, zones)
+        x = zones["x_start"]
+        curseur_y = 0
+
+        for nom in self._ordonner(dims, ordre):
+            d = dims[nom]
+            y_debut = curseur_y
+
+            # --- SÉCHAGE J1, J2, J3 ---
+            for j in range(NB_LOTS):
+                self._ajouter(res, SECHAGE, x, curseur_y, d["w_jour"], d["h_jour"], matiere=nom, lot=j, adapte=d["adapt_jour"])
+                curseur_y += d["h_jour"] + p.espace_inter_phase
+
+            # --- STOCKAGE ---
+            self._ajouter(res, STOCK, x, curseur_y, d["w_stock"], d["h_stock"], matiere=nom, adapte=d["adapt_stock"])
+            curseur_y += d["h_stock"]
+
+            # Séparateur matière au milieu de l'espace inter-matière
+            res.placements[nom] = {"y": y_debut, "y_separateur": curseur_y + p.espace_inter_matiere / 2}
+            curseur_y += p.espace_inter_matiere
+
+        res.curseurs = {"principal": curseur_y}
+        return res
@@ -0,0 +1,300 @@
+"""
+Panneaux Streamlit communs aux simulateurs (calculs lancés à la demande).
+
+Chaque panneau est un fragment (st.fragment) : un clic ou une saisie dans le
+panneau ne relance que lui, avec le plan du dernier rerun complet, sans
+reconstruire la figure ni les autres panneaux.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from implantation.depot import DEPOT
+from implantation.dessin import DPI_APERCU, HAUTEUR_MAX_ECRAN_PX, LARGEUR_ECRAN_PX, SEUIL_TEXTE_APERCU, carte_faisabilite, rendre_apercu, zone_detail
+from implantation.export import CACHE_EXPORT, cle_parametres, export_differe, verrou_figure
+from implantation.moteur import LOI_STOCK_CONTINUE
+from implantation.moteur.balayage import balayer
+from implantation.moteur.capacite import capacite, sensibilites
+from implantation.moteur.collisions import CHEVAUCHEMENT, DEGAGEMENT, DEPASSEMENT, EMPIETEMENT, HORS_BATIMENT, controler
+from implantation.moteur.empreinte import BORNES_STOCK, empreinte_minimale
+from implantation.moteur.equilibrage import equilibrer, longueurs_cotes
+from implantation.moteur.robustesse import FORMES, analyser, incertitudes_autour
+from implantation.moteur.simulation import ConfigSimulation, simuler
+from implantation.moteur.trafic import ConfigTrafic, simuler_trafic, voies
+
+
+# Aperçu pleine qualité : mêmes options que st.pyplot (bbox serrée, 200 dpi)
+DPI_PLEINE_QUALITE = 200
+
+
+@st.fragment
+def apercu_plan(fig, cle=None):
+    """
+    Aperçu écran du plan. En aperçu rapide (par défaut), plan simplifié à
+    résolution d'écran : couleurs à plat, sans hachures, petits textes
+    masqués (voir implantation.dessin.rendre_apercu) ; les exports restent
+    en pleine qualité. Avec `cle` (clé des paramètres du plan), le PNG
+    rendu est conservé comme un export : des paramètres inchangés ou déjà
+    vus réaffichent l'image sans nouveau rendu.
+    """
+    rapide = st.toggle("⚡ Aperçu rapide", value=True, key="apercu_rapide", help="Sans hachures ni transparence, petits textes masqués. Les exports PDF / PNG restent complets.")
+    if cle is None:
+        if rapide:
+            st.image(rendre_apercu(fig), width="stretch")
+        else:
+            with verrou_figure(fig):
+                st.pyplot(fig)
+        return
+    if rapide:
+        cle_apercu = cle_parametres(cle, "apercu", DPI_APERCU, LARGEUR_ECRAN_PX, HAUTEUR_MAX_ECRAN_PX, SEUIL_TEXTE_APERCU)
+        png = CACHE_EXPORT.obtenir(cle_apercu, lambda: DEPOT.obtenir(cle_apercu, lambda: rendre_apercu(fig)))
+    else:
+        png = export_differe(fig, cle, "png", depot=DEPOT, dpi=DPI_PLEINE_QUALITE)()
+    st.image(png, width="stretch")
+
+
+@st.fragment
+def panneau_detail(fig, ax, cle, y_min, y_max, hauteurs=(20, 40, 80)):
+    """
+    Vue détaillée d'une bande du plan (ordonnées y_min..y_max, en m), rendue
+    seule au clic : le coût ne dépend que de la bande, pas de la longueur.
+    """
+    if not st.toggle("🔍 Vue détaillée", key="vue_detail", help="Bande du plan à plus haute résolution"):
+        return
+    c1, c2 = st.columns([1, 2])
+    hauteur = c1.select_slider("Hauteur de la bande (m)", hauteurs, value=hauteurs[1])
+    debut_max = max(float(y_min), float(y_max) - hauteur)
+    debut = c2.slider("Début de la bande (m)", float(y_min), debut_max, float(y_min), step=1.0) if debut_max > y_min else float(y_min)
+    cle_detail = cle_parametres(cle, "detail", debut, hauteur, LARGEUR_ECRAN_PX, SEUIL_TEXTE_APERCU)
+
+    def rendre_bande():
+        # Cadrage et rendu sous le même verrou que l'aperçu et les exports
+        with verrou_figure(fig):
+            return rendre_apercu(fig, zone=zone_detail(ax, debut, debut + hauteur))
+
+    png = CACHE_EXPORT.obtenir(cle_detail, rendre_bande)
+    st.image(png, width="stretch")
+
+
+@st.fragment
+def panneau_export(fig, cle, pdf, png, dpi=300, titre="📥 Export", profil=None):
+    """Boutons PDF / PNG rendus au clic ; `pdf` et `png` : (libellé, nom de fichier)"""
+    st.subheader(titre)
+    c1, c2 = st.columns(2)
+    for col, (libelle, fichier), format, mime, options in (
+        (c1, pdf, "pdf", "application/pdf", {}),
+        (c2, png, "png", "image/png", {"dpi": dpi}),
+    ):
+        # Rendus haute définition calculés seulement au clic, puis mis en cache
+        donnees = export_differe(fig, cle, format, depot=DEPOT, **options)
+        if profil is not None:
+            donnees = profil.envelopper(f"export_{format}", donnees)
+        col.download_button(libelle, donnees, fichier, mime, on_click="ignore")
+
+
+GENRES_CONFLIT = {
+    CHEVAUCHEMENT: "Chevauchement", DEGAGEMENT: "Dégagement", EMPIETEMENT: "Empiètement allée",
+    HORS_BATIMENT: "Hors bâtiment", DEPASSEMENT: "Dépassement longueur",
+}
+
+
+@st.fragment
+def panneau_collisions(plan, obstacles=()):
+    """Chevauchements, dégagements et sorties du bâtiment du plan (et des obstacles : camions...)"""
+    with st.expander("🚧 Contrôle géométrique"):
+        # Contrôle lancé sur demande : le contenu d'un expander s'exécute même replié
+        if not st.toggle("Contrôler le plan", key=f"ctrl_{plan.variante}"):
+            return
+        conflits = controler(plan, obstacles)
+        if not conflits:
+            st.caption("Ni chevauchement, ni dégagement insuffisant, ni empiètement sur les allées.")
+            return
+        st.markdown(f"**{len(conflits)} conflit{'s' if len(conflits) > 1 else ''}**")
+        st.dataframe(
+            [{"Conflit": GENRES_CONFLIT[c.genre], "Élément": c.a, "Avec": c.b or "", "m": round(c.mesure, 2)} for c in conflits],
+            hide_index=True,
+        )
+        st.caption(f"Dégagement minimal entre matières : {plan.parametres.espace_inter_matiere:g} m")
+
+
+@st.fragment
+def panneau_empreinte(variante, params, ordre=None):
+    """Plus petit bâtiment (largeur x longueur) qui tient la recette courante, dans l'ordre du plan"""
+    with st.expander("📐 Plus petit bâtiment pour cette recette"):
+        if st.button("Chercher l'empreinte minimale", key=f"emp_go_{variante}"):
+            empreinte = empreinte_minimale(variante, params, ordre)
+            if empreinte is None:
+                st.warning("Aucune configuration ne tient dans les bornes des sliders.")
+            else:
+                e = empreinte.parametres
+                c1, c2 = st.columns(2)
+                c1.metric("Dimensions", f"{e.bat_largeur:g}m x {e.bat_longueur:g}m")
+                c2.metric("Surface", f"{int(empreinte.surface)} m²", delta=f"{int(empreinte.surface - params.bat_largeur * params.bat_longueur)} m²", delta_color="inverse")
+                stock = f"Stock : {e.largeur_stock:g}m | " if BORNES_STOCK[variante] is not None else ""
+                st.caption(f"{stock}Longueur utilisée : {empreinte.resultat.longueur_utilisee:.1f}m")
+
+
+@st.fragment
+def panneau_equilibrage(params, bornes, pas=0.25):
+    """Courbe largeur du stock -> longueur nécessaire (une allée scindée), équilibre marqué"""
+    with st.expander("⚖️ Équilibrage séchage / stock"):
+        # Courbe tracée sur demande : le contenu d'un expander s'exécute même replié
+        if not st.toggle("Afficher la courbe", key="equilibrage_courbe"):
+            return
+        equilibre = equilibrer(params, bornes)
+        gauche, droite = longueurs_cotes(params, params.largeur_stock)
+        c1, c2 = st.columns(2)
+        c1.metric("Stock équilibré", f"{equilibre.largeur_stock:.2f} m", delta=f"{equilibre.largeur_stock - params.largeur_stock:+.2f} m vs plan", delta_color="off")
+        c2.metric("Longueur nécessaire", f"{equilibre.longueur:.1f} m", delta=f"{equilibre.longueur - max(gauche, droite):+.1f} m vs plan", delta_color="inverse")
+        largeurs = np.arange(bornes[0], bornes[1] + pas / 2, pas)
+        gauche, droite = longueurs_cotes(params, largeurs)
+        st.line_chart(
+            pd.DataFrame({"Séchage (G)": gauche, "Stock (D)": droite, "Longueur nécessaire": np.maximum(gauche, droite)}, index=largeurs),
+            x_label="Largeur du stock (m)", y_label="Longueur (m)",
+        )
+        st.caption("Au-delà de l'équilibre, élargir un côté allonge l'autre : la longueur nécessaire est le plus long des deux.")
+
+
+@st.fragment
+def panneau_faisabilite(variante, params, largeurs, longueurs, ordre=None):
+    """
+    Carte de faisabilité sur tout le domaine des sliders (largeurs et
+    longueurs : bornes en m), calculée d'un bloc par le moteur vectorisé.
+    """
+    with st.expander("🗺️ Carte de faisabilité (largeur x longueur)"):
+        # Le contenu d'un expander s'exécute même replié : carte calculée sur demande
+        if not st.toggle("Afficher la carte", key=f"carte_{variante}"):
+            return
+        c1, c2 = st.columns(2)
+        pas = c1.select_slider("Pas (m)", (2.0, 1.0, 0.5), value=1.0, key=f"carte_pas_{variante}")
+        marge = c2.radio("Couleur", ("Marge de longueur", "Faisable / non"), horizontal=True, key=f"carte_couleur_{variante}") == "Marge de longueur"
+        # Largeur utile = largeur du bâtiment (séquentielle) ; ordre et paires du plan affiché
+        res = balayer(
+            variante, params.avec(largeur_utile=None), ordre,
+            bat_longueur=np.arange(longueurs[0], longueurs[1] + pas / 2, pas),
+            bat_largeur=np.arange(largeurs[0], largeurs[1] + pas / 2, pas),
+        )
+        st.image(carte_faisabilite(res, (params.bat_largeur, params.bat_longueur), marge), width="stretch")
+        nombre = f"{len(res):,}".replace(",", " ")
+        st.caption(f"{nombre} bâtiments évalués ; trait noir : frontière de faisabilité, point : bâtiment courant")
+
+
+@st.fragment
+def panneau_capacite(variante, params, ordre=None):
+    """Plus grand tonnage mensuel que le bâtiment courant absorbe, et son évolution avec la recette"""
+    with st.expander("🏭 Capacité maximale du bâtiment (t/mois)"):
+        # Une résolution par rerun et par matière : capacité calculée sur demande
+        if not st.toggle("Calculer la capacité", key=f"cap_{variante}"):
+            return
+        (t1, j1), (t2, j2) = LOI_STOCK_CONTINUE
+        loi = st.radio(
+            "Autonomie du stock", (f"Selon le flux ({j1} j à {t1} t, {j2} j à {t2} t)", "Fixe"),
+            horizontal=True, key=f"cap_loi_{variante}",
+        )
+        if loi == "Fixe":
+            jours = st.number_input("Autonomie (jours)", 1.0, 60.0, float(params.jours_stock), step=1.0, key=f"cap_jours_{variante}")
+            loi = ((0.0, jours),)
+        else:
+            loi = LOI_STOCK_CONTINUE
+        c = capacite(variante, params, loi, ordre)
+        if not c.faisable:
+            st.error("Le bâtiment déborde même sans flux : longueurs minimales des tas et espacements dépassent sa longueur.")
+            return
+        c1, c2 = st.columns(2)
+        valeur = f"{c.tonnage:,.0f} t".replace(",", " ") if c.atteinte else f"> {c.tonnage:,.0f} t".replace(",", " ")
+        c1.metric("Tonnage maximal / mois", valeur, delta=f"{c.marge(params.scenario):+,.0f} t vs {params.scenario:g} t".replace(",", " "))
+        c2.metric("Soit par jour ouvré", f"{c.tonnage_jour:.0f} t", delta=f"{c.parametres.jours_stock:.1f} j de stock", delta_color="off")
+
+        st.caption("Capacité pour +1 point de part d'une matière (les autres réduites en proportion)")
+        st.dataframe(pd.DataFrame([
+            {"Matière": nom, "Capacité (t/mois)": round(c.tonnage + ecart), "Écart (t/mois)": round(ecart)}
+            for nom, ecart in sensibilites(variante, params, loi=loi, ordre=ordre).items()
+        ]), hide_index=True)
+
+
+@st.fragment
+def panneau_robustesse(variante, params, ordre=None):
+    """Monte Carlo sur les parts et densités de la recette, pour le bâtiment et l'ordre courants"""
+    with st.expander("🎲 Robustesse (parts & densités incertaines)"):
+        forme = st.selectbox("Loi", FORMES, key=f"mc_loi_{variante}")
+        c1, c2 = st.columns(2)
+        d_part = c1.number_input("Dispersion parts (points de %)", 0.0, 20.0, 2.0, step=0.5, key=f"mc_part_{variante}")
+        d_densite = c2.number_input("Dispersion densités (%)", 0.0, 50.0, 10.0, step=1.0, key=f"mc_dens_{variante}") / 100
+        c1, c2 = st.columns(2)
+        n = c1.selectbox("Tirages", (100_000, 300_000, 1_000_000), format_func=lambda v: f"{v:,}".replace(",", " "), key=f"mc_n_{variante}")
+        graine = c2.number_input("Graine", 0, 10**6, 0, key=f"mc_graine_{variante}")
+        st.caption("Écart-type pour la loi normale, demi-largeur pour les lois uniforme et triangulaire.")
+
+        if st.button("Lancer l'analyse", key=f"mc_go_{variante}"):
+            incertitudes = incertitudes_autour(params.recette, forme, d_part, d_densite)
+            res = analyser(variante, params, incertitudes, n=n, graine=int(graine), ordre=ordre)
+            centiles = res.percentiles()
+            c1, c2 = st.columns(2)
+            c1.metric("P(dépassement)", f"{res.proba_depassement:.1%}")
+            c2.metric("P(lot « Adapté »)", f"{res.proba_adapte:.1%}")
+            c1, c2, c3 = st.columns(3)
+            for col, q in zip((c1, c2, c3), (50, 95, 99)):
+                col.metric(f"Longueur P{q}", f"{centiles[q]:.1f} m")
+            st.caption(f"{res.n:,} tirages (graine {res.graine}) pour un bâtiment de {params.bat_longueur} m".replace(",", " "))
+
+
+@st.fragment
+def panneau_simulation(plan):
+    """Année simulée jour par jour : rotation J1/J2/J3 et remplissage des stocks du plan"""
+    with st.expander("📅 Simulation annuelle (rotation & stocks)"):
+        c1, c2 = st.columns(2)
+        variabilite = c1.number_input("Variabilité arrivages (%)", 0.0, 100.0, 0.0, step=5.0, key=f"sim_var_{plan.variante}") / 100
+        semaines = c2.number_input("Fermeture d'été (semaines)", 0, 6, 0, key=f"sim_ferm_{plan.variante}")
+        c1, c2 = st.columns(2)
+        niveau = c1.number_input("Stock initial (%)", 0.0, 100.0, 50.0, step=10.0, key=f"sim_niv_{plan.variante}") / 100
+        continue_ = c2.checkbox("Four 7j/7", value=True, key=f"sim_7j_{plan.variante}")
+
+        if st.button("Simuler l'année", key=f"sim_go_{plan.variante}"):
+            # Fermeture à partir du 1er août (jour 212)
+            fermetures = ((212, 212 + 7 * semaines - 1),) if semaines else ()
+            sim = simuler(plan, ConfigSimulation(
+                consommation_continue=continue_, fermetures=fermetures,
+                variabilite=variabilite, niveau_initial=niveau,
+            ))
+            alertes = sim.alertes()
+            c1, c2, c3, c4 = st.columns(4)
+            for col, (motif, titre) in zip((c1, c2, c3, c4), (("lot", "Lot plein"), ("stock", "Stock plein"), ("rupture", "Rupture"), ("rotation", "Rotation"))):
+                jours = set().union(*(set(a.get(motif, ())) for a in alertes.values()))
+                col.metric(titre, f"{len(jours)} j")
+
+            st.caption("Occupation des stocks (% de la surface dessinée)")
+            st.line_chart(pd.DataFrame((sim.taux_stock * 100).T, columns=sim.matieres))
+            taux_lots = sim.occupation_lots.max(axis=2) / np.maximum(sim.capacite_lots.max(axis=1), 1e-9)[:, None]
+            st.caption("Occupation du lot le plus chargé (% de sa surface)")
+            st.line_chart(pd.DataFrame((taux_lots * 100).T, columns=sim.matieres))
+
+
+@st.fragment
+def panneau_trafic(plan):
+    """Camions et chargeuses dans les deux allées sur un mois, pour le plan courant"""
+    with st.expander("🚛 Trafic dans les allées (camions & chargeuses)"):
+        c1, c2 = st.columns(2)
+        jours = c1.number_input("Jours simulés", 1, 365, 30, key=f"tr_jours_{plan.variante}")
+        nb_chargeuses = c2.number_input("Chargeuses", 1, 10, 2, key=f"tr_charg_{plan.variante}")
+        c1, c2 = st.columns(2)
+        charge = c1.number_input("Charge camion (t)", 5.0, 40.0, 25.0, step=1.0, key=f"tr_charge_{plan.variante}")
+        dechargement = c2.number_input("Déchargement (min)", 1.0, 60.0, 12.0, step=1.0, key=f"tr_dech_{plan.variante}")
+        config = ConfigTrafic(jours=int(jours), nb_chargeuses=int(nb_chargeuses), charge_camion=charge, duree_dechargement=dechargement)
+        n_voies = voies(plan.parametres.largeur_allee, config)
+        st.caption(f"{n_voies} véhicule(s) de front par allée ({config.largeur_camion} m + {config.jeu_lateral} m de jeu)")
+
+        if st.button("Simuler le trafic", key=f"tr_go_{plan.variante}", disabled=n_voies == 0):
+            res = simuler_trafic(plan, config)
+            st.dataframe(pd.DataFrame([{
+                "Allée": a.nom, "Voies": a.voies, "Utilisation": f"{a.utilisation:.0%}",
+                "File moyenne": round(a.file_moyenne, 2), "File max": a.file_max, "Passages": a.passages,
+            } for a in res.allees]), hide_index=True)
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Attente camion (moy.)", f"{res.attente_moyenne():.1f} min")
+            c2.metric("Attente camion (P95)", f"{res.attente_percentile():.1f} min")
+            c3.metric("Attente chargeuse (moy.)", f"{res.attente_moyenne('chargeuse'):.1f} min")
+            c1, c2 = st.columns(2)
+            c1.metric("Utilisation chargeuses", f"{res.utilisation_chargeuses:.0%}")
+            c2.metric("Délai de reprise (moy.)", f"{res.attentes_transfert.mean() if len(res.attentes_transfert) else 0:.0f} min")
+            st.caption(f"{res.nb_evenements:,} événements sur {res.jours} jours".replace(",", " "))
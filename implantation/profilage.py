@@ -0,0 +1,103 @@
+"""
+Profilage léger d'un rerun Streamlit, activé par un interrupteur de la barre
+latérale : chronomètre par étape (1. contrôles, 2. calculs, 3. dessin,
+aperçu, 4. export & KPI), nombre d'artistes matplotlib, tableau dans la
+barre latérale et trace JSON lignes pour l'analyse hors ligne.
+
+    profil = profileur("plan2allees-1")      # juste après st.title
+    ...
+    profil.etape("2. Calculs")               # clôt l'étape précédente
+    ...
+    profil.terminer(ax)                      # fin du script
+
+Désactivé, chaque appel ne coûte qu'un test de booléen.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import streamlit as st
+
+CHEMIN_TRACE = os.environ.get(
+    "IMPLANTATION_TRACE", str(Path.home() / ".cache" / "implantation" / "profilage.jsonl")
+)
+
+
+def compter_artistes(ax):
+    """Artistes d'un axe : patches, textes, collections et formes qu'elles regroupent"""
+    return {
+        "patches": len(ax.patches),
+        "textes": len(ax.texts),
+        "collections": len(ax.collections),
+        "formes": sum(len(c.get_paths()) for c in ax.collections),
+        "lignes": len(ax.lines),
+    }
+
+
+class Profileur:
+    def __init__(self, app, actif=True, chemin_trace=CHEMIN_TRACE):
+        self.app = app
+        self.actif = actif
+        self.chemin_trace = chemin_trace
+        self.etapes = {}
+        self.zone = st.sidebar.empty() if actif else None
+        self._nom = "1. Contrôles"
+        self._debut = self._t0 = time.perf_counter()
+
+    def etape(self, nom):
+        """Clôt l'étape en cours et démarre `nom`"""
+        if not self.actif:
+            return
+        t = time.perf_counter()
+        self.etapes[self._nom] = self.etapes.get(self._nom, 0.0) + (t - self._debut)
+        self._nom, self._debut = nom, t
+
+    def envelopper(self, nom, fonction):
+        """Fonction chronométrée à chaque appel (exports rendus au clic, hors rerun)"""
+        if not self.actif:
+            return fonction
+
+        def chronometree(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                self._tracer({"evenement": nom, "duree_ms": (time.perf_counter() - t) * 1000})
+        return chronometree
+
+    def _tracer(self, ligne):
+        ligne = {"horodatage": time.time(), "app": self.app, **ligne}
+        try:
+            Path(self.chemin_trace).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.chemin_trace, "a", encoding="utf-8") as f:
+                f.write(json.dumps(ligne, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+
+    def terminer(self, ax=None):
+        """Clôt la dernière étape, affiche le détail dans la barre latérale et l'ajoute à la trace"""
+        if not self.actif:
+            return
+        self.etape(None)
+        total = sum(self.etapes.values())
+        artistes = compter_artistes(ax) if ax is not None else {}
+        with self.zone.container():
+            st.caption(f"⏱️ Rerun : {total * 1000:.0f} ms")
+            st.dataframe(
+                [{"Étape": nom, "ms": round(d * 1000, 1), "%": round(100 * d / total if total else 0, 1)} for nom, d in self.etapes.items()],
+                hide_index=True,
+            )
+            if artistes:
+                st.caption(" · ".join(f"{n} {k}" for k, n in artistes.items()))
+        self._tracer({
+            "evenement": "rerun", "total_ms": total * 1000,
+            "etapes_ms": {nom: d * 1000 for nom, d in self.etapes.items()}, "artistes": artistes,
+        })
+
+
+def profileur(app):
+    """Interrupteur de la barre latérale et Profileur (inactif si l'interrupteur est coupé)"""
+    actif = st.sidebar.toggle("⏱️ Profilage", key="profilage", help=f"Durée de chaque étape du rerun, tracée dans {CHEMIN_TRACE}")
+    return Profileur(app, actif)
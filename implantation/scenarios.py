@@ -0,0 +1,225 @@
+"""
+Calcul en lot de scénarios, sans navigateur :
+
+    python -m implantation.scenarios scenarios.csv -o resultats.csv
+    python -m implantation.scenarios scenarios.json -o resultats.jsonl --plans plans/ --processus 4
+
+Un scénario (ligne CSV, ou objet JSON dans une liste ou sous la clé
+"scenarios") contient les réglages de la barre latérale :
+- `variante` : stratégie (deux_allees...) ou script (plan2allees-1...) ;
+- `nom` (facultatif, numéro de ligne sinon) ;
+- tout champ de Parametres (bat_longueur, scenario, h_stock, alignement...) ;
+- la recette : colonnes `part:<matière>` / `densite:<matière>` en CSV,
+  dicts `parts` / `densites` en JSON ;
+- `loi_stock` : points « tonnage:jours » séparés par « ; » en CSV
+  (ex. `3000:15;6000:10`), liste de paires en JSON ;
+- `optimiser_ordre` (deux allées) : ordre et paires optimisés comme la case
+  de plan2allees-2.
+Les champs absents gardent les valeurs par défaut de la variante.
+
+Les scénarios sont répartis sur un pool `multiprocessing` ; chaque résultat
+est écrit (CSV ou JSON lignes, selon l'extension) dès qu'il est prêt, donc
+dans l'ordre de fin. Les plans déjà calculés sont relus du dépôt partagé
+(voir implantation.depot). Les plans ne sont rendus qu'avec `--plans`.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from dataclasses import fields
+
+from implantation.depot import CHEMIN_DEFAUT, DepotResultats
+from implantation.moteur import STRATEGIES, Parametres, recette
+
+# Script Streamlit -> stratégie
+SCRIPTS = {
+    "plan1allee-1": "une_allee_scindee",
+    "plan1allee-2": "une_allee_sequentielle",
+    "plan2allees-1": "deux_allees",
+    "plan2allees-2": "deux_allees_groupees",
+}
+
+CHAMPS = {f.name: f for f in fields(Parametres) if f.name != "recette"}
+
+COLONNES = [
+    "nom", "variante", "bat_largeur", "bat_longueur", "surf_sechage_tot", "surf_stock_tot",
+    "longueur_utilisee", "marge_longueur", "depassement", "nb_adaptes", "plan", "erreur",
+]
+
+VRAI = {"1", "true", "vrai", "oui", "yes"}
+
+
+def _valeur(champ, brut):
+    """Convertit une valeur lue (texte CSV ou JSON) vers le type du champ"""
+    if isinstance(brut, str):
+        brut = brut.strip()
+        if brut == "":
+            return None
+    if champ.type is bool:
+        return brut.lower() in VRAI if isinstance(brut, str) else bool(brut)
+    if champ.type is int:
+        return int(float(brut))
+    if champ.type is float:
+        return float(brut)
+    if champ.type is tuple:
+        # Loi d'autonomie : "3000:15;6000:10" ou [[3000, 15], [6000, 10]]
+        points = [p.split(":") for p in brut.split(";")] if isinstance(brut, str) else brut
+        return tuple((float(t), float(j)) for t, j in points)
+    return brut
+
+
+def _variante(nom):
+    nom = SCRIPTS.get(os.path.splitext(nom)[0], nom)
+    if nom not in STRATEGIES:
+        raise ValueError(f"Variante inconnue : {nom} (attendu : {', '.join([*STRATEGIES, *SCRIPTS])})")
+    return nom
+
+
+def parametres(scenario):
+    """(variante, Parametres, optimiser_ordre) d'un scénario lu"""
+    scenario = dict(scenario)
+    variante = _variante(str(scenario.pop("variante", "")).strip())
+    scenario.pop("nom", None)
+    optimiser = str(scenario.pop("optimiser_ordre", "")).strip().lower() in VRAI
+    base = STRATEGIES[variante].defaut
+
+    parts = {m.nom: m.pourcentage for m in base.recette}
+    densites = {m.nom: m.densite for m in base.recette}
+    parts.update({k: float(v) for k, v in (scenario.pop("parts", None) or {}).items()})
+    densites.update({k: float(v) for k, v in (scenario.pop("densites", None) or {}).items()})
+
+    changements = {}
+    for cle, brut in scenario.items():
+        prefixe, _, matiere = cle.partition(":")
+        if matiere and prefixe in ("part", "densite"):
+            if str(brut).strip() != "":
+                (parts if prefixe == "part" else densites)[matiere] = float(brut)
+        elif cle in CHAMPS:
+            valeur = _valeur(CHAMPS[cle], brut)
+            if valeur is not None:
+                changements[cle] = valeur
+        else:
+            raise ValueError(f"Colonne inconnue : {cle}")
+
+    inconnues = set(parts) ^ set(densites)
+    if inconnues:
+        raise ValueError(f"Part ou densité manquante pour : {', '.join(sorted(inconnues))}")
+    return variante, base.avec(recette=recette(parts, densites), **changements), optimiser
+
+
+def lire_scenarios(chemin):
+    """Liste des scénarios (dicts) d'un fichier CSV ou JSON"""
+    with open(chemin, encoding="utf-8-sig", newline="") as f:
+        if chemin.lower().endswith(".json"):
+            donnees = json.load(f)
+            return donnees["scenarios"] if isinstance(donnees, dict) else donnees
+        # Point-virgule accepté (export Excel français)
+        entete = f.readline()
+        f.seek(0)
+        return list(csv.DictReader(f, delimiter=";" if ";" in entete else ","))
+
+
+def evaluer(indice, scenario, dossier_plans=None, format_plan="png", chemin_depot=None):
+    """KPIs d'un scénario (dict de COLONNES), l'erreur éventuelle comprise"""
+    ligne = dict.fromkeys(COLONNES, "")
+    ligne["nom"] = scenario.get("nom") or f"scenario_{indice + 1}"
+    try:
+        variante, p, optimiser = parametres(scenario)
+        ligne["variante"] = variante
+        ordre = None
+        if optimiser and variante.startswith("deux_allees"):
+            from implantation.moteur.ordre import optimiser_ordre
+            ordre = optimiser_ordre(variante, p).ordre
+        if chemin_depot:
+            plan = DepotResultats(chemin_depot).calculer(variante, p, ordre)
+        else:
+            plan = STRATEGIES[variante].calculer(p, ordre)
+        ligne.update(bat_largeur=p.bat_largeur, bat_longueur=p.bat_longueur)
+        ligne.update({k: round(v, 3) if isinstance(v, float) else v for k, v in plan.indicateurs().items()})
+        if dossier_plans:
+            ligne["plan"] = rendre_plan(plan, os.path.join(dossier_plans, f"{ligne['nom']}.{format_plan}"), ligne["nom"])
+    except Exception as e:  # un scénario invalide ne doit pas arrêter le lot
+        ligne["erreur"] = f"{type(e).__name__}: {e}"
+    return ligne
+
+
+def rendre_plan(plan, chemin, titre=None):
+    from implantation.dessin import figure_plan
+
+    fig = figure_plan(plan, titre=titre)
+    fig.savefig(chemin, bbox_inches="tight", dpi=150)
+    return chemin
+
+
+def _evaluer(tache):
+    return evaluer(*tache)
+
+
+class _Ecrivain:
+    """Sortie CSV ou JSON lignes, vidée après chaque résultat"""
+
+    def __init__(self, f, chemin):
+        self.f = f
+        self.json = chemin.lower().endswith((".json", ".jsonl"))
+        if not self.json:
+            self.csv = csv.DictWriter(f, fieldnames=COLONNES)
+            self.csv.writeheader()
+
+    def ecrire(self, ligne):
+        if self.json:
+            self.f.write(json.dumps(ligne, ensure_ascii=False) + "\n")
+        else:
+            self.csv.writerow(ligne)
+        self.f.flush()
+
+
+def executer(scenarios, sortie, processus=None, dossier_plans=None, format_plan="png", chemin_depot=None, journal=sys.stderr):
+    """Calcule tous les scénarios, écrit chaque résultat dès sa fin ; renvoie le nombre d'erreurs"""
+    if dossier_plans:
+        os.makedirs(dossier_plans, exist_ok=True)
+    taches = [(i, s, dossier_plans, format_plan, chemin_depot) for i, s in enumerate(scenarios)]
+    processus = processus or min(os.cpu_count() or 1, max(len(taches), 1))
+    erreurs = 0
+
+    with open(sortie, "w", encoding="utf-8", newline="") as f:
+        ecrivain = _Ecrivain(f, sortie)
+        if processus > 1:
+            pool = multiprocessing.Pool(processus)
+            resultats = pool.imap_unordered(_evaluer, taches)
+        else:
+            pool = None
+            resultats = map(_evaluer, taches)
+        try:
+            for n, ligne in enumerate(resultats, 1):
+                ecrivain.ecrire(ligne)
+                erreurs += bool(ligne["erreur"])
+                etat = ligne["erreur"] or ("DÉPASSEMENT" if ligne["depassement"] else "OK")
+                print(f"[{n}/{len(taches)}] {ligne['nom']} : {etat}", file=journal)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    return erreurs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m implantation.scenarios", description="Calcul en lot de scénarios d'implantation")
+    parser.add_argument("fichier", help="scénarios .csv ou .json")
+    parser.add_argument("-o", "--sortie", default="resultats.csv", help="résultats .csv ou .jsonl (défaut : resultats.csv)")
+    parser.add_argument("-p", "--processus", type=int, default=None, help="taille du pool (défaut : nombre de CPU)")
+    parser.add_argument("--plans", metavar="DOSSIER", help="rend aussi le plan de chaque scénario dans DOSSIER")
+    parser.add_argument("--format-plan", default="png", choices=("png", "pdf", "svg"))
+    parser.add_argument("--depot", default=CHEMIN_DEFAUT, help=f"dépôt des plans déjà calculés (défaut : {CHEMIN_DEFAUT})")
+    parser.add_argument("--sans-depot", action="store_true", help="recalcule tout sans lire ni remplir le dépôt")
+    args = parser.parse_args(argv)
+
+    chemin_depot = None if args.sans_depot else args.depot
+    erreurs = executer(lire_scenarios(args.fichier), args.sortie, args.processus, args.plans, args.format_plan, chemin_depot)
+    return 1 if erreurs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
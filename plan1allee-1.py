@@ -1,12 +1,28 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-import io
+
+from implantation.dessin import dessiner_plan, fond_statique
+from implantation.depot import DEPOT, empreinte_sources
+from implantation.export import cle_parametres
+from implantation.figures import figure_session
+from implantation.profilage import profileur
+from implantation.panneaux import apercu_plan, panneau_capacite, panneau_collisions, panneau_empreinte, panneau_equilibrage, panneau_faisabilite, panneau_export, panneau_robustesse, panneau_simulation
+from implantation.moteur.equilibrage import equilibrer
+from implantation.moteur import NB_LOTS, SECHAGE, STOCK, Parametres, recette
+
+# Style des couches : lots de séchage (gauche), stock sec (droite)
+STYLES = {
+    SECHAGE: dict(alpha=0.5, linewidth=1),
+    STOCK: dict(alpha=0.3, hatch='..', linewidth=1),
+}
 
 # --- CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="Simulateur Entrepôt Pro", layout="wide")
 
 st.title("Simulateur d'Implantation")
+
+# Profilage du rerun (interrupteur en tête de barre latérale)
+profil = profileur("plan1allee-1")
 st.markdown("**Plan de Masse Opérationnel :** Séchage & Stockage de Matières Premières")
 
 # ==========================================
@@ -30,15 +46,17 @@ with st.sidebar:
     st.subheader("📐 Géométrie des Zones")
     largeur_dispo = bat_largeur - largeur_allee - marge_securite
     
+    bornes_stock = (2.0, float(largeur_dispo - 5) if largeur_dispo > 7 else 2.0)
+    equilibrage_auto = st.toggle("⚖️ Équilibrage automatique", key="equilibrage_auto", help="Largeur du stock qui égalise les longueurs séchage (G) et stock (D)")
     largeur_stock_droite = st.slider(
         "Largeur allouée au Stockage (Droite)", 
-        min_value=2.0, 
-        max_value=float(largeur_dispo - 5) if largeur_dispo > 7 else 2.0, 
+        min_value=bornes_stock[0], 
+        max_value=bornes_stock[1], 
         value=float(6.5), 
-        step=0.5
+        step=0.5,
+        disabled=equilibrage_auto,
     )
-    largeur_sechage_gauche = largeur_dispo - largeur_stock_droite
-    st.caption(f"Séchage (G) : {largeur_sechage_gauche:.1f}m | Stockage (D) : {largeur_stock_droite:.1f}m")
+    zone_largeurs = st.empty()
     st.markdown("---")
 
     st.header("2. Scénario & Flux")
@@ -82,82 +100,77 @@ with st.sidebar:
 # ==========================================
 # 2. CALCULS MOTEUR
 # ==========================================
-
-MATIERES = {
-    "Rebuts PAM": {"ratio": pct_Rebuts_PAM/100, "densite": den_Rebuts_PAM, "couleur": "#ff9933"},
-    "Jets Blénod": {"ratio": pct_jet_blenod/100, "densite": den_jet_blenod, "couleur": "#0a82d3"},
-    "Gueuset": {"ratio": pct_gueuset/100, "densite": den_gueuset, "couleur": "#aaaaaa"},
-    "Fontes Foug": {"ratio": pct_fontes_foug/100, "densite": den_fontes_foug, "couleur": "#ffcc66"},
-    "Ferraille": {"ratio": pct_ferraille/100, "densite": den_ferraille, "couleur": "#da1884"},
-}
+profil.etape("2. Calculs")
+
+params = Parametres(
+    bat_longueur=bat_longueur, bat_largeur=bat_largeur, largeur_allee=largeur_allee,
+    marge_securite=marge_securite, largeur_stock=largeur_stock_droite,
+    espace_inter_matiere=espace_inter_matiere, espace_inter_lot=espace_inter_lot,
+    scenario=scenario, jours_ouvres=jours_ouvres, h_sechage=h_sechage, h_stock=h_stock_sec,
+    duree_sechage=duree_sechage,
+    recette=recette(
+        {"Rebuts PAM": pct_Rebuts_PAM, "Jets Blénod": pct_jet_blenod, "Gueuset": pct_gueuset,
+         "Fontes Foug": pct_fontes_foug, "Ferraille": pct_ferraille},
+        {"Rebuts PAM": den_Rebuts_PAM, "Jets Blénod": den_jet_blenod, "Gueuset": den_gueuset,
+         "Fontes Foug": den_fontes_foug, "Ferraille": den_ferraille},
+    ),
+)
+if equilibrage_auto:
+    # Largeur exacte (hors pas du slider) qui minimise max(gauche, droite)
+    largeur_stock_droite = equilibrer(params, bornes_stock).largeur_stock
+    params = params.avec(largeur_stock=largeur_stock_droite)
+largeur_sechage_gauche = largeur_dispo - largeur_stock_droite
+zone_largeurs.caption(f"Séchage (G) : {largeur_sechage_gauche:.1f}m | Stockage (D) : {largeur_stock_droite:.{2 if equilibrage_auto else 1}f}m")
+# Relu du dépôt partagé si ces paramètres ont déjà été calculés
+plan = DEPOT.calculer("une_allee_scindee", params)
 
 surface_totale = bat_longueur * bat_largeur
 surface_allee = bat_longueur * largeur_allee
 surface_marge = bat_longueur * marge_securite
 
-resultats = {}
-surface_sechage_totale = 0
-surface_stock_totale = 0
-
-for nom, props in MATIERES.items():
-    flux_mat_jour = tonnage_jour * props["ratio"]
-    
-    # SÉCHAGE
-    vol_sechage = (flux_mat_jour * duree_sechage) / props["densite"]
-    surf_sechage = vol_sechage / h_sechage
-    
-    # STOCK SEC
-    jours_stock = 15 if scenario == 3000 else 10
-    vol_stock = (flux_mat_jour * jours_stock) / props["densite"]
-    surf_stock = vol_stock / h_stock_sec
-    
-    resultats[nom] = {
-        "sechage": surf_sechage,
-        "stock": surf_stock,
-        "longueur_sechage": surf_sechage / largeur_sechage_gauche,
-        "longueur_stock": surf_stock / largeur_stock_droite,
-        "props": props
-    }
-    surface_sechage_totale += surf_sechage
-    surface_stock_totale += surf_stock
+resultats = plan.matieres
+surface_sechage_totale = plan.surf_sechage_tot
+surface_stock_totale = plan.surf_stock_tot
+depassement = plan.depassement
 
 # ==========================================
 # 3. GÉNÉRATION DU PLAN
 # ==========================================
+profil.etape("3. Dessin")
 
-fig, ax = plt.subplots(figsize=(11.69, 16.53)) # A3 Portrait
+fig, ax = figure_session("plan1allee-1", figsize=(11.69, 16.53)) # A3 Portrait
 
-# Fond Blanc
-ax.add_patch(patches.Rectangle((0, 0), bat_largeur, bat_longueur, edgecolor='black', facecolor='white', lw=2))
+# --- FOND STATIQUE (ne dépend que de la géométrie : rendu une fois, sous les matières) ---
+def tracer_fond(ax):
+    # Fond Blanc
+    ax.add_patch(patches.Rectangle((0, 0), bat_largeur, bat_longueur, edgecolor='black', facecolor='white', lw=2))
 
-# Allée Centrale
-x_allee = largeur_sechage_gauche
-ax.add_patch(patches.Rectangle((x_allee, 0), largeur_allee, bat_longueur, color='#e0e0e0', alpha=0.5, hatch='//'))
-ax.text(x_allee + largeur_allee/2, bat_longueur/2, f"ALLÉE\n{largeur_allee}m", 
-        ha='center', va='center', color='#666', rotation=90, fontweight='bold', fontsize=10)
+    # Allée Centrale
+    x_allee = largeur_sechage_gauche
+    ax.add_patch(patches.Rectangle((x_allee, 0), largeur_allee, bat_longueur, color='#e0e0e0', alpha=0.5, hatch='//'))
+    ax.text(x_allee + largeur_allee/2, bat_longueur/2, f"ALLÉE\n{largeur_allee}m", 
+            ha='center', va='center', color='#666', rotation=90, fontweight='bold', fontsize=10)
 
-# Marge de Sécurité
-if marge_securite > 0:
-    x_marge = x_allee + largeur_allee
-    ax.add_patch(patches.Rectangle((x_marge, 0), marge_securite, bat_longueur, color='white', alpha=1.0, hatch='..'))
-    ax.text(x_marge + marge_securite/2, bat_longueur/3, f"BUFFER\n{marge_securite}m", 
-            ha='center', va='center', color='#999', rotation=90, fontsize=8)
+    # Marge de Sécurité
+    if marge_securite > 0:
+        x_marge = x_allee + largeur_allee
+        ax.add_patch(patches.Rectangle((x_marge, 0), marge_securite, bat_longueur, color='white', alpha=1.0, hatch='..'))
+        ax.text(x_marge + marge_securite/2, bat_longueur/3, f"BUFFER\n{marge_securite}m", 
+                ha='center', va='center', color='#999', rotation=90, fontsize=8)
 
-# --- CÔTÉ GAUCHE : SÉCHAGE ---
-curseur_y = 0
-depassement = False
+    # Cotes globales
+    ax.text(bat_largeur / 2, -3, f"LARGEUR TOTALE : {bat_largeur} m", ha='center', fontweight='bold')
+    ax.text(-5, bat_longueur / 2, f"LONGUEUR TOTALE : {bat_longueur} m", va='center', rotation=90, fontweight='bold')
+
+fond_statique(ax, ("plan1allee-1", empreinte_sources(__file__), bat_largeur, bat_longueur, largeur_allee, marge_securite, largeur_stock_droite), tracer_fond)
+
+# --- LOTS DE SÉCHAGE (GAUCHE) & STOCK SEC (DROITE) ---
+# Le séchage (gauche) et le stock (droite) s'empilent chacun avec l'espace inter-matière
+dessiner_plan(ax, plan, STYLES)
 
 for nom, res in resultats.items():
-    if res["props"]["ratio"] == 0: continue
-    
-    l_totale = res["longueur_sechage"]
-    l_jour = l_totale / 3
-    coul = res["props"]["couleur"]
-    
-    # Calcul de la hauteur totale du bloc MATIÈRE (incluant les espaces inter-lots)
-    # Hauteur bloc = 3 * l_jour + 2 * espace_inter_lot
-    hauteur_bloc_visuel = (3 * l_jour) + (2 * espace_inter_lot)
-    
+    pl = plan.placements[nom]
+    curseur_y, hauteur_bloc_visuel, l_jour = pl["y"], pl["h_bloc"], pl["l_jour"]
     y_center_block = curseur_y + hauteur_bloc_visuel / 2
     
     # Flèche de rotation
@@ -170,74 +183,33 @@ for nom, res in resultats.items():
             fontsize=8, ha='center', va='center', rotation=90, color='#444'
         )
 
-    # Dessin des 3 lots
-    for i in range(3): 
-        # Position Y tenant compte des espaces
-        y_pos = curseur_y + (i * l_jour) + (i * espace_inter_lot)
-        
-        if y_pos + l_jour > bat_longueur:
-            fill_col = '#ffcccc'
-            edge_col = 'red'
-            depassement = True
-        else:
-            fill_col = coul
-            edge_col = 'black'
-            
-        ax.add_patch(patches.Rectangle((0, y_pos), largeur_sechage_gauche, l_jour, 
-                                       facecolor=fill_col, edgecolor=edge_col, alpha=0.5, linewidth=1))
-        
-        label_lot = f"Lot {i+1}"
-        if l_jour > 0.5:
-             ax.text(0.5, y_pos + l_jour/2, label_lot, 
-                        ha='left', va='center', fontsize=7, color='#333', fontweight='normal')
+    # Numéro des 3 lots
+    if l_jour > 0.5:
+        for i in range(NB_LOTS): 
+            y_pos = curseur_y + (i * l_jour) + (i * espace_inter_lot)
+            ax.text(0.5, y_pos + l_jour/2, f"Lot {i+1}", 
+                    ha='left', va='center', fontsize=7, color='#333', fontweight='normal')
 
     # Etiquette Centrale
     if hauteur_bloc_visuel > 1:
-        label_text = f"{nom}\n{int(res['sechage'])} m²\n(H={h_sechage}m)"
+        label_text = f"{nom}\n{int(res['surf_sech'])} m²\n(H={h_sechage}m)"
         ax.text(largeur_sechage_gauche/2, y_center_block, label_text, 
                 ha='center', va='center', fontsize=9, fontweight='bold', color='black',
                 bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=2))
 
-    # Mise à jour du curseur pour la prochaine matière
-    # On ajoute la hauteur du bloc + l'espace inter-matière
-    curseur_y += hauteur_bloc_visuel + espace_inter_matiere
-
-# Limite Batiment
-ax.axhline(y=bat_longueur, color='red', linestyle='--', linewidth=1.5)
-if depassement:
-    ax.text(largeur_sechage_gauche/2, bat_longueur + 2, "⚠️ DÉPASSEMENT", ha='center', color='red', fontweight='bold')
-
-# --- CÔTÉ DROIT : STOCK SEC ---
-# On essaie d'aligner visuellement le début de chaque stock avec le début de sa zone de séchage
-# Mais comme les échelles de longueur sont différentes (stock plus court), on les empile simplement
-# en respectant l'espace inter-matière pour garder une logique visuelle aérée.
-
-curseur_y_droit = 0
-
-for nom, res in resultats.items():
-    if res["props"]["ratio"] == 0: continue
-
+    # Etiquette Stock
     l_stock = res["longueur_stock"]
-    y_pos = curseur_y_droit
-    coul = res["props"]["couleur"]
-    
-    x_stock = x_allee + largeur_allee + marge_securite
-    
-    ax.add_patch(patches.Rectangle((x_stock, y_pos), largeur_stock_droite, l_stock,
-                                   facecolor=coul, edgecolor='black', alpha=0.3, hatch='..', linewidth=1))
-    
     if l_stock > 1:
-        label_text = f"STOCK {nom}\n{int(res['stock'])} m²\n(H={h_stock_sec}m)"
-        ax.text(x_stock + largeur_stock_droite/2, y_pos + l_stock/2, label_text, 
+        x_stock = plan.zones["x_stock"]
+        label_text = f"STOCK {nom}\n{int(res['surf_stk'])} m²\n(H={h_stock_sec}m)"
+        ax.text(x_stock + largeur_stock_droite/2, pl["y_stock"] + l_stock/2, label_text, 
                 ha='center', va='center', fontsize=9, color='black', fontweight='bold',
                 bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=2))
-    
-    # On ajoute l'espace inter-matière aussi à droite pour être cohérent
-    curseur_y_droit += l_stock + espace_inter_matiere
 
-# Cotes globales
-ax.text(bat_largeur / 2, -3, f"LARGEUR TOTALE : {bat_largeur} m", ha='center', fontweight='bold')
-ax.text(-5, bat_longueur / 2, f"LONGUEUR TOTALE : {bat_longueur} m", va='center', rotation=90, fontweight='bold')
+# Limite Batiment
+ax.axhline(y=bat_longueur, color='red', linestyle='--', linewidth=1.5)
+if depassement:
+    ax.text(largeur_sechage_gauche/2, bat_longueur + 2, "⚠️ DÉPASSEMENT", ha='center', color='red', fontweight='bold')
 
 ax.set_xlim(-6, bat_largeur + 5)
 ax.set_ylim(-5, bat_longueur + 5)
@@ -249,51 +221,74 @@ ax.set_title(f"PLAN D'IMPLANTATION - {scenario} T/MOIS", fontsize=16, fontweight
 # 4. EXPORT
 # ==========================================
 
-col_graph, col_stats = st.columns([2, 1])
-
-with col_graph:
-    st.pyplot(fig)
-
-with col_stats:
-    st.subheader("📥 Téléchargements")
-    
-    pdf_buffer = io.BytesIO()
-    fig.savefig(pdf_buffer, format='pdf', bbox_inches='tight')
-    pdf_buffer.seek(0)
-    
-    png_buffer = io.BytesIO()
-    fig.savefig(png_buffer, format='png', dpi=300, bbox_inches='tight')
-    png_buffer.seek(0)
-
-    col_dl = st.columns(2)
-    col_dl[0].download_button("📄 Plan PDF", pdf_buffer, f"plan_{scenario}.pdf", "application/pdf")
-    col_dl[1].download_button("🖼️ Plan PNG", png_buffer, f"plan_{scenario}.png", "image/png")
-
-    st.markdown("---")
+# Bilan : sans widget, rendu à chaque rerun complet avec le plan courant
+def bilan_surfaces():
     st.subheader("📊 Bilan avec Espacements")
-    
+
     col_kpi = st.columns(2)
     col_kpi[0].metric("Séchage", f"{int(surface_sechage_totale)} m²")
     col_kpi[1].metric("Stockage", f"{int(surface_stock_totale)} m²")
-    
+
     col_kpi2 = st.columns(2)
     col_kpi2[0].metric("Allée", f"{int(surface_allee)} m²")
     col_kpi2[1].metric("Surface totale", f"{int(surface_totale)} m²")
 
     st.markdown("---")
-    
-    longueur_gauche = curseur_y
+
+    longueur_utilisee = plan.longueur_utilisee
     if depassement:
-        st.error(f"❌ **DÉPASSEMENT** : +{longueur_gauche - bat_longueur:.1f}m")
+        st.error(f"❌ **DÉPASSEMENT** : +{longueur_utilisee - bat_longueur:.1f}m")
     else:
-        st.success(f"✅ **LONGUEUR OK** : {longueur_gauche:.1f}m")
+        st.success(f"✅ **LONGUEUR OK** : {longueur_utilisee:.1f}m")
 
     # Calcul de l'espace perdu par les séparations
     # C'est une info intéressante pour l'utilisateur
-    longueur_totale_espaces = curseur_y - (sum([r['longueur_sechage'] for r in resultats.values() if r['props']['ratio']>0]))
+    longueur_totale_espaces = plan.curseurs["gauche"] - (sum([r['longueur_sechage'] for r in resultats.values()]))
     surface_perdue_separations = longueur_totale_espaces * largeur_sechage_gauche
-    
+
     st.info(f"Surface utilisée par les séparations (G) : ~{int(surface_perdue_separations)} m²")
 
     reste = surface_totale - surface_allee - surface_sechage_totale - surface_stock_totale - surface_marge - surface_perdue_separations
-    st.metric("Espace Libre Réel", f"{int(reste)} m²")
\ No newline at end of file
+    st.metric("Espace Libre Réel", f"{int(reste)} m²")
+
+
+# Clé du plan : aperçu et exports rendus une fois par jeu de paramètres
+cle_plan = cle_parametres("plan1allee-1", empreinte_sources(__file__), params)
+
+col_graph, col_stats = st.columns([2, 1])
+
+with col_graph:
+    profil.etape("Aperçu")
+    apercu_plan(fig, cle_plan)
+    profil.etape("4. Export & KPI")
+
+with col_stats:
+    # Fragments : un clic dans un panneau ne relance que ce panneau
+    panneau_export(fig, cle_plan, titre="📥 Téléchargements", pdf=("📄 Plan PDF", f"plan_{scenario}.pdf"), png=("🖼️ Plan PNG", f"plan_{scenario}.png"), dpi=300, profil=profil)
+
+    st.markdown("---")
+    bilan_surfaces()
+
+    # --- CONTRÔLE GÉOMÉTRIQUE (chevauchements, dégagements) ---
+    panneau_collisions(plan)
+
+    # --- ÉQUILIBRAGE SÉCHAGE / STOCK (courbe largeur -> longueur) ---
+    panneau_equilibrage(params, bornes_stock)
+
+    # --- EMPREINTE MINIMALE (calculée à la demande) ---
+    panneau_empreinte("une_allee_scindee", params)
+
+    # --- CARTE DE FAISABILITÉ (domaine des sliders) ---
+    panneau_faisabilite("une_allee_scindee", params, (30, 100), (40, 150))
+
+    # --- CAPACITÉ MAXIMALE (tonnage limite du bâtiment) ---
+    panneau_capacite("une_allee_scindee", params)
+
+    # --- ROBUSTESSE (Monte Carlo, calculée à la demande) ---
+    panneau_robustesse("une_allee_scindee", params)
+
+    # --- SIMULATION ANNUELLE (calculée à la demande) ---
+    panneau_simulation(plan)
+
+# Fin du rerun : détail du profilage (si activé)
+profil.terminer(ax)
@@ -1,13 +1,31 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-import io
+
+from implantation.dessin import CoucheRectangles, dessiner_plan, fond_statique
+from implantation.depot import DEPOT, empreinte_sources
+from implantation.export import cle_parametres
+from implantation.figures import figure_session
+from implantation.profilage import profileur
+from implantation.panneaux import apercu_plan, panneau_capacite, panneau_collisions, panneau_detail, panneau_empreinte, panneau_faisabilite, panneau_export, panneau_robustesse, panneau_simulation
+from implantation.moteur.empaquetage import empaqueter
+from implantation.moteur import MIN_LONGUEUR_LOT_Y, SECHAGE, STOCK, Parametres, recette
+
+# Style des couches : lots J1/J2/J3 et stocks (bord rouge si forme adaptée)
+STYLES = {
+    SECHAGE: dict(alpha=0.4, edge_adapte='red'),
+    STOCK: dict(alpha=0.8, hatch='..', edge_adapte='red'),
+}
+# Hauteur maximale de la figure (pouces), quelle que soit la longueur du contenu
+HAUTEUR_FIG_MAX = 36
 
 # --- CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="Simulateur Foug - Séquentiel", layout="wide")
 
 st.title("Plan de Masse Opérationnel : version à une allée - proposition Jean-Marc")
 
+# Profilage du rerun (interrupteur en tête de barre latérale)
+profil = profileur("plan1allee-2")
+
 # ==========================================
 # 1. BARRE LATÉRALE (CONTRÔLES)
 # ==========================================
@@ -20,6 +38,10 @@ with st.sidebar:
     st.markdown("---")
     st.header("2. Organisation")
     st.info("Flux : Allée Ext. > J1 > J2 > J3 > Stock (Empilés)")
+    empaquetage = st.toggle(
+        "📦 Empaquetage 2D", value=False, key="empaquetage_2d",
+        help="Reprend l'espace laissé à côté des lots « Adapté » au lieu de tout empiler le long de Y",
+    )
     
     largeur_allee = st.slider("Largeur Allée Extérieure (m)", 4.0, 12.0, 10.0, step=0.5)
     
@@ -29,7 +51,7 @@ with st.sidebar:
     marge_securite = st.slider("Marge Sécurité (m)", 0.0, 2.0, 0.0, step=0.1)
     
     # CONTRAINTE MINIMALE
-    MIN_Y = 4.5
+    MIN_Y = MIN_LONGUEUR_LOT_Y
     st.error(f"⚠️ Contrainte active : Profondeur Lot ≥ {MIN_Y}m")
 
     st.markdown("---")
@@ -75,179 +97,120 @@ with st.sidebar:
 # ==========================================
 # 2. CALCULS MOTEUR
 # ==========================================
-
-MATIERES = {
-    "Rebuts PAM": {"r": p_pam, "d": d_pam, "c": "#ff9933"},
-    "Fontes Foug": {"r": p_fon, "d": d_fon, "c": "#ffcc66"},
-    "Jets Blénod": {"r": p_jet, "d": d_jet, "c": "#0a82d3"},
-    "Gueuset": {"r": p_gue, "d": d_gue, "c": "#aaaaaa"},
-    "Ferraille": {"r": p_fer, "d": d_fer, "c": "#da1884"},
-}
-
-resultats = {}
-surf_sechage_tot = 0
-surf_stock_tot = 0
+profil.etape("2. Calculs")
+
+params = Parametres(
+    bat_longueur=bat_longueur, bat_largeur=bat_largeur, largeur_allee=largeur_allee,
+    largeur_utile=largeur_utile, marge_securite=marge_securite, coeff_forme=coeff_forme,
+    espace_inter_matiere=espace_inter_matiere, espace_inter_phase=espace_inter_phase,
+    min_longueur_lot=MIN_Y, scenario=scenario, jours_ouvres=jours_ouvres,
+    h_sechage=h_sechage, h_stock=h_stock, duree_sechage=duree_sechage,
+    recette=recette(
+        {"Rebuts PAM": p_pam, "Fontes Foug": p_fon, "Jets Blénod": p_jet, "Gueuset": p_gue, "Ferraille": p_fer},
+        {"Rebuts PAM": d_pam, "Fontes Foug": d_fon, "Jets Blénod": d_jet, "Gueuset": d_gue, "Ferraille": d_fer},
+    ),
+)
+# Chaque lot J et chaque stock : pleine largeur, ou largeur réduite si Y < MIN_Y
+# Relu du dépôt partagé si ces paramètres ont déjà été calculés
+plan_sequentiel = DEPOT.calculer("une_allee_sequentielle", params)
+plan = plan_sequentiel
+if empaquetage:
+    # Plan empaqueté, conservé sous sa propre clé : dessin, contrôle et exports le reprennent
+    plan = DEPOT.obtenir(cle_parametres("empaquetage", "une_allee_sequentielle", params), lambda: empaqueter(plan_sequentiel))
+
+resultats = plan.matieres
+surf_sechage_tot = plan.surf_sechage_tot
+surf_stock_tot = plan.surf_stock_tot
 
 # Largeur effective (max X dispo)
-largeur_max_x = max(1.0, largeur_utile - (2 * marge_securite))
-
-def calculer_dimensions_lot(surface, width_max, min_y):
-    """Calcule h (Y) et w (X) en respectant min_y"""
-    y_theorique = surface / width_max
-    if y_theorique < min_y:
-        # Contrainte active : on fixe Y à min_y et on réduit X
-        return min_y, surface / min_y, True # h, w, is_adapted
-    else:
-        # Pas de contrainte : plein largeur
-        return y_theorique, width_max, False
-
-for nom, data in MATIERES.items():
-    if data["r"] == 0: continue
-    
-    flux_jour = tonnage_jour * (data["r"]/100)
-    
-    # --- SÉCHAGE (1 JOUR) ---
-    vol_jour = flux_jour / data["d"]
-    surf_jour = vol_jour / h_sechage
-    
-    h_jour, w_jour, adapt_jour = calculer_dimensions_lot(surf_jour, largeur_max_x, MIN_Y)
-    
-    # --- STOCKAGE ---
-    vol_stock = (flux_jour * (15 if scenario==3000 else 10)) / data["d"]
-    surf_stock = vol_stock / (h_stock * coeff_forme)
-    
-    h_stock_calc, w_stock, adapt_stock = calculer_dimensions_lot(surf_stock, largeur_max_x, MIN_Y)
-    
-    # Longueur Totale du bloc matière (Y)
-    len_totale = (h_jour * 3) + h_stock_calc + (3 * espace_inter_phase)
-    
-    # Mise à jour des totaux globaux
-    surf_sechage_tot += (surf_jour * 3)
-    surf_stock_tot += surf_stock
-
-    resultats[nom] = {
-        # Dims Jour
-        "h_jour": h_jour,
-        "w_jour": w_jour,
-        "adapt_jour": adapt_jour,
-        "surf_jour": surf_jour,
-        # Dims Stock
-        "h_stock": h_stock_calc,
-        "w_stock": w_stock,
-        "adapt_stock": adapt_stock,
-        "surf_stock": surf_stock,
-        # Meta
-        "len_totale": len_totale,
-        "color": data["c"]
-    }
+largeur_max_x = plan.zones["largeur_max_x"]
 
 # ==========================================
 # 3. DESSIN
 # ==========================================
+profil.etape("3. Dessin")
 
 # Hauteur totale nécessaire
-hauteur_contenu = sum([res["len_totale"] + espace_inter_matiere for res in resultats.values()])
+hauteur_contenu = max(plan.curseurs.values(), default=0.0)
 max_y_plot = max(bat_longueur, hauteur_contenu) + 10
 
-fig_height = max(10, max_y_plot / 3) 
-fig, ax = plt.subplots(figsize=(12, fig_height))
-
-# --- STRUCTURE BÂTIMENT ---
-ax.add_patch(patches.Rectangle((0, 0), bat_largeur, bat_longueur, edgecolor='black', facecolor='white', lw=3))
-
-# --- ALLÉE EXTÉRIEURE ---
-rect_allee = patches.Rectangle((-largeur_allee, 0), largeur_allee, bat_longueur, color='#d1d1d1', hatch='//', alpha=0.5, edgecolor='black')
-ax.add_patch(rect_allee)
-for i in range(10, int(bat_longueur), 20):
-    ax.text(-largeur_allee/2, i, "ALLÉE EXT.", ha='center', va='center', rotation=90, color='#666', fontsize=8, fontweight='bold')
-
-# Ligne de séparation mur/allée (CORRECTION : Segment fini au lieu de ligne infinie)
-ax.plot([0, 0], [0, bat_longueur], color='black', linewidth=2)
+# Hauteur plafonnée : un contenu qui déborde largement ne grossit plus la figure
+# (le détail reste lisible dans la vue détaillée)
+fig_height = min(max(10, max_y_plot / 3), HAUTEUR_FIG_MAX)
+fig, ax = figure_session("plan1allee-2", figsize=(12, fig_height))
+
+# --- FOND STATIQUE (ne dépend que de la géométrie : rendu une fois, sous les matières) ---
+def tracer_fond(ax):
+    # --- STRUCTURE BÂTIMENT ---
+    ax.add_patch(patches.Rectangle((0, 0), bat_largeur, bat_longueur, edgecolor='black', facecolor='white', lw=3))
+
+    # --- ALLÉE EXTÉRIEURE ---
+    rect_allee = patches.Rectangle((-largeur_allee, 0), largeur_allee, bat_longueur, color='#d1d1d1', hatch='//', alpha=0.5, edgecolor='black')
+    ax.add_patch(rect_allee)
+    for i in range(10, int(bat_longueur), 20):
+        ax.text(-largeur_allee/2, i, "ALLÉE EXT.", ha='center', va='center', rotation=90, color='#666', fontsize=8, fontweight='bold')
+
+    # Ligne de séparation mur/allée (CORRECTION : Segment fini au lieu de ligne infinie)
+    ax.plot([0, 0], [0, bat_longueur], color='black', linewidth=2)
+
+    # --- CAMION (Démo) ---
+    def draw_truck(couche, x, y, col):
+        w, l = 2.5, 15
+        couche.ajouter(x, y, w, l, 'white')
+        couche.ajouter(x, y + l - 3, w, 3, col)
+
+    if largeur_allee > 3:
+        couche_camions = CoucheRectangles()
+        draw_truck(couche_camions, -largeur_allee/2 - 1.25, 5, '#4CAF50')
+        couche_camions.dessiner(ax)
+
+    # Orientations
+    ax.text(-largeur_allee - 1, bat_longueur/2, "SNCF", rotation=90, va='center', fontweight='bold', color='#1a237e')
+    ax.text(bat_largeur + 2, bat_longueur/2, "CANAL", rotation=90, va='center', fontweight='bold', color='#1a237e')
+    ax.text(bat_largeur/2, -3, "FOUG", ha='center', fontsize=12, fontweight='bold', color='#1a237e')
+    ax.text(bat_largeur/2, bat_longueur + 3, "TOUL", ha='center', fontsize=12, fontweight='bold', color='#1a237e')
+
+    # Étiquettes de synthèse (En bas)
+    surf_tot = bat_largeur * bat_longueur
+    ax.text(bat_largeur/2, -6, f"ZONE : {bat_largeur}m x {bat_longueur}m", ha='center', fontsize=10, fontweight='bold')
+    ax.text(bat_largeur/2, -9, f"SURFACE TOTALE : {int(surf_tot)} m²", ha='center', fontsize=10, fontweight='bold', bbox=dict(facecolor='yellow', alpha=0.3))
+
+fond_statique(ax, ("plan1allee-2", empreinte_sources(__file__), bat_largeur, bat_longueur, largeur_allee), tracer_fond)
 
 # --- DESSIN DES MATIÈRES SÉQUENTIELLES ---
-curseur_y = 0
-depassement_global = False
-x_start_base = marge_securite
-
-for nom, res in resultats.items():
-    color = res["color"]
-    
-    # --- SÉCHAGE J1, J2, J3 ---
-    h_j = res["h_jour"]
-    w_j = res["w_jour"]
-    is_adapt_j = res["adapt_jour"]
-    
-    for j in range(3):
-        is_overflow = (curseur_y + h_j > bat_longueur)
-        if is_overflow: depassement_global = True
-        
-        fc = '#ffcccc' if is_overflow else color
-        ec = 'red' if is_overflow else ('black' if not is_adapt_j else 'red')
-        
-        # Dessin Rectangle J(i)
-        ax.add_patch(patches.Rectangle((x_start_base, curseur_y), w_j, h_j, facecolor=fc, edgecolor=ec, alpha=0.4))
-        
+# Tous les lots (J1/J2/J3) et tous les stocks sont dessinés en deux collections
+dessiner_plan(ax, plan, STYLES)
+depassement_global = plan.depassement
+curseur_y = plan.longueur_utilisee
+
+for e in plan.elements:
+    res = resultats[e.matiere]
+    if e.type == SECHAGE:
         # Label J(i) COMPLET
-        label = f"{nom} - J{j+1}"
-        if is_adapt_j: label += f"\n(Min {MIN_Y}m)"
+        label = f"{e.matiere} - J{e.lot+1}"
+        if e.adapte: label += f"\n(Min {MIN_Y}m)"
         # Ajout détails techniques
-        label += f"\n{w_j:.1f}x{h_j:.1f}m\n{int(res['surf_jour'])} m²\n(H={h_sechage}m)"
+        label += f"\n{e.w:.1f}x{e.h:.1f}m\n{int(res['surf_jour'])} m²\n(H={h_sechage}m)"
         
-        ax.text(x_start_base + w_j/2, curseur_y + h_j/2, label, 
+        ax.text(e.x + e.w/2, e.y + e.h/2, label, 
                 ha='center', va='center', fontsize=7, color='black', alpha=1.0, fontweight='normal',
                 bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=1))
-
-        curseur_y += h_j + espace_inter_phase
-
-    # --- STOCKAGE ---
-    h_s = res["h_stock"]
-    w_s = res["w_stock"]
-    is_adapt_s = res["adapt_stock"]
-    
-    is_overflow = (curseur_y + h_s > bat_longueur)
-    if is_overflow: depassement_global = True
-    fc = '#ffcccc' if is_overflow else color
-    ec = 'red' if is_overflow else ('black' if not is_adapt_s else 'red')
-    
-    ax.add_patch(patches.Rectangle((x_start_base, curseur_y), w_s, h_s, facecolor=fc, edgecolor=ec, alpha=0.8, hatch='..'))
-    
-    # Label Stock COMPLET
-    label_s = f"STOCK {nom}\n{int(res['surf_stock'])}m²\n{w_s:.1f}x{h_s:.1f}m"
-    if is_adapt_s: label_s += f"\n(Adapté Min {MIN_Y}m)"
-    label_s += f"\n(H={h_stock}m)"
-    
-    ax.text(x_start_base + w_s/2, curseur_y + h_s/2, label_s, 
-            ha='center', va='center', fontsize=8, fontweight='bold',
-            bbox=dict(facecolor='white', alpha=0.8, edgecolor='none', pad=2))
+    else:
+        # Label Stock COMPLET
+        label_s = f"STOCK {e.matiere}\n{int(res['surf_stk'])}m²\n{e.w:.1f}x{e.h:.1f}m"
+        if e.adapte: label_s += f"\n(Adapté Min {MIN_Y}m)"
+        label_s += f"\n(H={h_stock}m)"
         
-    curseur_y += h_s
-    
-    # Séparateur Matière
-    ax.plot([0, bat_largeur], [curseur_y + espace_inter_matiere/2, curseur_y + espace_inter_matiere/2], 
-            color='black', linestyle='-', linewidth=1.5)
-    
-    curseur_y += espace_inter_matiere
+        ax.text(e.x + e.w/2, e.y + e.h/2, label_s, 
+                ha='center', va='center', fontsize=8, fontweight='bold',
+                bbox=dict(facecolor='white', alpha=0.8, edgecolor='none', pad=2))
 
-# --- CAMION (Démo) ---
-def draw_truck(ax, x, y, col):
-    w, l = 2.5, 15
-    ax.add_patch(patches.Rectangle((x, y), w, l, facecolor='white', edgecolor='black'))
-    ax.add_patch(patches.Rectangle((x, y + l - 3), w, 3, facecolor=col, edgecolor='black'))
-
-if largeur_allee > 3:
-    draw_truck(ax, -largeur_allee/2 - 1.25, 5, '#4CAF50')
+# Séparateur Matière
+for pl in plan.placements.values():
+    ax.plot([0, bat_largeur], [pl["y_separateur"], pl["y_separateur"]], 
+            color='black', linestyle='-', linewidth=1.5)
 
 # --- INFOS ET LIMITES ---
-# Orientations
-ax.text(-largeur_allee - 1, bat_longueur/2, "SNCF", rotation=90, va='center', fontweight='bold', color='#1a237e')
-ax.text(bat_largeur + 2, bat_longueur/2, "CANAL", rotation=90, va='center', fontweight='bold', color='#1a237e')
-ax.text(bat_largeur/2, -3, "FOUG", ha='center', fontsize=12, fontweight='bold', color='#1a237e')
-ax.text(bat_largeur/2, bat_longueur + 3, "TOUL", ha='center', fontsize=12, fontweight='bold', color='#1a237e')
-
-# Étiquettes de synthèse (En bas)
-surf_tot = bat_largeur * bat_longueur
-ax.text(bat_largeur/2, -6, f"ZONE : {bat_largeur}m x {bat_longueur}m", ha='center', fontsize=10, fontweight='bold')
-ax.text(bat_largeur/2, -9, f"SURFACE TOTALE : {int(surf_tot)} m²", ha='center', fontsize=10, fontweight='bold', bbox=dict(facecolor='yellow', alpha=0.3))
 ax.text(bat_largeur/2, -12, f"SÉCHAGE : {int(surf_sechage_tot)} m² | STOCK : {int(surf_stock_tot)} m²", ha='center', fontsize=9, fontweight='bold', bbox=dict(facecolor='orange', alpha=0.3))
 
 if depassement_global:
@@ -265,27 +228,10 @@ ax.axis('off')
 # 4. EXPORT & KPI (DÉTAILLÉS)
 # ==========================================
 
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.pyplot(fig)
-
-with col2:
-    st.subheader("📥 Export")
-    c1, c2 = st.columns(2)
-    buf = io.BytesIO()
-    fig.savefig(buf, format='pdf', bbox_inches='tight')
-    buf.seek(0)
-    c1.download_button("PDF", buf, "plan_optimise.pdf", "application/pdf")
-
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', dpi=200, bbox_inches='tight')
-    buf.seek(0)
-    c2.download_button("PNG", buf, "plan_optimise.png", "image/png")
-    
-    st.markdown("---")
+# Bilan : sans widget, rendu à chaque rerun complet avec le plan courant
+def bilan_surfaces():
     st.subheader("📊 Bilan Surfaces")
-    
+
     # Check longueur
     if depassement_global:
         st.error(f"❌ **MANQUE LONGUEUR**")
@@ -295,7 +241,17 @@ with col2:
         st.success(f"✅ **LONGUEUR OK**")
         st.write(f"Utilisé : {curseur_y:.1f}m / {bat_longueur}m")
         st.write(f"Reste : {bat_longueur - curseur_y:.1f} m")
-    
+
+    # Empaquetage 2D : longueur gagnée en réutilisant l'espace à côté des lots « Adapté »
+    if empaquetage:
+        gain_compact = plan_sequentiel.longueur_utilisee - plan.longueur_utilisee
+        if gain_compact > 0.05:
+            st.info(f"📦 Plan empaqueté : {gain_compact:.1f}m de moins qu'en séquentiel ({plan_sequentiel.longueur_utilisee:.1f}m)")
+        elif gain_compact < -0.05:
+            st.warning(f"📦 Plan empaqueté : le séquentiel ({plan_sequentiel.longueur_utilisee:.1f}m) est plus court mais des tas y débordent ou se chevauchent")
+        else:
+            st.caption("📦 Empaquetage 2D : aucun gain sur le placement séquentiel")
+
     st.markdown("---")
 
     c1, c2 = st.columns(2)
@@ -305,10 +261,53 @@ with col2:
     c1, c2 = st.columns(2)
     c1.metric("Séchage (Plate)", f"{int(surf_sechage_tot)} m²")
     c2.metric("Stockage (Talutée)", f"{int(surf_stock_tot)} m²")
-    
+
     surface_allees = bat_longueur * largeur_allee # Allée externe
     c1, c2 = st.columns(2)
     c1.metric("Allée Extérieure", f"{int(surface_allees)} m²")
     c2.metric("Surface Matière Totale", f"{int(surf_sechage_tot + surf_stock_tot)} m²")
-    
-    st.info(f"Largeur utile utilisée pour les tas : {largeur_max_x:.1f}m")
\ No newline at end of file
+
+    st.info(f"Largeur utile utilisée pour les tas : {largeur_max_x:.1f}m")
+
+
+# Clé du plan : aperçu et exports rendus une fois par jeu de paramètres
+cle_plan = cle_parametres("plan1allee-2", empreinte_sources(__file__), params, empaquetage)
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    profil.etape("Aperçu")
+    apercu_plan(fig, cle_plan)
+    panneau_detail(fig, ax, cle_plan, -18, max_y_plot)
+    profil.etape("4. Export & KPI")
+
+with col2:
+    # Fragments : un clic dans un panneau ne relance que ce panneau
+    panneau_export(fig, cle_plan, pdf=("PDF", "plan_optimise.pdf"), png=("PNG", "plan_optimise.png"), dpi=200, profil=profil)
+
+    st.markdown("---")
+    bilan_surfaces()
+
+    # --- CONTRÔLE GÉOMÉTRIQUE (chevauchements, dégagements) ---
+    panneau_collisions(plan)
+
+    if empaquetage:
+        st.caption("📦 Empreinte, carte, capacité et robustesse : calculées sur le placement séquentiel, sans empaquetage.")
+
+    # --- EMPREINTE MINIMALE (calculée à la demande) ---
+    panneau_empreinte("une_allee_sequentielle", params)
+
+    # --- CARTE DE FAISABILITÉ (domaine des sliders) ---
+    panneau_faisabilite("une_allee_sequentielle", params, (20, 80), (40, 200))
+
+    # --- CAPACITÉ MAXIMALE (tonnage limite du bâtiment) ---
+    panneau_capacite("une_allee_sequentielle", params)
+
+    # --- ROBUSTESSE (Monte Carlo, calculée à la demande) ---
+    panneau_robustesse("une_allee_sequentielle", params)
+
+    # --- SIMULATION ANNUELLE (calculée à la demande) ---
+    panneau_simulation(plan)
+
+# Fin du rerun : détail du profilage (si activé)
+profil.terminer(ax)
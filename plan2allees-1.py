@@ -1,13 +1,30 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-import io
+
+from implantation.dessin import dessiner_plan, fond_statique
+from implantation.depot import DEPOT, empreinte_sources
+from implantation.export import cle_parametres
+from implantation.figures import figure_session
+from implantation.profilage import profileur
+from implantation.panneaux import apercu_plan, panneau_capacite, panneau_collisions, panneau_empreinte, panneau_faisabilite, panneau_export, panneau_robustesse, panneau_simulation, panneau_trafic
+from implantation.moteur.empaquetage import empaqueter
+from implantation.moteur import MIN_LONGUEUR_LOT_Y, PASSAGE, SECHAGE, STOCK, Parametres, recette
+
+# Style des couches : séchage, passages engin, stock central
+STYLES = {
+    SECHAGE: dict(alpha=0.6),
+    PASSAGE: dict(color='#f0f0f0', alpha=0.4, hatch='--'),
+    STOCK: dict(alpha=0.4, hatch='..'),
+}
 
 # --- CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="Simulateur Entrepôt Expert", layout="wide")
 
 st.title("Plan de Masse : version à deux allées classique")
 
+# Profilage du rerun (interrupteur en tête de barre latérale)
+profil = profileur("plan2allees-1")
+
 # ==========================================
 # 1. BARRE LATÉRALE (CONTRÔLES)
 # ==========================================
@@ -59,8 +76,11 @@ with st.sidebar:
     espace_inter_matiere = col_sep1.slider("Esp. Matières", 0.0, 3.0, 0.3, step=0.1)
     espace_inter_lot = col_sep2.slider("Esp. Lots", 0.0, 2.0, 0.5, step=0.1)
     
-    MIN_LONGUEUR_LOT_Y = 4.5 
     st.info(f"Sécurité : Longueur Lot (Y) ≥ {MIN_LONGUEUR_LOT_Y}m")
+    empaquetage = st.toggle(
+        "📦 Empaquetage 2D", value=False, key="empaquetage_2d",
+        help="Reprend l'espace laissé à côté des lots « Adapté » au lieu de tout empiler le long de Y",
+    )
 
     st.markdown("---")
     st.header("4. Flux & Recette")
@@ -101,219 +121,121 @@ with st.sidebar:
 # ==========================================
 # 2. CALCULS MOTEUR (ALGORITHME INTELLIGENT)
 # ==========================================
-
-MATIERES = {
-    "Rebuts PAM": {"r": p_pam, "d": d_pam, "c": "#ff9933"},
-    "Jets Blénod": {"r": p_jet, "d": d_jet, "c": "#0a82d3"},
-    "Gueuset": {"r": p_gue, "d": d_gue, "c": "#aaaaaa"},
-    "Fontes Foug": {"r": p_fon, "d": d_fon, "c": "#ffcc66"},
-    "Ferraille": {"r": p_fer, "d": d_fer, "c": "#da1884"},
-}
-
-resultats = {}
-surf_sechage_tot = 0
-surf_stock_tot = 0
-
-# Largeur de base = Max dispo
-width_base = max(0.1, X_MAX_DISPO)
-
-for nom, data in MATIERES.items():
-    if data["r"] == 0: continue
-    
-    flux_jour = tonnage_jour * (data["r"]/100)
-    
-    # --- SÉCHAGE (ZONE PLATE) ---
-    vol_sechage_total = (flux_jour * duree_sechage) / data["d"]
-    # Ici on ne divise PAS par le coefficient de forme (Hypothèse "Plate")
-    surf_sechage_total = vol_sechage_total / h_sechage 
-    
-    surf_un_lot = (surf_sechage_total / 2) / 3
-    
-    # ALGORITHME INTELLIGENT
-    # 1. Essai avec largeur MAX
-    Y_mat_theo = surf_un_lot / width_base
-    Y_lot_theo = Y_mat_theo + largeur_passage
-    
-    # 2. Contrainte 4.5m
-    if Y_lot_theo >= MIN_LONGUEUR_LOT_Y:
-        final_X = width_base
-        final_Y_lot = Y_lot_theo
-        final_Y_mat = Y_mat_theo
-        mode = "Plein"
-    else:
-        final_Y_lot = MIN_LONGUEUR_LOT_Y
-        # Réduction largeur
-        Y_mat_dispo = max(0.1, final_Y_lot - largeur_passage)
-        final_X = surf_un_lot / Y_mat_dispo
-        final_Y_mat = Y_mat_dispo
-        mode = "Adapté"
-    
-    # --- STOCKAGE (ZONE VRAC / TAS) ---
-    vol_stock = (flux_jour * (15 if scenario==3000 else 10)) / data["d"]
-    # Ici on APPLIQUE le coefficient de forme (Hypothèse "Tas")
-    surf_stock = vol_stock / (h_stock * coeff_forme)
-    longueur_stock = surf_stock / largeur_stock_central
-
-    resultats[nom] = {
-        "dim_x": final_X,
-        "dim_y_lot": final_Y_lot,
-        "dim_y_mat": final_Y_mat,
-        "len_stock": longueur_stock,
-        "surf_sech": surf_sechage_total,
-        "surf_stk": surf_stock,
-        "color": data["c"],
-        "mode": mode
-    }
-    surf_sechage_tot += surf_sechage_total
-    surf_stock_tot += surf_stock
+profil.etape("2. Calculs")
+
+params = Parametres(
+    bat_longueur=bat_longueur, bat_largeur=bat_largeur, alignement=alignement_mode,
+    largeur_stock=largeur_stock_central, largeur_allee=largeur_allee, marge_securite=marge_securite,
+    largeur_passage=largeur_passage, coeff_forme=coeff_forme,
+    espace_inter_matiere=espace_inter_matiere, espace_inter_lot=espace_inter_lot,
+    min_longueur_lot=MIN_LONGUEUR_LOT_Y, scenario=scenario, jours_ouvres=jours_ouvres,
+    h_sechage=h_sechage, h_stock=h_stock, duree_sechage=duree_sechage,
+    recette=recette(
+        {"Rebuts PAM": p_pam, "Jets Blénod": p_jet, "Gueuset": p_gue, "Fontes Foug": p_fon, "Ferraille": p_fer},
+        {"Rebuts PAM": d_pam, "Jets Blénod": d_jet, "Gueuset": d_gue, "Fontes Foug": d_fon, "Ferraille": d_fer},
+    ),
+)
+# Relu du dépôt partagé si ces paramètres ont déjà été calculés
+plan_sequentiel = DEPOT.calculer("deux_allees", params)
+plan = plan_sequentiel
+if empaquetage:
+    # Plan empaqueté, conservé sous sa propre clé : dessin, contrôle et exports le reprennent
+    plan = DEPOT.obtenir(cle_parametres("empaquetage", "deux_allees", params), lambda: empaqueter(plan_sequentiel))
+
+resultats = plan.matieres
+surf_sechage_tot = plan.surf_sechage_tot
+surf_stock_tot = plan.surf_stock_tot
+depassement_longueur = plan.depassement
 
 # ==========================================
 # 3. DESSIN
 # ==========================================
+profil.etape("3. Dessin")
 
-fig, ax = plt.subplots(figsize=(14, 18))
+fig, ax = figure_session("plan2allees-1", figsize=(14, 18))
 
 # Limite de dessin stricte (Clipping Box)
 clip_box = patches.Rectangle((0, 0), bat_largeur, bat_longueur, transform=ax.transData)
 
-# Fond Bâtiment
-ax.add_patch(patches.Rectangle((0, 0), bat_largeur, bat_longueur, edgecolor='black', facecolor='white', lw=2))
-
 # --- STRUCTURE CENTRALE ---
-largeur_structure_centrale = (largeur_allee * 2) + largeur_stock_central + (marge_securite * 2)
-x_start_central = (bat_largeur - largeur_structure_centrale) / 2
-
-x_allee_1_start = x_start_central + marge_securite
-x_stock_start = x_allee_1_start + largeur_allee
-x_allee_2_start = x_stock_start + largeur_stock_central
-
-anchor_G = x_start_central 
-anchor_D = x_allee_2_start + largeur_allee + marge_securite
-
-# Dessin Allées & Fond Stock (Clippés)
-r1 = patches.Rectangle((x_allee_1_start, 0), largeur_allee, bat_longueur, color='#e0e0e0', alpha=0.5, hatch='//')
-r1.set_clip_path(clip_box)
-ax.add_patch(r1)
-ax.text(x_allee_1_start + largeur_allee/2, bat_longueur/2, "ALLÉE 1", ha='center', rotation=90, color='#666')
-
-r2 = patches.Rectangle((x_stock_start, 0), largeur_stock_central, bat_longueur, color='#f8f8f8', alpha=0.3)
-r2.set_clip_path(clip_box)
-ax.add_patch(r2)
-
-r3 = patches.Rectangle((x_allee_2_start, 0), largeur_allee, bat_longueur, color='#e0e0e0', alpha=0.5, hatch='//')
-r3.set_clip_path(clip_box)
-ax.add_patch(r3)
-ax.text(x_allee_2_start + largeur_allee/2, bat_longueur/2, "ALLÉE 2", ha='center', rotation=90, color='#666')
-
-# --- BOUCLE DESSIN ---
-curseur_y = 0
-depassement_longueur = False
-
-def safe_draw_rect(x, y, w, h, color, alpha=1.0, hatch=None, edge='black'):
-    """Fonction qui dessine un rectangle en gérant le dépassement du bâtiment"""
-    if y > bat_longueur:
-        return True
-    
-    final_color = color
-    if y + h > bat_longueur:
-        final_color = '#ffcccc' # Rouge alerte
-        edge = 'red'
-        
-    rect = patches.Rectangle((x, y), w, h, facecolor=final_color, alpha=alpha, hatch=hatch, edgecolor=edge)
-    rect.set_clip_path(clip_box)
-    ax.add_patch(rect)
-    return y + h > bat_longueur
-
-for nom, res in resultats.items():
-    if MATIERES[nom]["r"] == 0: continue
-    
-    h_bloc = (3 * res["dim_y_lot"]) + (2 * espace_inter_lot)
-    w_lot = res["dim_x"]
-    
-    # Calcul X selon alignement
-    if alignement_mode == "Côté Allée (Vide vers le mur)":
-        x_G = anchor_G - w_lot
-        x_D = anchor_D
-    else:
-        x_G = 0
-        x_D = bat_largeur - w_lot
-        
-    col_alert = 'red' if res["mode"] == "Adapté" else 'black' 
-    is_overflow = False
-
-    # --- DESSIN GAUCHE ---
-    for i in range(3):
-        y = curseur_y + (i * res["dim_y_lot"]) + (i * espace_inter_lot)
-        
-        # Mat 1
-        ov1 = safe_draw_rect(x_G, y, w_lot, res["dim_y_mat"]/2, res["color"], 0.6)
-        # Passage
-        y_p = y + res["dim_y_mat"]/2
-        ov2 = safe_draw_rect(x_G, y_p, w_lot, largeur_passage, '#f0f0f0', 0.4, '--')
-        # Mat 2
-        y_m2 = y_p + largeur_passage
-        ov3 = safe_draw_rect(x_G, y_m2, w_lot, res["dim_y_mat"]/2, res["color"], 0.6)
-        
-        if ov1 or ov2 or ov3: is_overflow = True
-
-    # Label G (FUSIONNÉ)
-    if h_bloc > 1 and curseur_y + h_bloc/2 < bat_longueur:
-        label_text = f"{nom}\n{w_lot:.1f}x{res['dim_y_lot']:.1f}m\n{int(res['surf_sech']/2)} m²\n(H={h_sechage}m)"
-        ax.text(x_G + w_lot/2, curseur_y + h_bloc/2, label_text, 
-                ha='center', va='center', fontsize=8, fontweight='bold', color=col_alert,
-                bbox=dict(facecolor='white', alpha=0.85, edgecolor='none', pad=2))
-
-    # --- DESSIN DROITE ---
-    for i in range(3):
-        y = curseur_y + (i * res["dim_y_lot"]) + (i * espace_inter_lot)
-        
-        safe_draw_rect(x_D, y, w_lot, res["dim_y_mat"]/2, res["color"], 0.6)
-        y_p = y + res["dim_y_mat"]/2
-        safe_draw_rect(x_D, y_p, w_lot, largeur_passage, '#f0f0f0', 0.4, '--')
-        y_m2 = y_p + largeur_passage
-        safe_draw_rect(x_D, y_m2, w_lot, res["dim_y_mat"]/2, res["color"], 0.6)
-
-    # Label D (FUSIONNÉ)
-    if h_bloc > 1 and curseur_y + h_bloc/2 < bat_longueur:
-        label_text = f"{nom}\n{w_lot:.1f}x{res['dim_y_lot']:.1f}m\n{int(res['surf_sech']/2)} m²\n(H={h_sechage}m)"
-        ax.text(x_D + w_lot/2, curseur_y + h_bloc/2, label_text, 
-                ha='center', va='center', fontsize=8, fontweight='bold', color=col_alert,
-                bbox=dict(facecolor='white', alpha=0.85, edgecolor='none', pad=2))
-
-    # --- STOCK CENTRAL (CENTRÉ) ---
-    y_center_drying = curseur_y + h_bloc / 2
-    y_stock_start_calc = y_center_drying - (res["len_stock"] / 2)
-    
-    ov_stock = safe_draw_rect(x_stock_start, y_stock_start_calc, largeur_stock_central, res["len_stock"], 
-                   res["color"], 0.4, '..')
-    
-    if res["len_stock"] > 0.5 and y_center_drying < bat_longueur:
-        label_stock = f"Stock {nom}\n{int(res['surf_stk'])}m²\n{largeur_stock_central:.1f}x{res['len_stock']:.1f}m\n(H={h_stock}m)"
-        ax.text(x_stock_start + largeur_stock_central/2, y_center_drying, 
-                label_stock, 
-                ha='center', va='center', fontsize=7, color='black', fontweight='bold',
-                bbox=dict(facecolor='white', alpha=0.6, edgecolor='none', pad=1))
-    
-    if is_overflow or ov_stock: depassement_longueur = True
-
-    # --- MISE À JOUR CURSEUR ---
-    y_end_sechage = curseur_y + h_bloc
-    y_end_stock = y_stock_start_calc + res["len_stock"]
-    y_end_max = max(y_end_sechage, y_end_stock)
-    
-    curseur_y = y_end_max + espace_inter_matiere
-
-# --- ORIENTATION & COTES ---
-ax.text(bat_largeur + 2, bat_longueur/2, "CANAL", va='center', rotation=90, fontsize=12, fontweight='bold', color='darkblue')
-ax.text(-2, bat_longueur/2, "SNCF", va='center', rotation=90, fontsize=12, fontweight='bold', color='darkblue')
-ax.text(bat_largeur/2, -3, "FOUG", ha='center', fontsize=12, fontweight='bold', color='darkblue')
-ax.text(bat_largeur/2, bat_longueur + 3, "TOUL", ha='center', fontsize=12, fontweight='bold', color='darkblue')
-
-# Surface Totale & Dimensions
-surf_tot = bat_largeur * bat_longueur
-ax.text(bat_largeur/2, -6, f"BÂTIMENT : {bat_largeur}m x {bat_longueur}m", ha='center', fontsize=12, fontweight='bold')
-ax.text(bat_largeur/2, -8, f"SURFACE TOTALE : {int(surf_tot)} m²", ha='center', fontsize=12, fontweight='bold', 
-        bbox=dict(facecolor='yellow', alpha=0.3))
+x_allee_1_start = plan.zones["x_allee_1"]
+x_stock_start = plan.zones["x_stock"]
+x_allee_2_start = plan.zones["x_allee_2"]
+
+# --- FOND STATIQUE (ne dépend que de la géométrie : rendu une fois, sous les matières) ---
+def tracer_fond(ax):
+    clip_fond = patches.Rectangle((0, 0), bat_largeur, bat_longueur, transform=ax.transData)
+
+    # Fond Bâtiment
+    ax.add_patch(patches.Rectangle((0, 0), bat_largeur, bat_longueur, edgecolor='black', facecolor='white', lw=2))
+
+    # Dessin Allées & Fond Stock (Clippés)
+    r1 = patches.Rectangle((x_allee_1_start, 0), largeur_allee, bat_longueur, color='#e0e0e0', alpha=0.5, hatch='//')
+    r1.set_clip_path(clip_fond)
+    ax.add_patch(r1)
+    ax.text(x_allee_1_start + largeur_allee/2, bat_longueur/2, "ALLÉE 1", ha='center', rotation=90, color='#666')
+
+    r2 = patches.Rectangle((x_stock_start, 0), largeur_stock_central, bat_longueur, color='#f8f8f8', alpha=0.3)
+    r2.set_clip_path(clip_fond)
+    ax.add_patch(r2)
+
+    r3 = patches.Rectangle((x_allee_2_start, 0), largeur_allee, bat_longueur, color='#e0e0e0', alpha=0.5, hatch='//')
+    r3.set_clip_path(clip_fond)
+    ax.add_patch(r3)
+    ax.text(x_allee_2_start + largeur_allee/2, bat_longueur/2, "ALLÉE 2", ha='center', rotation=90, color='#666')
+
+    # --- ORIENTATION & COTES ---
+    ax.text(bat_largeur + 2, bat_longueur/2, "CANAL", va='center', rotation=90, fontsize=12, fontweight='bold', color='darkblue')
+    ax.text(-2, bat_longueur/2, "SNCF", va='center', rotation=90, fontsize=12, fontweight='bold', color='darkblue')
+    ax.text(bat_largeur/2, -3, "FOUG", ha='center', fontsize=12, fontweight='bold', color='darkblue')
+    ax.text(bat_largeur/2, bat_longueur + 3, "TOUL", ha='center', fontsize=12, fontweight='bold', color='darkblue')
+
+    # Surface Totale & Dimensions
+    surf_tot = bat_largeur * bat_longueur
+    ax.text(bat_largeur/2, -6, f"BÂTIMENT : {bat_largeur}m x {bat_longueur}m", ha='center', fontsize=12, fontweight='bold')
+    ax.text(bat_largeur/2, -8, f"SURFACE TOTALE : {int(surf_tot)} m²", ha='center', fontsize=12, fontweight='bold', 
+            bbox=dict(facecolor='yellow', alpha=0.3))
+
+fond_statique(ax, ("plan2allees-1", empreinte_sources(__file__), bat_largeur, bat_longueur, largeur_allee, largeur_stock_central, marge_securite), tracer_fond)
+
+# --- LOTS, PASSAGES & STOCKS (une collection par couche, clippée au bâtiment) ---
+dessiner_plan(ax, plan, STYLES, clip_path=clip_box, borne=True)
+
+# --- ÉTIQUETTES ---
+if empaquetage:
+    # Plan empaqueté : les positions par matière ne s'appliquent plus, une étiquette par tas
+    for e in plan.elements:
+        if e.type == PASSAGE or e.h <= 1 or e.y + e.h/2 >= bat_longueur:
+            continue
+        label = f"{e.matiere} J{e.lot+1}" if e.type == SECHAGE else f"Stock {e.matiere}"
+        ax.text(e.x + e.w/2, e.y + e.h/2, f"{label}\n{e.w:.1f}x{e.h:.1f}m",
+                ha='center', va='center', fontsize=7, fontweight='bold', color='red' if e.adapte else 'black',
+                bbox=dict(facecolor='white', alpha=0.85, edgecolor='none', pad=1))
+else:
+    for nom, res in resultats.items():
+        pl = plan.placements[nom]
+        curseur_y, h_bloc = pl["y"], pl["h_bloc"]
+        w_lot = res["dim_x"]
+        col_alert = 'red' if res["mode"] == "Adapté" else 'black' 
+
+        # Labels G et D (FUSIONNÉS)
+        if h_bloc > 1 and curseur_y + h_bloc/2 < bat_longueur:
+            label_text = f"{nom}\n{w_lot:.1f}x{res['dim_y_lot']:.1f}m\n{int(res['surf_sech']/2)} m²\n(H={h_sechage}m)"
+            for x_lot in (pl["x_G"], pl["x_D"]):
+                ax.text(x_lot + w_lot/2, curseur_y + h_bloc/2, label_text, 
+                        ha='center', va='center', fontsize=8, fontweight='bold', color=col_alert,
+                        bbox=dict(facecolor='white', alpha=0.85, edgecolor='none', pad=2))
+
+        # Stock central (centré sur le bloc séchage)
+        y_center_drying = pl["y_centre"]
+        if res["len_stock"] > 0.5 and y_center_drying < bat_longueur:
+            label_stock = f"Stock {nom}\n{int(res['surf_stk'])}m²\n{largeur_stock_central:.1f}x{res['len_stock']:.1f}m\n(H={h_stock}m)"
+            ax.text(x_stock_start + largeur_stock_central/2, y_center_drying, 
+                    label_stock, 
+                    ha='center', va='center', fontsize=7, color='black', fontweight='bold',
+                    bbox=dict(facecolor='white', alpha=0.6, edgecolor='none', pad=1))
+
+# Surfaces (dépendent de la recette)
 ax.text(bat_largeur/2, -11, f"SURFACE SÉCHAGE : {int(surf_sechage_tot)} m² | SURFACE STOCKAGE : {int(surf_stock_tot)} m²", 
         ha='center', fontsize=12, fontweight='bold', 
         bbox=dict(facecolor='orange', alpha=0.3))
@@ -329,27 +251,10 @@ ax.set_title(f"PLAN D'IMPLANTATION - {scenario} T/MOIS (Stock Taluté {coeff_for
 # 4. EXPORT & KPI
 # ==========================================
 
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.pyplot(fig)
-
-with col2:
-    st.subheader("📥 Export")
-    c1, c2 = st.columns(2)
-    buf = io.BytesIO()
-    fig.savefig(buf, format='pdf', bbox_inches='tight')
-    buf.seek(0)
-    c1.download_button("Télécharger PDF", buf, "plan_final.pdf", "application/pdf")
-
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    c2.download_button("Télécharger PNG", buf, "plan_final.png", "image/png")
-    
-    st.markdown("---")
+# Bilan : sans widget, rendu à chaque rerun complet avec le plan courant
+def bilan_surfaces():
     st.subheader("📊 Bilan Surfaces")
-    
+
     c1, c2 = st.columns(2)
     c1.metric("Dimensions Totales", f"{bat_largeur}m x {bat_longueur}m")
     c2.metric("Surface Totale Bâtiment", f"{int(bat_largeur*bat_longueur)} m²")
@@ -357,13 +262,68 @@ with col2:
     c1, c2 = st.columns(2)
     c1.metric("Séchage (Plate)", f"{int(surf_sechage_tot)} m²")
     c2.metric("Stockage (Talutée)", f"{int(surf_stock_tot)} m²")
-    
+
     surface_allees = bat_longueur * largeur_allee * 2
     c1, c2 = st.columns(2)
     c1.metric("Allées de Circulation", f"{int(surface_allees)} m²")
     c2.metric("Surface Utile Totale", f"{int(surf_sechage_tot + surf_stock_tot + surface_allees)} m²")
-    
+
     if depassement_longueur:
         st.error(f"❌ **MANQUE LONGUEUR** : Le plan dépasse du cadre.")
     else:
-        st.success(f"✅ **LONGUEUR OK**")
\ No newline at end of file
+        st.success(f"✅ **LONGUEUR OK**")
+
+    # Empaquetage 2D : longueur gagnée en réutilisant l'espace à côté des lots « Adapté »
+    if empaquetage:
+        gain_compact = plan_sequentiel.longueur_utilisee - plan.longueur_utilisee
+        if gain_compact > 0.05:
+            st.info(f"📦 Plan empaqueté : {gain_compact:.1f}m de moins qu'en séquentiel ({plan_sequentiel.longueur_utilisee:.1f}m)")
+        elif gain_compact < -0.05:
+            st.warning(f"📦 Plan empaqueté : le séquentiel ({plan_sequentiel.longueur_utilisee:.1f}m) est plus court mais des tas y débordent ou se chevauchent")
+        else:
+            st.caption("📦 Empaquetage 2D : aucun gain sur le placement séquentiel")
+
+
+# Clé du plan : aperçu et exports rendus une fois par jeu de paramètres
+cle_plan = cle_parametres("plan2allees-1", empreinte_sources(__file__), params, empaquetage)
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    profil.etape("Aperçu")
+    apercu_plan(fig, cle_plan)
+    profil.etape("4. Export & KPI")
+
+with col2:
+    # Fragments : un clic dans un panneau ne relance que ce panneau
+    panneau_export(fig, cle_plan, pdf=("Télécharger PDF", "plan_final.pdf"), png=("Télécharger PNG", "plan_final.png"), dpi=300, profil=profil)
+
+    st.markdown("---")
+    bilan_surfaces()
+
+    # --- CONTRÔLE GÉOMÉTRIQUE (chevauchements, dégagements) ---
+    panneau_collisions(plan)
+
+    if empaquetage:
+        st.caption("📦 Empreinte, carte, capacité et robustesse : calculées sur le placement séquentiel, sans empaquetage.")
+
+    # --- EMPREINTE MINIMALE (calculée à la demande) ---
+    panneau_empreinte("deux_allees", params)
+
+    # --- CARTE DE FAISABILITÉ (domaine des sliders) ---
+    panneau_faisabilite("deux_allees", params, (30, 100), (40, 200))
+
+    # --- CAPACITÉ MAXIMALE (tonnage limite du bâtiment) ---
+    panneau_capacite("deux_allees", params)
+
+    # --- ROBUSTESSE (Monte Carlo, calculée à la demande) ---
+    panneau_robustesse("deux_allees", params)
+
+    # --- SIMULATION ANNUELLE (calculée à la demande) ---
+    panneau_simulation(plan)
+
+    # --- TRAFIC DANS LES ALLÉES (calculé à la demande) ---
+    panneau_trafic(plan)
+
+# Fin du rerun : détail du profilage (si activé)
+profil.terminer(ax)
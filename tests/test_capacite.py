@@ -0,0 +1,47 @@
+"""Capacité : le tonnage trouvé tient, un tonnage plus haut de la tolérance déborde."""
+
+import math
+
+import numpy as np
+import pytest
+
+from implantation.moteur import STRATEGIES, Matiere
+from implantation.moteur.capacite import TOLERANCE, capacite, sensibilites
+
+
+def parametres_aleatoires(strategie, rng):
+    """Bâtiment et recette tirés au hasard, assez courts pour que certains débordent à 0 t"""
+    recette = tuple(
+        Matiere(m.nom, float(rng.integers(0, 40)), float(rng.uniform(0.5, 3.0)), m.couleur)
+        for m in strategie.defaut.recette
+    )
+    return strategie.defaut.avec(
+        bat_longueur=float(rng.integers(30, 121)), bat_largeur=float(rng.integers(30, 101)), recette=recette,
+    )
+
+
+@pytest.mark.parametrize("variante", sorted(STRATEGIES))
+def test_frontiere(variante):
+    strategie = STRATEGIES[variante]
+    rng = np.random.default_rng(24)
+    for _ in range(20):
+        p = parametres_aleatoires(strategie, rng)
+        c = capacite(variante, p)
+        longueur = lambda tonnage: strategie.calculer(c.parametres.avec(scenario=tonnage)).longueur_utilisee
+        if not c.faisable:
+            # Déborde déjà sans flux : aucun tonnage ne tient, pas de sensibilités
+            assert math.isnan(c.tonnage) and c.atteinte
+            assert longueur(0.0) > p.bat_longueur
+            assert sensibilites(variante, p) == {}
+            continue
+        assert longueur(c.tonnage) <= p.bat_longueur
+        if c.atteinte:
+            assert longueur(c.tonnage + TOLERANCE) > p.bat_longueur
+
+
+def test_sans_flux_infaisable():
+    # Plan 1 allée séquentiel par défaut raccourci à 60 m : 78,9 m dès 0 t
+    strategie = STRATEGIES["une_allee_sequentielle"]
+    c = capacite(strategie.nom, strategie.defaut.avec(bat_longueur=60))
+    assert not c.faisable
+    assert c.parametres.scenario == 0.0
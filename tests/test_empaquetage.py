@@ -0,0 +1,49 @@
+"""Empaquetage 2D : aucun recouvrement introduit, mêmes tas, jamais plus long que le séquentiel."""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from implantation.moteur import STRATEGIES, Matiere
+from implantation.moteur.empaquetage import TOLERANCE, empaqueter
+
+
+def parametres_aleatoires(strategie, rng):
+    recette = tuple(
+        Matiere(m.nom, float(rng.integers(0, 40)), float(rng.uniform(0.5, 3.0)), m.couleur)
+        for m in strategie.defaut.recette
+    )
+    return strategie.defaut.avec(
+        bat_longueur=float(rng.integers(40, 201)), bat_largeur=float(rng.integers(30, 101)),
+        coeff_forme=float(rng.choice([0.5, 0.65, 0.8])), recette=recette,
+    )
+
+
+def recouvrements(elements):
+    """Paires d'éléments qui se recouvrent (comparaison de toutes les paires)"""
+    return [
+        (a, b)
+        for k, a in enumerate(elements) for b in elements[k + 1:]
+        if a.x < b.x + b.w - TOLERANCE and b.x < a.x + a.w - TOLERANCE
+        and a.y < b.y + b.h - TOLERANCE and b.y < a.y + a.h - TOLERANCE
+    ]
+
+
+def tas(res):
+    return Counter((e.type, e.matiere, e.lot, round(e.w, 9), round(e.h, 9)) for e in res.elements)
+
+
+@pytest.mark.parametrize("variante", sorted(STRATEGIES))
+def test_sans_recouvrement(variante):
+    strategie = STRATEGIES[variante]
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        p = parametres_aleatoires(strategie, rng)
+        sequentiel = strategie.calculer(p)
+        compact = empaqueter(sequentiel)
+        assert not recouvrements(compact.elements)
+        assert tas(compact) == tas(sequentiel)
+        assert min((e.y for e in compact.elements), default=0.0) >= -TOLERANCE
+        assert compact.longueur_utilisee <= sequentiel.longueur_utilisee + TOLERANCE
+        assert compact.depassement == (compact.longueur_utilisee > p.bat_longueur)
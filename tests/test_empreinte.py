@@ -0,0 +1,29 @@
+"""Empreinte minimale : le bâtiment trouvé tient le plan dans l'ordre demandé, un pas plus étroit non."""
+
+import pytest
+
+from implantation.moteur import STRATEGIES
+from implantation.moteur.empreinte import empreinte_minimale
+from implantation.moteur.ordre import optimiser_ordre
+
+ORDRES = [
+    ("deux_allees", None),
+    ("deux_allees", ["Ferraille", "Jets Blénod", "Fontes Foug", "Rebuts PAM"]),
+    ("deux_allees_groupees", None),
+    ("deux_allees_groupees", [("Jets Blénod", "Ferraille"), "Rebuts PAM", "Fontes Foug"]),
+    ("deux_allees_groupees", ["Ferraille", ("Rebuts PAM", "Jets Blénod"), "Fontes Foug"]),
+    ("deux_allees_groupees", "optimisé"),
+]
+
+
+@pytest.mark.parametrize("variante, ordre", ORDRES)
+def test_empreinte_dans_l_ordre(variante, ordre):
+    strategie = STRATEGIES[variante]
+    p = strategie.defaut
+    if ordre == "optimisé":
+        ordre = optimiser_ordre(variante, p).ordre
+    e = empreinte_minimale(variante, p, ordre)
+    assert e.resultat.longueur_utilisee == strategie.calculer(e.parametres, ordre).longueur_utilisee
+    assert e.resultat.longueur_utilisee <= e.bat_longueur
+    plus_etroit = e.parametres.avec(bat_largeur=e.bat_largeur - 0.5)
+    assert strategie.calculer(plus_etroit, ordre).longueur_utilisee > e.bat_longueur
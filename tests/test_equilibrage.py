@@ -0,0 +1,48 @@
+"""Équilibrage une allée scindée : la forme fermée retrouve le minimum d'une recherche exhaustive."""
+
+import numpy as np
+import pytest
+
+from implantation.moteur import STRATEGIES, Matiere
+from implantation.moteur.equilibrage import _termes, equilibrer, longueurs_cotes
+
+DEFAUT = STRATEGIES["une_allee_scindee"].defaut
+
+
+def parametres(rng):
+    recette = tuple(
+        Matiere(m.nom, float(rng.integers(0, 40)), float(rng.uniform(0.5, 3.0)), m.couleur)
+        for m in DEFAUT.recette
+    )
+    return DEFAUT.avec(
+        bat_largeur=float(rng.integers(30, 101)), scenario=float(rng.choice([3000, 4500, 6000])),
+        espace_inter_lot=float(rng.choice([0.5, 1.0, 3.0])), espace_inter_matiere=float(rng.choice([0.3, 1.0, 5.0])),
+        recette=recette,
+    )
+
+
+def minimum_exhaustif(p, bas, haut, n=200001):
+    s = np.linspace(bas, haut, n)
+    gauche, droite = longueurs_cotes(p, s)
+    k = np.argmin(np.maximum(gauche, droite))
+    return s[k], max(gauche[k], droite[k])
+
+
+@pytest.mark.parametrize("graine", range(10))
+def test_forme_fermee(graine):
+    p = parametres(np.random.default_rng(graine))
+    D = _termes(p)[2]
+    e = equilibrer(p)
+    s, longueur = minimum_exhaustif(p, 1e-3, D - 0.1)
+    assert e.longueur <= longueur + 1e-9
+    assert e.longueur == pytest.approx(longueur, rel=1e-4)
+    assert e.largeur_stock == pytest.approx(s, abs=D * 1e-4)
+
+
+def test_bornes():
+    p = DEFAUT
+    for bornes in ((2.0, 6.0), (20.0, 30.0)):
+        e = equilibrer(p, bornes=bornes)
+        s, longueur = minimum_exhaustif(p, *bornes)
+        assert bornes[0] <= e.largeur_stock <= bornes[1]
+        assert e.longueur == pytest.approx(longueur, rel=1e-6)
@@ -0,0 +1,71 @@
+"""Pipeline (flux -> dimensions -> placement) : même plan que Strategie.calculer, étapes chaînées."""
+
+import numpy as np
+import pytest
+
+from implantation.moteur import ALIGNEMENT_MUR, STRATEGIES, DeuxAllees, Matiere
+from implantation.moteur import base
+from implantation.moteur.ordre import optimiser_ordre
+from implantation.moteur.pipeline import DIMENSIONS, FLUX, PLACEMENT, Pipeline
+
+# Un pas de marche : champ modifié et valeurs tirées au hasard
+PAS = {
+    "scenario": lambda rng: float(rng.choice([3000, 4500, 6000])),
+    "coeff_forme": lambda rng: float(rng.choice([0.5, 0.65, 0.8])),
+    "h_stock": lambda rng: float(rng.choice([5.0, 7.0])),
+    "bat_largeur": lambda rng: float(rng.integers(30, 101)),
+    "largeur_stock": lambda rng: float(rng.integers(8, 41)) / 2,
+    "largeur_passage": lambda rng: float(rng.choice([0.0, 1.5])),
+    "bat_longueur": lambda rng: float(rng.integers(40, 201)),
+    "espace_inter_matiere": lambda rng: float(rng.choice([0.3, 1.0])),
+    "alignement": lambda rng: str(rng.choice([ALIGNEMENT_MUR, "Côté Allée (Vide vers le mur)"])),
+}
+
+
+def recette_aleatoire(strategie, rng):
+    return tuple(
+        Matiere(m.nom, float(rng.integers(0, 40)), float(rng.uniform(0.5, 3.0)), m.couleur)
+        for m in strategie.defaut.recette
+    )
+
+
+def identiques(a, b):
+    return (a.elements == b.elements and a.matieres == b.matieres and a.placements == b.placements
+            and a.curseurs == b.curseurs and a.parametres == b.parametres)
+
+
+@pytest.mark.parametrize("variante", sorted(STRATEGIES))
+def test_marche_aleatoire(variante):
+    strategie = STRATEGIES[variante]
+    rng = np.random.default_rng(16)
+    pipeline = Pipeline(capacite=8)
+    p = strategie.defaut
+    for etape in range(150):
+        champ = rng.choice(list(PAS) + ["recette"])
+        p = p.avec(**{champ: recette_aleatoire(strategie, rng) if champ == "recette" else PAS[champ](rng)})
+        ordre = None
+        if isinstance(strategie, DeuxAllees) and etape % 5 == 0 and sum(m.pourcentage > 0 for m in p.recette) >= 2:
+            ordre = optimiser_ordre(variante, p).ordre
+        assert identiques(pipeline.calculer(variante, p, ordre), strategie.calculer(p, ordre)), (etape, champ)
+
+
+def test_etapes_relancees():
+    pipeline = Pipeline()
+    p = STRATEGIES["deux_allees"].defaut
+    pipeline.calculer("deux_allees", p)
+    assert pipeline.recalculees == [FLUX, DIMENSIONS, PLACEMENT]
+    pipeline.calculer("deux_allees", p.avec(alignement=ALIGNEMENT_MUR))
+    assert pipeline.recalculees == [PLACEMENT]
+    pipeline.calculer("deux_allees", p.avec(bat_largeur=p.bat_largeur + 5))
+    assert pipeline.recalculees == [DIMENSIONS, PLACEMENT]
+
+
+def test_surfaces_calculees_une_fois(monkeypatch):
+    # Changer le flux calcule les surfaces dans l'étape flux seulement : dimensions les reprend
+    appels = []
+    surface_sechage = base.surface_sechage
+    monkeypatch.setattr(base, "surface_sechage", lambda p, m: appels.append(m.nom) or surface_sechage(p, m))
+    strategie = STRATEGIES["deux_allees"]
+    p = strategie.defaut.avec(scenario=4321)
+    Pipeline().calculer("deux_allees", p)
+    assert len(appels) == len(strategie.matieres_actives(p))
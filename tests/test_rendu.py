@@ -0,0 +1,48 @@
+"""Aperçu et exports d'une même figure rendus depuis plusieurs threads."""
+
+import hashlib
+import threading
+
+from matplotlib.figure import Figure
+
+from implantation.dessin import CanevasApercu, rendre_apercu
+from implantation.export import rendre_figure
+
+
+def empreinte(png):
+    return hashlib.sha1(png).hexdigest()
+
+
+def test_export_pendant_apercu():
+    # Petits textes masqués par l'aperçu : un export concurrent doit tous les garder
+    fig = Figure(figsize=(6, 8))
+    ax = fig.add_subplot()
+    for i in range(200):
+        ax.text(i % 10 / 10, i / 200, f"t{i}", fontsize=5)
+    reference = empreinte(rendre_figure(fig, "png", dpi=80))
+
+    fin = threading.Event()
+
+    def apercu():
+        while not fin.is_set():
+            rendre_apercu(fig)
+
+    apercus = threading.Thread(target=apercu)
+    apercus.start()
+    try:
+        exports = [empreinte(rendre_figure(fig, "png", dpi=80)) for _ in range(10)]
+    finally:
+        fin.set()
+        apercus.join()
+    assert exports == [reference] * 10
+
+
+def test_apercu_sans_internes_matplotlib(monkeypatch):
+    # Internes de FigureCanvasAgg absents (nouvelle version) : repli sur l'Agg ordinaire
+    def sans_last_key(self):
+        raise AttributeError("'CanevasApercu' object has no attribute '_lastKey'")
+
+    monkeypatch.setattr(CanevasApercu, "get_renderer", sans_last_key)
+    fig = Figure(figsize=(4, 3))
+    fig.add_subplot().plot([0, 1], [0, 1])
+    assert rendre_apercu(fig).startswith(b"\x89PNG")
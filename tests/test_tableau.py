@@ -0,0 +1,73 @@
+"""TableauPlan : mêmes indicateurs que les éléments, aller-retour pickle sans perte."""
+
+import pickle
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from implantation.moteur import STRATEGIES, Matiere
+from implantation.moteur.empaquetage import empaqueter
+from implantation.moteur.resultat import PASSAGE, SECHAGE, STOCK
+from implantation.moteur.tableau import ALLEE
+
+
+def plans(strategie, rng, n=15):
+    for _ in range(n):
+        recette = tuple(
+            Matiere(m.nom, float(rng.integers(0, 40)), float(rng.uniform(0.5, 3.0)), m.couleur)
+            for m in strategie.defaut.recette
+        )
+        p = strategie.defaut.avec(
+            bat_longueur=float(rng.integers(40, 201)), bat_largeur=float(rng.integers(30, 101)),
+            coeff_forme=float(rng.choice([0.5, 0.65, 0.8])), recette=recette,
+        )
+        yield strategie.calculer(p)
+
+
+def indicateurs_elements(res):
+    """Indicateurs recalculés sur la liste d'Element, sans le tableau"""
+    return {
+        "surf_sechage_tot": sum(e.surface for e in res.elements_de(SECHAGE)),
+        "surf_stock_tot": sum(e.surface for e in res.elements_de(STOCK)),
+        "longueur_utilisee": res.longueur_utilisee,
+        "marge_longueur": res.marge_longueur,
+        "depassement": res.depassement,
+        "nb_adaptes": res.nb_adaptes,
+    }
+
+
+@pytest.mark.parametrize("variante", sorted(STRATEGIES))
+def test_indicateurs(variante):
+    for res in plans(STRATEGIES[variante], np.random.default_rng(9)):
+        assert res.indicateurs() == pytest.approx(indicateurs_elements(res))
+        # Surfaces placées : celles du dimensionnement
+        assert res.indicateurs()["surf_stock_tot"] == pytest.approx(res.surf_stock_tot)
+        t = res.tableau
+        assert len(t.du_type(SECHAGE)) + len(t.du_type(PASSAGE)) + len(t.du_type(STOCK)) == len(res.elements)
+        assert len(t.du_type(ALLEE)) == sum(cle.startswith("x_allee") for cle in res.zones)
+        assert t.elements() == res.elements
+
+
+@pytest.mark.parametrize("variante", sorted(STRATEGIES))
+def test_pickle(variante):
+    for res in plans(STRATEGIES[variante], np.random.default_rng(10), n=5):
+        for plan in (res, empaqueter(res)):
+            copie = pickle.loads(pickle.dumps(plan))
+            assert copie.elements == plan.elements
+            assert (copie.variante, copie.matieres, copie.placements, copie.zones, copie.curseurs) \
+                == (plan.variante, plan.matieres, plan.placements, plan.zones, plan.curseurs)
+            assert copie.parametres == plan.parametres
+            assert copie.indicateurs() == plan.indicateurs()
+            # Tableau repris tel quel, pas reconstruit
+            assert copie.__dict__["_tableau"][0] is copie.elements
+            assert np.array_equal(copie.tableau.rects, plan.tableau.rects)
+
+
+def test_tableau_suit_les_elements():
+    res = STRATEGIES["deux_allees"].calculer(STRATEGIES["deux_allees"].defaut)
+    n = len(res.tableau)
+    res.elements.append(replace(res.elements[0], y=res.parametres.bat_longueur, depassement=True))
+    assert len(res.tableau) == n + 1 and res.indicateurs()["depassement"]
+    res.elements = res.elements[:1]
+    assert len(res.tableau.places) == 1